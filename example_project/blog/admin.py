@@ -4,14 +4,21 @@ Jodit editor is automatically used for RichTextField fields.
 """
 
 from django.contrib import admin
+from jodit.admin import RichTextPreviewMixin, rich_text_preview
 from .models import Post, Comment
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(RichTextPreviewMixin, admin.ModelAdmin):
     """Admin interface for Post model."""
 
-    list_display = ['title', 'author', 'created_at', 'published']
+    list_display = [
+        'title',
+        rich_text_preview('content', 80, version_field='updated_at'),
+        'author',
+        'created_at',
+        'published',
+    ]
     list_filter = ['published', 'created_at', 'author']
     search_fields = ['title', 'content', 'author']
     prepopulated_fields = {'slug': ('title',)}
@@ -37,7 +44,7 @@ class PostAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     """Admin interface for Comment model."""
 
-    list_display = ['author', 'post', 'created_at', 'approved']
+    list_display = ['author', 'post', rich_text_preview('content', 60), 'created_at', 'approved']
     list_filter = ['approved', 'created_at']
     search_fields = ['author', 'content', 'post__title']
     date_hierarchy = 'created_at'
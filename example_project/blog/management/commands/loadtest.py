@@ -0,0 +1,338 @@
+"""
+Load test of the editor workflows of the example project.
+
+Starts pre-forked server workers, then simulates concurrent staff users who
+open and submit PostCreateView and PostUpdateView with large bodies embedding
+images, open the admin change form and upload files through the editor.
+Only the standard library is used to generate load.
+"""
+
+import base64
+import http.cookiejar
+import multiprocessing
+import os
+import random
+import secrets
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from jodit.metrics import percentile
+from jodit.settings import get_storage, get_upload_path
+
+from blog.models import Post
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Names are unique to each run, so that only what the run created is deleted
+RUN_ID = secrets.token_hex(4)
+USERNAME = f'loadtest-{RUN_ID}'
+# Only valid while the load test runs
+PASSWORD = secrets.token_urlsafe(16)
+SLUG_PREFIX = f'loadtest-{RUN_ID}-'
+UPLOAD_NAME = f'jodit-loadtest-{RUN_ID}'
+
+# Steps of each iteration of a user, with their expected status codes
+STEPS = {
+    'create_form': 200,
+    'create': 302,
+    'edit_form': 200,
+    'edit': 302,
+    'admin_change': 200,
+    'upload': 200,
+}
+
+
+def make_png(width, height, rng):
+    """Return a PNG of random pixels, which compresses poorly like a photo."""
+    rows = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b'')
+
+
+def make_body(size, images, rng):
+    """Return about size bytes of rich text with images embedded as data URIs."""
+    parts = []
+    for _ in range(images):
+        data = base64.b64encode(make_png(64, 64, rng)).decode()
+        parts.append(f'<p><img src="data:image/png;base64,{data}" alt="" width="64" height="64"></p>')
+    paragraph = (
+        '<p>Lorem <strong>ipsum</strong> dolor sit amet, <em>consectetur</em> adipiscing elit, '
+        '<a href="https://example.com/">sed do</a> eiusmod tempor incididunt ut labore.</p>'
+        '<table><tbody><tr><td>Cell</td><td>Cell</td></tr></tbody></table>'
+        '<ul><li>First item</li><li>Second item</li></ul>'
+    )
+    filler = max(size - sum(len(part) for part in parts), 0)
+    parts.extend([paragraph] * (filler // len(paragraph) + 1))
+    return ''.join(parts)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in MiB, if known."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+def serve(sock, stop, results):
+    """Serve the project on the inherited listening socket until stop is set."""
+    host, port = sock.getsockname()[:2]
+    server = ThreadedWSGIServer((host, port), QuietHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.server_name = host
+    server.server_port = port
+    server.setup_environ()
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stop.wait()
+    server.shutdown()
+    results.put((os.getpid(), peak_rss()))
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class User:
+    """A simulated staff user with its own session."""
+
+    def __init__(self, base_url, post, body, upload):
+        self.base_url = base_url
+        self.post = post
+        self.body = body
+        self.upload_data = upload
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), NoRedirectHandler())
+
+    @property
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == settings.CSRF_COOKIE_NAME), '')
+
+    def request(self, path, data=None, headers=None):
+        """Send a request and return its status code, redirects are not followed."""
+        if isinstance(data, dict):
+            data = urllib.parse.urlencode({'csrfmiddlewaretoken': self.csrf_token, **data}).encode()
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers or {})
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            if e.code != 302:
+                raise
+            return e.code
+
+    def login(self):
+        self.request('/admin/login/')
+        if self.request('/admin/login/', {'username': USERNAME, 'password': PASSWORD, 'next': '/admin/'}) != 302:
+            raise CommandError(f'Could not log in at {self.base_url}/admin/login/.')
+
+    def form_data(self, slug):
+        return {
+            'title': f'Load test {slug}',
+            'slug': slug,
+            'content': self.body,
+            'excerpt': '<p>Load test excerpt</p>',
+            'author': 'Load test',
+            'published': 'on',
+        }
+
+    def create_form(self):
+        return self.request('/create/')
+
+    def create(self):
+        return self.request('/create/', self.form_data(f'{SLUG_PREFIX}{uuid.uuid4().hex}'))
+
+    def edit_form(self):
+        return self.request(f'/post/{self.post.slug}/edit/')
+
+    def edit(self):
+        return self.request(f'/post/{self.post.slug}/edit/', self.form_data(self.post.slug))
+
+    def admin_change(self):
+        return self.request(f'/admin/blog/post/{self.post.pk}/change/')
+
+    def upload(self):
+        boundary = uuid.uuid4().hex
+        data = (
+            (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="files[0]"; filename="{UPLOAD_NAME}.png"\r\n'
+                f'Content-Type: image/png\r\n\r\n'
+            ).encode()
+            + self.upload_data
+            + f'\r\n--{boundary}--\r\n'.encode()
+        )
+        headers = {'Content-Type': f'multipart/form-data; boundary={boundary}', 'X-CSRFToken': self.csrf_token}
+        return self.request('/jodit/upload/', data, headers)
+
+
+class Command(BaseCommand):
+    help = 'Load test the editor workflows and report throughput, latency percentiles and memory per worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Concurrent simulated users.')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to generate load for.')
+        parser.add_argument('--workers', type=int, default=2, help='Server worker processes to start.')
+        parser.add_argument('--body-size', type=int, default=200, help='Size of submitted bodies in KiB.')
+        parser.add_argument('--images', type=int, default=5, help='Images embedded in each submitted body.')
+        parser.add_argument('--upload-size', type=int, default=256, help='Width and height of uploaded images.')
+        parser.add_argument('--url', help='Load test a server already running at this URL instead.')
+        parser.add_argument('--keep', action='store_true', help='Keep the posts and files created by the load test.')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write('DEBUG is on, set DJANGO_DEBUG=false for numbers closer to production.')
+        rng = random.Random(0)
+        body = make_body(options['body_size'] * 1024, options['images'], rng)
+        upload = make_png(options['upload_size'], options['upload_size'], rng)
+        if (
+            get_user_model().objects.filter(username=USERNAME).exists()
+            or Post.objects.filter(slug__startswith=SLUG_PREFIX).exists()
+        ):
+            raise CommandError(f'The user {USERNAME} or posts starting with {SLUG_PREFIX} already exist.')
+
+        workers = None
+        try:
+            posts = self.setup_data(options['users'], body)
+            if options['url']:
+                base_url = options['url'].rstrip('/')
+            else:
+                base_url, workers = self.start_workers(options['workers'])
+            timings, errors, elapsed = self.run_users(base_url, posts, body, upload, options['duration'])
+            memory = self.stop_workers(*workers) if workers else {}
+        finally:
+            if workers:
+                for worker in workers[0]:
+                    worker.terminate()
+            # Never leave a superuser with a known password behind
+            get_user_model().objects.filter(username=USERNAME).delete()
+            if not options['keep']:
+                self.delete_data()
+        self.report(timings, errors, elapsed, memory)
+
+    def setup_data(self, users, body):
+        get_user_model().objects.create_superuser(USERNAME, 'loadtest@example.com', PASSWORD)
+        return [
+            Post.objects.create(title=f'Load test {i}', slug=f'{SLUG_PREFIX}{i}', content=body, author='Load test')
+            for i in range(users)
+        ]
+
+    def delete_data(self):
+        Post.objects.filter(slug__startswith=SLUG_PREFIX).delete()
+        storage = get_storage()
+        try:
+            files = storage.listdir(get_upload_path())[1]
+        except FileNotFoundError:
+            return
+        for name in files:
+            if name.startswith(UPLOAD_NAME):
+                storage.delete(get_upload_path() + name)
+
+    def start_workers(self, count):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('Starting workers needs fork(), use --url with a separately started server.')
+        context = multiprocessing.get_context('fork')
+        sock = socket.create_server(('127.0.0.1', 0), backlog=1024)
+        # Workers all wake up for a new connection, only one accept() succeeds
+        sock.setblocking(False)
+        stop = context.Event()
+        results = context.Queue()
+        # Workers must open their own database connections
+        connections.close_all()
+        workers = [context.Process(target=serve, args=(sock, stop, results), daemon=True) for _ in range(count)]
+        for worker in workers:
+            worker.start()
+        port = sock.getsockname()[1]
+        sock.close()
+        return f'http://127.0.0.1:{port}', (workers, stop, results)
+
+    def stop_workers(self, workers, stop, results):
+        stop.set()
+        memory = dict(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join()
+        return memory
+
+    def run_users(self, base_url, posts, body, upload, duration):
+        timings = defaultdict(list)
+        errors = defaultdict(list)
+        lock = threading.Lock()
+        users = [User(base_url, post, body, upload) for post in posts]
+        for user in users:
+            user.login()
+        deadline = time.monotonic() + duration
+
+        def run(user):
+            while time.monotonic() < deadline:
+                for step, expected in STEPS.items():
+                    start = time.perf_counter()
+                    try:
+                        status = getattr(user, step)()
+                    except OSError as e:
+                        # Includes urllib's HTTPError and URLError
+                        status = e
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        if status == expected:
+                            timings[step].append(elapsed)
+                        else:
+                            errors[step].append(status)
+
+        threads = [threading.Thread(target=run, args=(user,)) for user in users]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors, time.perf_counter() - start
+
+    def report(self, timings, errors, elapsed, memory):
+        total = sum(len(values) for values in timings.values())
+        self.stdout.write(f'{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} requests/s')
+        self.stdout.write(
+            f'{"step":<14}{"requests":>10}{"errors":>8}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+        )
+        for step in STEPS:
+            values = sorted(timings[step])
+            stats = [percentile(values, p) * 1000 if values else 0 for p in (50, 95, 99)]
+            self.stdout.write(
+                f'{step:<14}{len(values):>10}{len(errors[step]):>8}{len(values) / elapsed:>9.1f}'
+                + ''.join(f'{value:>9.1f}' for value in stats)
+            )
+        for step, failures in errors.items():
+            if failures:
+                self.stderr.write(f'{step} failed {len(failures)} times, first with: {failures[0]}')
+        for pid, rss in memory.items():
+            self.stdout.write(f'worker {pid}: peak RSS {rss:.1f} MiB' if rss else f'worker {pid}: peak RSS unknown')
@@ -11,4 +11,5 @@ urlpatterns = [
     path('post/<slug:slug>/comment/', views.add_comment, name='add_comment'),
     path('create/', views.PostCreateView.as_view(), name='post_create'),
     path('post/<slug:slug>/edit/', views.PostUpdateView.as_view(), name='post_edit'),
+    path('benchmark/plugins/', views.plugin_benchmark, name='plugin_benchmark'),
 ]
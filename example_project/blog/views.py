@@ -2,13 +2,19 @@
 Views for the blog app.
 """
 
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.urls import reverse_lazy
+from jodit.configs import get_client_config
+from jodit.widgets import JoditWidget
 from .models import Post
 from .forms import PostForm, CommentForm
 
+# Editor inits per configuration in the plugin benchmark, by default and at most
+BENCHMARK_RUNS = 30
+MAX_BENCHMARK_RUNS = 500
+
 
 class PostListView(ListView):
     """Display list of all published posts."""
@@ -75,3 +81,27 @@ def add_comment(request, slug):
             return redirect('post_detail', slug=slug)
 
     return redirect('post_detail', slug=slug)
+
+
+def plugin_benchmark(request):
+    """Compare editor init times with and without plugin pruning."""
+    widget = JoditWidget(config_name=request.GET.get('config', 'default'))
+    try:
+        runs = min(max(int(request.GET.get('runs', BENCHMARK_RUNS)), 1), MAX_BENCHMARK_RUNS)
+    except ValueError:
+        runs = BENCHMARK_RUNS
+    configs = {
+        'pruned': get_client_config({**widget.config, 'prunePlugins': True}),
+        'unpruned': get_client_config({**widget.config, 'prunePlugins': False}),
+    }
+    return render(
+        request,
+        'blog/plugin_benchmark.html',
+        {
+            'config_name': widget.config_name,
+            'configs': configs,
+            'disabled_plugins': configs['pruned'].get('disablePlugins', []),
+            'media': widget.media,
+            'runs': runs,
+        },
+    )
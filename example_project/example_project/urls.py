@@ -9,6 +9,7 @@ from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('jodit/', include('jodit.urls')),
     path('', include('blog.urls')),
 ]
 
@@ -0,0 +1,244 @@
+"""Resumable uploads of large files in chunks."""
+
+import bisect
+import hashlib
+import io
+import json
+import os
+import secrets
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+
+from .settings import get_storage, get_upload_path
+from .uploads import UploadError, get_allowed_extensions, verify_image
+
+META_NAME = "meta.json"
+
+BLOCK_SIZE = 64 * 1024
+
+
+def get_directory():
+    """Return the local directory holding the chunks of unfinished uploads."""
+    return getattr(settings, "JODIT_CHUNKED_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "jodit-chunks"))
+
+
+def get_chunk_size():
+    """Return the size of upload chunks in bytes."""
+    return getattr(settings, "JODIT_CHUNKED_UPLOAD_CHUNK_SIZE", 5 * 1024 * 1024)
+
+
+def get_max_size():
+    """Return the maximum size of a file uploaded in chunks, in bytes."""
+    return getattr(settings, "JODIT_CHUNKED_UPLOAD_MAX_SIZE", 1024 * 1024 * 1024)
+
+
+def get_timeout():
+    """Return after how many seconds unfinished uploads are deleted."""
+    return getattr(settings, "JODIT_CHUNKED_UPLOAD_TIMEOUT", 24 * 60 * 60)
+
+
+def purge_expired():
+    """Delete the chunks of uploads that were not finished in time."""
+    directory = get_directory()
+    if not os.path.isdir(directory):
+        return
+    expires = time.time() - get_timeout()
+    for entry in os.scandir(directory):
+        meta = os.path.join(entry.path, META_NAME)
+        if entry.is_dir() and (not os.path.exists(meta) or os.path.getmtime(meta) < expires):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class ConcatenatedReader(io.RawIOBase):
+    """Read several files one after the other, as a single seekable stream."""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        # Offset of the start of each file in the stream, and of its end
+        self.offsets = [0]
+        for path in self.paths:
+            self.offsets.append(self.offsets[-1] + os.path.getsize(path))
+        self.position = 0
+        self.index = None
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.offsets[-1]
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}.")
+        self.position = offset
+        return offset
+
+    def readinto(self, buffer):
+        index = bisect.bisect_right(self.offsets, self.position) - 1
+        if index >= len(self.paths):
+            return 0
+        if index != self.index:
+            self.close_current()
+            self.current = open(self.paths[index], "rb")  # noqa: SIM115
+            self.index = index
+        self.current.seek(self.position - self.offsets[index])
+        count = self.current.readinto(buffer)
+        self.position += count
+        return count
+
+    def close_current(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+            self.index = None
+
+    def close(self):
+        self.close_current()
+        super().close()
+
+
+class ChunkedUpload:
+    """
+    An upload sent as numbered chunks, assembled into the storage once complete.
+
+    Chunks are kept in JODIT_CHUNKED_UPLOAD_DIR, which must be shared by all
+    servers handling uploads.
+    """
+
+    def __init__(self, upload_id, meta):
+        self.id = upload_id
+        self.meta = meta
+        self.directory = os.path.join(get_directory(), upload_id)
+
+    @classmethod
+    def create(cls, user, name, size):
+        """Start an upload of a file of size bytes by user."""
+        if os.path.splitext(name)[1].lower() not in get_allowed_extensions():
+            raise UploadError(f"{name}: file type is not allowed.")
+        if size <= 0:
+            raise UploadError(f"{name}: file is empty.")
+        if size > get_max_size():
+            raise UploadError(f"{name}: file is too large.", status=413)
+
+        purge_expired()
+        chunk_size = get_chunk_size()
+        meta = {
+            "user": user.pk,
+            "name": name,
+            "size": size,
+            "chunk_size": chunk_size,
+            "chunks": -(-size // chunk_size),
+        }
+        upload = cls(secrets.token_urlsafe(16), meta)
+        os.makedirs(upload.directory)
+        with open(os.path.join(upload.directory, META_NAME), "w") as f:
+            json.dump(meta, f)
+        return upload
+
+    @classmethod
+    def load(cls, upload_id, user):
+        """Return the unfinished upload of user with upload_id, or None."""
+        try:
+            with open(os.path.join(get_directory(), upload_id, META_NAME)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta["user"] != user.pk:
+            return None
+        return cls(upload_id, meta)
+
+    def chunk_path(self, index):
+        return os.path.join(self.directory, f"{index:06d}")
+
+    def chunk_length(self, index):
+        """Return the expected length of the chunk at index."""
+        return min(self.meta["chunk_size"], self.meta["size"] - index * self.meta["chunk_size"])
+
+    def received(self):
+        """Return the sorted indexes of the chunks received so far."""
+        return [index for index in range(self.meta["chunks"]) if os.path.exists(self.chunk_path(index))]
+
+    def status(self):
+        """Return the state of this upload as sent to the client."""
+        return {
+            "id": self.id,
+            "url": reverse("jodit:chunked_upload", args=[self.id]),
+            "chunkSize": self.meta["chunk_size"],
+            "chunks": self.meta["chunks"],
+            "received": self.received(),
+        }
+
+    def write_chunk(self, index, stream, checksum=None):
+        """
+        Store the chunk at index read from stream, replacing an earlier copy.
+
+        The chunk must have the expected length and, if given, match the
+        hex-encoded SHA-256 checksum.
+        """
+        if not 0 <= index < self.meta["chunks"]:
+            raise UploadError("Invalid chunk index.")
+        length = self.chunk_length(index)
+        digest = hashlib.sha256()
+        received = 0
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as f:
+            try:
+                while received <= length:
+                    block = stream.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    received += len(block)
+                    digest.update(block)
+                    f.write(block)
+                if received != length:
+                    raise UploadError(f"Chunk {index} must be {length} bytes long.")
+                if checksum and checksum.lower() != digest.hexdigest():
+                    raise UploadError(f"Checksum of chunk {index} does not match.")
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        # Atomically, so that status queries never see partial chunks
+        os.replace(f.name, self.chunk_path(index))
+        os.utime(os.path.join(self.directory, META_NAME))
+
+    def assemble(self):
+        """
+        Save the complete file to the storage, streaming from the chunks, and return its name.
+
+        Images are verified like regular uploads first; invalid ones are
+        deleted and raise UploadError.
+        """
+        missing = self.meta["chunks"] - len(self.received())
+        if missing:
+            raise UploadError(f"{missing} chunks are missing.")
+        paths = [self.chunk_path(index) for index in range(self.meta["chunks"])]
+        with io.BufferedReader(ConcatenatedReader(paths), BLOCK_SIZE) as reader:
+            content = File(reader, name=self.meta["name"])
+            content.size = self.meta["size"]
+            try:
+                verify_image(content)
+            except UploadError:
+                self.delete()
+                raise
+            filename = get_valid_filename(os.path.basename(self.meta["name"]))
+            name = get_storage().save(get_upload_path() + filename, content)
+        self.delete()
+        return name
+
+    def delete(self):
+        """Delete the chunks of this upload."""
+        shutil.rmtree(self.directory, ignore_errors=True)
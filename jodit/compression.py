@@ -0,0 +1,52 @@
+"""Decompression of editor values compressed by the browser before submit."""
+
+import base64
+import binascii
+import zlib
+
+from django.conf import settings
+
+# Suffix of the field carrying the base64 encoded, gzip compressed value
+COMPRESSED_VALUE_SUFFIX = "__jodit_gzip"
+
+
+class DecompressionError(ValueError):
+    """Raised when a compressed value is invalid or too large."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def get_max_size():
+    """Return the maximum size of a decompressed value, in bytes."""
+    return getattr(settings, "JODIT_MAX_DECOMPRESSED_SIZE", 10 * 1024 * 1024)
+
+
+def decompress_value(payload, max_size=None):
+    """
+    Decode and decompress a value compressed by jodit-init.js.
+
+    Decompresses at most max_size bytes, so a small payload can't expand into a
+    huge value (zip bomb). Raises DecompressionError otherwise.
+    """
+    if max_size is None:
+        max_size = get_max_size()
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise DecompressionError("Compressed value is not valid base64.", "invalid_compressed") from e
+
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    try:
+        value = decompressor.decompress(data, max_size + 1)
+    except zlib.error as e:
+        raise DecompressionError("Compressed value is not valid gzip data.", "invalid_compressed") from e
+    if len(value) > max_size or decompressor.unconsumed_tail:
+        raise DecompressionError(f"Decompressed value exceeds {max_size} bytes.", "compressed_too_large")
+    if not decompressor.eof:
+        raise DecompressionError("Compressed value is truncated.", "invalid_compressed")
+    try:
+        return value.decode()
+    except UnicodeDecodeError as e:
+        raise DecompressionError("Decompressed value is not valid UTF-8.", "invalid_compressed") from e
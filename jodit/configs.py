@@ -1,4 +1,82 @@
-"""Default configuration for Jodit editor."""
+"""Default configuration for Jodit editor, and resolution of JODIT_CONFIGS entries."""
+
+import functools
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Snapshot of the JSON-serializable Jodit.defaultOptions of the bundled Jodit
+JODIT_DEFAULTS_PATH = os.path.join(os.path.dirname(__file__), "jodit_defaults.json")
+
+# Keys only used on the server, never sent to the editor
+SERVER_ONLY_KEYS = {"extends", "stripDefaults", "prunePlugins", "normalizeHTML"}
+
+# Keys interpreted by jodit-init.js when missing, so never stripped
+PRESERVED_KEYS = {"theme"}
+
+# Toolbar buttons provided by each plugin that can be disabled when none of
+# them is on a toolbar. Only plugins whose buttons are their sole entry point
+# are listed: plugins registering commands or hotkeys (bold, link, indent,
+# justify, orderedList, search, ...), opening dialogs from the content
+# (imageProperties) or working outside the toolbar (clipboard, cleanHtml,
+# enter, paste, ...) are never pruned for their buttons.
+PLUGIN_BUTTONS = {
+    "about": {"about"},
+    "copyformat": {"copyformat"},
+    "file": {"file"},
+    "fullsize": {"fullsize"},
+    "image": {"image"},
+    "print": {"print"},
+    "source": {"source"},
+    "symbols": {"symbols", "symbol"},
+    "table": {"table"},
+    "video": {"video"},
+}
+
+# Options that keep a plugin in use whatever the toolbar shows, given as
+# (option, value) pairs: the plugin is needed unless every option is equal
+# to its value, Jodit's default being used for missing options.
+PLUGIN_OPTIONS = {
+    "fullsize": [("fullsize", False)],
+    "iframe": [("iframe", False)],
+    "limit": [("limitChars", False), ("limitWords", False), ("limitHTML", False)],
+    "mobile": [("toolbarAdaptive", False)],
+    "pasteFromWord": [("askBeforePasteFromWord", False), ("processPasteFromWord", False)],
+    "placeholder": [("showPlaceholder", False)],
+    "search": [("useSearch", False)],
+    "source": [("defaultMode", 1)],
+    "stat": [("showCharsCounter", False), ("showWordsCounter", False)],
+    "sticky": [("toolbarSticky", False)],
+    "xpath": [("showXPathInStatusbar", False)],
+}
+
+# Options deciding which plugins are unused
+PRUNING_KEYS = sorted(
+    {"toolbar", "toolbarAdaptive", "buttons", "extraButtons", "buttonsMD", "buttonsSM", "buttonsXS", "removeButtons"}
+    | {key for options in PLUGIN_OPTIONS.values() for key, value in options}
+)
+
+# Buttons Jodit's plugins put in each toolbar group
+GROUP_BUTTONS = {
+    "clipboard": {"copyformat", "cut", "copy", "paste", "selectall"},
+    "color": {"brush"},
+    "font": {"font", "fontsize", "paragraph", "lineHeight"},
+    "font-style": {"bold", "italic", "underline", "strikethrough", "eraser"},
+    "history": {"undo", "redo"},
+    "indent": {"align", "indent", "outdent"},
+    "info": {"about"},
+    "insert": {"hr", "table", "symbols", "link"},
+    "list": {"ul", "ol"},
+    "media": {"file", "image", "video"},
+    "script": {"subscript", "superscript", "classSpan"},
+    "search": {"find"},
+    "source": {"source"},
+    "state": {"spellcheck"},
+}
 
 DEFAULT_CONFIG = {
     "height": 400,
@@ -54,3 +132,167 @@ DEFAULT_CONFIG = {
     },
     "removeButtons": [],
 }
+
+
+def resolve_config(config_name):
+    """
+    Return the JODIT_CONFIGS entry config_name merged over DEFAULT_CONFIG.
+
+    An entry can name another entry in its "extends" key to be merged over it
+    instead. Configs are resolved once and cached until JODIT_CONFIGS changes;
+    callers get a shallow copy.
+    """
+    return dict(_resolve_config(config_name, ()))
+
+
+@functools.lru_cache
+def _resolve_config(config_name, chain):
+    configs = getattr(settings, "JODIT_CONFIGS", None)
+    if not configs:
+        return DEFAULT_CONFIG
+    if not isinstance(configs, dict):
+        raise ImproperlyConfigured("JODIT_CONFIGS setting must be a dictionary type.")
+    # Make sure the config_name exists.
+    if config_name not in configs:
+        raise ImproperlyConfigured(f"No configuration named '{config_name}' found in your JODIT_CONFIGS setting.")
+    config = configs[config_name]
+    # Make sure the configuration is a dictionary.
+    if not isinstance(config, dict):
+        raise ImproperlyConfigured(f'JODIT_CONFIGS["{config_name}"] setting must be a dictionary type.')
+
+    parent = config.get("extends")
+    if parent is None:
+        resolved = DEFAULT_CONFIG.copy()
+    elif parent in chain or parent == config_name:
+        cycle = " -> ".join((*chain, config_name, parent))
+        raise ImproperlyConfigured(f"JODIT_CONFIGS entries extend each other in a cycle: {cycle}.")
+    else:
+        resolved = dict(_resolve_config(parent, (*chain, config_name)))
+    # Override the base with this config.
+    resolved.update(config)
+    resolved.pop("extends", None)
+    return resolved
+
+
+@receiver(setting_changed)
+def clear_config_cache(*, setting, **kwargs):
+    """Resolve configs again when JODIT_CONFIGS changes."""
+    if setting == "JODIT_CONFIGS":
+        _resolve_config.cache_clear()
+
+
+@functools.lru_cache
+def get_jodit_defaults():
+    """Return the default options of the bundled Jodit version."""
+    with open(JODIT_DEFAULTS_PATH, encoding="utf-8") as f:
+        return json.load(f)["options"]
+
+
+def _same(value, default):
+    # Unlike ==, tells booleans from numbers, which Jodit treats differently
+    if isinstance(value, dict) and isinstance(default, dict):
+        return value.keys() == default.keys() and all(_same(value[k], default[k]) for k in value)
+    if isinstance(value, (list, tuple)) and isinstance(default, list):
+        return len(value) == len(default) and all(_same(v, d) for v, d in zip(value, default, strict=True))
+    if isinstance(value, bool) or isinstance(default, bool):
+        return type(value) is type(default) and value == default
+    return value == default
+
+
+def strip_defaults(config, defaults):
+    """
+    Return config without the options equal to Jodit's defaults.
+
+    Jodit merges nested option objects with its defaults, so they are
+    stripped recursively.
+    """
+    stripped = {}
+    for key, value in config.items():
+        if key in defaults and key not in PRESERVED_KEYS:
+            default = defaults[key]
+            if isinstance(value, dict) and isinstance(default, dict):
+                value = strip_defaults(value, default)
+                if not value:
+                    continue
+            elif _same(value, default):
+                continue
+        stripped[key] = value
+    return stripped
+
+
+def get_client_config(config):
+    """
+    Return the part of a resolved config sent to the editor.
+
+    Server-only keys are removed. Plugins the config never uses are added to
+    disablePlugins when the config's "prunePlugins" key, or otherwise
+    settings.JODIT_PRUNE_PLUGINS, is true. Options equal to Jodit's defaults
+    are removed too when the config's "stripDefaults" key, or otherwise
+    settings.JODIT_STRIP_DEFAULTS, is true.
+    """
+    client_config = {key: value for key, value in config.items() if key not in SERVER_ONLY_KEYS}
+    if config.get("prunePlugins", getattr(settings, "JODIT_PRUNE_PLUGINS", False)):
+        client_config["disablePlugins"] = _disable_plugins(config)
+    if config.get("stripDefaults", getattr(settings, "JODIT_STRIP_DEFAULTS", False)):
+        client_config = strip_defaults(client_config, get_jodit_defaults())
+    return client_config
+
+
+def _toolbar_buttons(items):
+    buttons = set()
+    for item in items:
+        if isinstance(item, str):
+            buttons.add(item)
+        elif isinstance(item, dict):
+            if "group" in item:
+                buttons |= GROUP_BUTTONS.get(item["group"], set())
+                buttons |= _toolbar_buttons(item.get("buttons", []))
+            elif "name" in item:
+                buttons.add(item["name"])
+    return buttons
+
+
+def get_unused_plugins(config, defaults):
+    """
+    Return the names of the plugins a config never uses, sorted.
+
+    A plugin is unused when none of its buttons is on a toolbar the editor
+    can show (including the adaptive toolbars of narrow screens) and none of
+    the options it implements is enabled.
+    """
+
+    def option(key):
+        return config.get(key, defaults.get(key))
+
+    buttons = set()
+    if option("toolbar"):
+        toolbars = ["buttons", "extraButtons"]
+        if option("toolbarAdaptive"):
+            toolbars += ["buttonsMD", "buttonsSM", "buttonsXS"]
+        for toolbar in toolbars:
+            buttons |= _toolbar_buttons(option(toolbar) or [])
+        buttons -= set(option("removeButtons") or [])
+
+    unused = []
+    for plugin in sorted(PLUGIN_BUTTONS.keys() | PLUGIN_OPTIONS.keys()):
+        if buttons & PLUGIN_BUTTONS.get(plugin, set()):
+            continue
+        if any(not _same(option(key), value) for key, value in PLUGIN_OPTIONS.get(plugin, [])):
+            continue
+        unused.append(plugin)
+    return unused
+
+
+def _disable_plugins(config):
+    disabled = config.get("disablePlugins") or []
+    if isinstance(disabled, str):
+        # Jodit also accepts a comma-separated string
+        disabled = [name.strip() for name in disabled.split(",") if name.strip()]
+    # Only the options deciding which plugins are unused are part of the key
+    key = json.dumps({key: config[key] for key in PRUNING_KEYS if key in config}, default=str)
+    return list(disabled) + [name for name in _get_unused_plugins(key) if name not in disabled]
+
+
+@functools.lru_cache(maxsize=128)
+def _get_unused_plugins(key):
+    return get_unused_plugins(json.loads(key), get_jodit_defaults())
@@ -0,0 +1,48 @@
+"""Out-of-band loading of large initial widget values."""
+
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+
+from .settings import get_cache
+
+# Suffix of the hidden input carrying the token of a deferred value
+DEFERRED_VALUE_SUFFIX = "__jodit_deferred"
+
+SALT = "jodit.deferred-value"
+
+
+def get_timeout():
+    """Return how long deferred values stay available, in seconds."""
+    return getattr(settings, "JODIT_DEFERRED_VALUE_TIMEOUT", 60 * 60)
+
+
+def defer_value(value):
+    """
+    Store value out of band and return a signed token to fetch it with.
+
+    The token is derived from the content, so rendering the same value twice
+    yields the same URL and browsers can reuse their cached response. Returns
+    None if the cache did not keep the value, e.g. because it is larger than
+    memcached's 1 MB item limit, and the value must be inlined instead.
+    """
+    digest = hashlib.sha256(value.encode()).hexdigest()
+    key = f"jodit:value:{digest}"
+    cache = get_cache()
+    # Values stored by an earlier render only get their expiry extended
+    if not cache.touch(key, get_timeout()):
+        cache.add(key, value, get_timeout())
+        # Backends drop values over their size limit without an error
+        if not cache.has_key(key):
+            return None
+    return signing.Signer(salt=SALT).sign(digest)
+
+
+def load_deferred_value(token):
+    """Return the value stored for token, or None if invalid or expired."""
+    try:
+        digest = signing.Signer(salt=SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    return get_cache().get(f"jodit:value:{digest}")
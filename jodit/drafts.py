@@ -0,0 +1,35 @@
+"""Server-side store for autosaved editor drafts."""
+
+import hashlib
+import time
+
+from django.conf import settings
+
+from .settings import get_cache
+
+
+def get_max_size():
+    """Return the maximum length of a draft, in characters."""
+    return getattr(settings, "JODIT_DRAFT_MAX_SIZE", 5 * 1024 * 1024)
+
+
+def _cache_key(user, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"jodit:draft:{user.pk}:{digest}"
+
+
+def get_draft(user, key):
+    """Return the draft of user for key as {"value", "updated"}, or None."""
+    return get_cache().get(_cache_key(user, key))
+
+
+def save_draft(user, key, value):
+    """Store a draft of user for key and return it."""
+    draft = {"value": value, "updated": int(time.time() * 1000)}
+    get_cache().set(_cache_key(user, key), draft, getattr(settings, "JODIT_DRAFT_TIMEOUT", 7 * 24 * 60 * 60))
+    return draft
+
+
+def delete_draft(user, key):
+    """Forget the draft of user for key."""
+    get_cache().delete(_cache_key(user, key))
@@ -1,9 +1,12 @@
 """Jodit form and model fields for Django."""
 
 from django import forms
+from django.core.exceptions import ValidationError
 from django.db import models
 
-from jodit.widgets import JoditWidget
+from jodit.instrumentation import timed
+from jodit.normalizer import get_normalize_options, normalize_html
+from jodit.widgets import VALUE_ERROR_MESSAGES, InvalidValue, JoditWidget
 
 
 class RichTextField(models.TextField):
@@ -32,12 +35,31 @@ class RichTextFormField(forms.CharField):
     """
     A form field that uses JoditWidget.
 
+    Cleaned values are normalized with normalize_html() when the config
+    enables "normalizeHTML".
+
     Example usage in forms:
         content = RichTextFormField(config_name='default')
     """
 
     widget = JoditWidget
+    default_error_messages = VALUE_ERROR_MESSAGES
 
     def __init__(self, config_name="default", *args, **kwargs):
         kwargs["widget"] = self.widget(config_name=config_name)
         super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        """Reject values the widget could not resolve."""
+        if isinstance(value, InvalidValue):
+            raise ValidationError(self.error_messages[value.code], code=value.code)
+        return super().to_python(value)
+
+    def clean(self, value):
+        with timed("field.clean", config=self.widget.config_name):
+            value = super().clean(value)
+            options = get_normalize_options(self.widget.config)
+            if options is not None:
+                with timed("field.normalize", config=self.widget.config_name):
+                    value = normalize_html(value, **options)
+            return value
@@ -0,0 +1,181 @@
+"""Responsive images for content referencing editor uploads."""
+
+import io
+import os
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.urls import reverse
+
+from .instrumentation import timed
+from .settings import get_cache, get_storage, get_upload_path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+
+# Formats that can be resized without losing animation or vectors
+RESIZABLE_FORMATS = {".jpg", ".jpeg", ".png", ".webp"}
+
+VARIANTS_DIR = "variants"
+
+EXIF_ORIENTATION = 0x0112
+
+
+def get_widths():
+    """Return the widths of the generated image variants, in pixels."""
+    return sorted(getattr(settings, "JODIT_IMAGE_WIDTHS", [320, 640, 960, 1280, 1920]))
+
+
+def is_managed(name):
+    """Return whether name is an original image uploaded through the editor."""
+    upload_path = get_upload_path()
+    return (
+        name.startswith(upload_path)
+        and not name.startswith(f"{upload_path}{VARIANTS_DIR}/")
+        and ".." not in name.split("/")
+        and os.path.splitext(name)[1].lower() in RESIZABLE_FORMATS
+    )
+
+
+def storage_name_from_url(url):
+    """Return the storage name of an editor upload from its URL, or None."""
+    base_url = get_storage().url("")
+    if not url.startswith(base_url):
+        return None
+    name = url[len(base_url) :].split("?")[0]
+    return name if is_managed(name) else None
+
+
+def variant_name(name, width):
+    """Return the storage name of the variant of an upload at width."""
+    upload_path = get_upload_path()
+    return f"{upload_path}{VARIANTS_DIR}/{width}/{name[len(upload_path) :]}"
+
+
+def get_image_size(name):
+    """Return the (width, height) of a stored image, or None if unreadable."""
+    if Image is None:
+        return None
+    key = f"jodit:image-size:{name}"
+    size = get_cache().get(key)
+    if size is None:
+        try:
+            with get_storage().open(name) as f, Image.open(f) as image:
+                size = image.size
+                # Browsers display the image rotated according to its EXIF orientation
+                if image.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+                    size = size[::-1]
+        except (OSError, ValueError):
+            return None
+        get_cache().set(key, size, None)
+    return tuple(size)
+
+
+def generate_variant(name, width):
+    """
+    Create the variant of an upload at width unless it exists, and return its name.
+
+    Safe to call repeatedly: existing variants are kept as they are. Returns
+    None if the upload is not a readable image, e.g. corrupt or truncated.
+    """
+    storage = get_storage()
+    target = variant_name(name, width)
+    if not storage.exists(target):
+        try:
+            with storage.open(name) as f, Image.open(f) as original:
+                image_format = original.format
+                image = ImageOps.exif_transpose(original)
+                image.thumbnail((width, image.height))
+                buffer = io.BytesIO()
+                image.save(buffer, format=image_format, quality=85, optimize=True)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+        saved = storage.save(target, ContentFile(buffer.getvalue()))
+        if saved != target:
+            # Another process created it meanwhile
+            storage.delete(saved)
+    get_cache().set(f"jodit:image-variant:{target}", True, None)
+    return target
+
+
+def generate_variants(name):
+    """
+    Create all variants of an upload narrower than the image, and return their names.
+
+    Queued for uploaded files by the upload views when JODIT_JOBS is enabled.
+    """
+    if Image is None or not is_managed(name):
+        return []
+    size = get_image_size(name)
+    if size is None:
+        return []
+    variants = (generate_variant(name, width) for width in get_widths() if width < size[0])
+    return [variant for variant in variants if variant is not None]
+
+
+def variant_url(name, width):
+    """Return the URL of a variant, through the generating view until it exists."""
+    target = variant_name(name, width)
+    if get_cache().get(f"jodit:image-variant:{target}"):
+        return get_storage().url(target)
+    return reverse("jodit:image_variant", args=[width, name])
+
+
+class _AttributeParser(HTMLParser):
+    def handle_starttag(self, tag, attrs):
+        self.attrs = attrs
+
+    handle_startendtag = handle_starttag
+
+
+def _parse_attrs(tag):
+    parser = _AttributeParser()
+    parser.attrs = []
+    parser.feed(tag)
+    parser.close()
+    return dict(parser.attrs)
+
+
+def _build_srcset(name, size, attrs):
+    widths = [w for w in get_widths() if w < size[0]]
+    if not widths:
+        return
+    srcset = [f"{variant_url(name, w)} {w}w" for w in widths]
+    srcset.append(f"{attrs['src']} {size[0]}w")
+    attrs["srcset"] = ", ".join(srcset)
+    attrs.setdefault("sizes", getattr(settings, "JODIT_IMAGE_SIZES", "100vw"))
+
+
+def rewrite_image_tag(tag):
+    """Return an <img> tag with srcset/sizes, lazy loading and dimensions added."""
+    attrs = _parse_attrs(tag)
+    if not attrs.get("src"):
+        return tag
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+
+    name = storage_name_from_url(attrs["src"])
+    size = get_image_size(name) if name else None
+    if size:
+        if "width" not in attrs and "height" not in attrs:
+            attrs["width"], attrs["height"] = str(size[0]), str(size[1])
+        if "srcset" not in attrs:
+            _build_srcset(name, size, attrs)
+
+    rendered = "".join(f" {k}" if v is None else f' {k}="{escape(v)}"' for k, v in attrs.items())
+    return f"<img{rendered}>"
+
+
+def responsive_images(html):
+    """Rewrite all <img> tags of html with rewrite_image_tag()."""
+    if not html or "<img" not in html.lower():
+        return html
+    with timed("images.responsive"):
+        return IMG_TAG_RE.sub(lambda match: rewrite_image_tag(match.group(0)), html)
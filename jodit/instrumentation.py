@@ -0,0 +1,120 @@
+"""
+Timing hooks around the work django-jodit does while handling a request.
+
+Timings are sent to the collectors listed in settings.JODIT_COLLECTORS and to
+lists set up with record_timings(). When neither is in use, timed() returns a
+shared no-op context manager.
+"""
+
+import contextlib
+import functools
+import socket
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+_NULL_TIMER = contextlib.nullcontext()
+
+# Timings of the current context, only collected inside record_timings()
+_recorded_timings = ContextVar("jodit_recorded_timings", default=None)
+
+
+class Collector:
+    """
+    Base class of timing collectors.
+
+    Subclasses are listed by dotted path in settings.JODIT_COLLECTORS and
+    instantiated without arguments once per process.
+    """
+
+    def timing(self, name, duration, tags):
+        """Record that the operation name took duration seconds."""
+        raise NotImplementedError
+
+
+class StatsdCollector(Collector):
+    """
+    Send timings to a statsd server over UDP.
+
+    The server is configured with JODIT_STATSD_HOST (default "localhost") and
+    JODIT_STATSD_PORT (default 8125), metric names are prefixed with
+    JODIT_STATSD_PREFIX (default "jodit").
+    """
+
+    def __init__(self):
+        self.address = (
+            getattr(settings, "JODIT_STATSD_HOST", "localhost"),
+            getattr(settings, "JODIT_STATSD_PORT", 8125),
+        )
+        self.prefix = getattr(settings, "JODIT_STATSD_PREFIX", "jodit")
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def timing(self, name, duration, tags):
+        metric = f"{self.prefix}.{name}:{duration * 1000:.3f}|ms"
+        # Metrics are best effort and must never break a request
+        with contextlib.suppress(OSError):
+            self.socket.sendto(metric.encode(), self.address)
+
+
+@functools.lru_cache
+def get_collectors():
+    """Return instances of the collectors configured in JODIT_COLLECTORS."""
+    return tuple(import_string(path)() for path in getattr(settings, "JODIT_COLLECTORS", []))
+
+
+@receiver(setting_changed)
+def clear_collectors(*, setting, **kwargs):
+    """Recreate collectors when their settings change."""
+    if setting.startswith("JODIT_"):
+        get_collectors.cache_clear()
+
+
+class _Timer:
+    __slots__ = ("name", "tags", "collectors", "recorded", "start")
+
+    def __init__(self, name, tags, collectors, recorded):
+        self.name = name
+        self.tags = tags
+        self.collectors = collectors
+        self.recorded = recorded
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        for collector in self.collectors:
+            collector.timing(self.name, duration, self.tags)
+        if self.recorded is not None:
+            self.recorded.append((self.name, duration, self.tags))
+
+
+def timed(name, **tags):
+    """
+    Return a context manager timing the operation name.
+
+    Example usage:
+        with timed("widget.render", config="default"):
+            ...
+    """
+    collectors = get_collectors()
+    recorded = _recorded_timings.get()
+    if not collectors and recorded is None:
+        return _NULL_TIMER
+    return _Timer(name, tags, collectors, recorded)
+
+
+@contextlib.contextmanager
+def record_timings():
+    """Collect the (name, duration, tags) timings of the current context in the yielded list."""
+    timings = []
+    token = _recorded_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _recorded_timings.reset(token)
@@ -0,0 +1,80 @@
+"""Database-backed queue of background jobs, run by the jodit_worker command."""
+
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+def get_timeout():
+    """Return after how many seconds a running job is considered abandoned."""
+    return getattr(settings, "JODIT_JOB_TIMEOUT", 600)
+
+
+def get_retry_delay(attempts):
+    """Return the delay before retrying a job that failed attempts times, doubling each time."""
+    base = getattr(settings, "JODIT_JOB_RETRY_DELAY", 10)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def enqueue(task, **payload):
+    """
+    Queue a call of the callable at dotted path task with payload as keyword arguments.
+
+    Example usage:
+        enqueue("jodit.images.generate_variants", name="jodit/photo.png")
+    """
+    return Job.objects.create(task=task, payload=payload)
+
+
+def enqueue_many(calls):
+    """Queue several (task, payload) calls at once."""
+    return Job.objects.bulk_create([Job(task=task, payload=payload) for task, payload in calls])
+
+
+def claim_jobs(limit):
+    """
+    Mark up to limit due jobs as running and return them.
+
+    Jobs locked by other workers are skipped, and jobs running for longer than
+    JODIT_JOB_TIMEOUT seconds are taken over, as their worker presumably died.
+    """
+    now = timezone.now()
+    due = Q(status=Job.PENDING, run_at__lte=now) | Q(
+        status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=get_timeout())
+    )
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True).filter(due).order_by("run_at")[:limit])
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.RUNNING, locked_at=now, attempts=F("attempts") + 1
+        )
+    for job in jobs:
+        job.status, job.locked_at, job.attempts = Job.RUNNING, now, job.attempts + 1
+    return jobs
+
+
+def run_job(job):
+    """
+    Run a claimed job and return whether it succeeded.
+
+    Successful jobs are deleted. Failed jobs are retried later with exponential
+    backoff until they reach their max_attempts.
+    """
+    try:
+        import_string(job.task)(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED, locked_at=None, last_error=error)
+        else:
+            run_at = timezone.now() + get_retry_delay(job.attempts)
+            Job.objects.filter(pk=job.pk).update(status=Job.PENDING, locked_at=None, run_at=run_at, last_error=error)
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
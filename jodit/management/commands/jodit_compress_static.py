@@ -0,0 +1,61 @@
+"""Write precompressed, content-hashed copies of the bundled Jodit assets."""
+
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from jodit.precompressed import ASSETS, MANIFEST_NAME, load_manifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = "Write Brotli and gzip compressed, content-hashed copies of the Jodit assets to STATIC_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--no-brotli", action="store_true", help="Only write gzip variants.")
+
+    def handle(self, *args, **options):
+        static_root = getattr(settings, "STATIC_ROOT", None)
+        if not static_root:
+            raise CommandError("The STATIC_ROOT setting is required to write precompressed assets.")
+        use_brotli = not options["no_brotli"]
+        if use_brotli and brotli is None:
+            self.stderr.write("The brotli package is not installed, only writing gzip variants.")
+            use_brotli = False
+
+        manifest = {}
+        for name in ASSETS:
+            path = finders.find(name)
+            if path is None:
+                raise CommandError(f"Could not find static file '{name}'.")
+            with open(path, "rb") as f:
+                content = f.read()
+
+            root, ext = os.path.splitext(name)
+            hashed_name = f"{root}.{hashlib.md5(content, usedforsecurity=False).hexdigest()[:12]}{ext}"
+            target = os.path.join(static_root, hashed_name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+
+            self._write(target, content)
+            self._write(target + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+            if use_brotli:
+                self._write(target + ".br", brotli.compress(content, quality=11))
+            manifest[name] = hashed_name
+            self.stdout.write(f"{name} -> {hashed_name}")
+
+        self._write(os.path.join(static_root, MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+        load_manifest.cache_clear()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(manifest)} precompressed assets."))
+
+    def _write(self, path, content):
+        with open(path, "wb") as f:
+            f.write(content)
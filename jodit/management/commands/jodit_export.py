@@ -0,0 +1,106 @@
+"""Export the rich text content of a model as Markdown, plain text or NDJSON."""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jodit.management.utils import get_model, get_rich_text_fields
+from jodit.text import html_to_markdown, html_to_text
+
+FORMATS = ("markdown", "text", "ndjson")
+
+CONVERTERS = {"markdown": html_to_markdown, "text": html_to_text}
+
+
+def convert_rows(rows, label, names, output_format, ndjson_content):
+    """Return the export of a batch of (pk, *values) rows, run by the worker processes."""
+    if output_format == "ndjson":
+        convert = CONVERTERS[ndjson_content]
+        lines = []
+        for pk, *values in rows:
+            record = {"model": label, "pk": pk}
+            record.update((name, convert(value) if value else "") for name, value in zip(names, values, strict=True))
+            lines.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        return "".join(lines)
+
+    convert = CONVERTERS[output_format]
+    parts = []
+    for pk, *values in rows:
+        for name, value in zip(names, values, strict=True):
+            if not value:
+                continue
+            header = f"<!-- {label} {pk} {name} -->" if output_format == "markdown" else f"=== {label} {pk} {name} ==="
+            parts.append(f"{header}\n\n{convert(value).strip()}\n\n")
+    return "".join(parts)
+
+
+class Command(BaseCommand):
+    help = "Export the rich text fields of a model as Markdown, plain text or NDJSON, converted in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Model to export, as app_label.ModelName.")
+        parser.add_argument("--field", action="append", dest="fields", help="Only export this field (repeatable).")
+        parser.add_argument("--format", choices=FORMATS, default="markdown", help="Output format.")
+        parser.add_argument(
+            "--ndjson-content",
+            choices=tuple(CONVERTERS),
+            default="text",
+            help="Conversion of the field values in NDJSON records.",
+        )
+        parser.add_argument("--output", default="-", help="File to write to, stdout by default.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Conversion processes, 0 to convert in this process. Defaults to the number of CPUs.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows fetched per database query.")
+        parser.add_argument("--batch-size", type=int, default=100, help="Rows converted per worker task.")
+
+    def handle(self, *args, **options):
+        model = get_model(options["model"])
+        if options["workers"] < 0 or options["chunk_size"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers must not be negative, --chunk-size and --batch-size must be positive.")
+
+        names = [f.name for f in get_rich_text_fields(model, options["fields"])]
+        queryset = model._default_manager.order_by("pk").values_list("pk", *names)
+        rows = queryset.iterator(chunk_size=options["chunk_size"])
+        args = (model._meta.label_lower, names, options["format"], options["ndjson_content"])
+
+        if options["output"] == "-":
+            count = self.export(rows, args, self.stdout, options)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                count = self.export(rows, args, output, options)
+        self.stderr.write(f"Exported {count} objects.", style_func=self.style.SUCCESS)
+
+    def export(self, rows, args, output, options):
+        """Write the converted rows in order, returning their count."""
+        count = 0
+        batches = iter(lambda: list(islice(rows, options["batch_size"])), [])
+        if not options["workers"]:
+            for batch in batches:
+                self.write(output, convert_rows(batch, *args))
+                count += len(batch)
+            return count
+
+        # Bounding the batches in flight keeps memory constant whatever the table size
+        pending = deque()
+        with ProcessPoolExecutor(options["workers"]) as executor:
+            for batch in batches:
+                if len(pending) >= options["workers"] * 2:
+                    self.write(output, pending.popleft().result())
+                pending.append(executor.submit(convert_rows, batch, *args))
+                count += len(batch)
+            while pending:
+                self.write(output, pending.popleft().result())
+        return count
+
+    def write(self, output, text):
+        # OutputWrapper would end empty writes with a newline
+        if text:
+            output.write(text)
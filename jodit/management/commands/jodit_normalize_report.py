@@ -0,0 +1,44 @@
+"""Report how many bytes HTML normalization would save on stored content."""
+
+from django.core.management.base import BaseCommand
+
+from jodit.configs import resolve_config
+from jodit.management.utils import get_model, get_rich_text_fields
+from jodit.normalizer import get_normalize_options, normalize_html
+
+
+class Command(BaseCommand):
+    help = "Report the bytes that normalizing the rich text fields of a model would save, without changing data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Model to inspect, as app_label.ModelName.")
+        parser.add_argument("--field", action="append", dest="fields", help="Only inspect this field (repeatable).")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows fetched per database query.")
+
+    def handle(self, *args, **options):
+        model = get_model(options["model"])
+
+        fields = get_rich_text_fields(model, options["fields"])
+        # Fields whose config doesn't enable normalization use the default options
+        normalize_options = {f.name: get_normalize_options(resolve_config(f.config_name)) or {} for f in fields}
+        stats = {f.name: {"rows": 0, "changed": 0, "before": 0, "after": 0} for f in fields}
+
+        queryset = model._default_manager.values_list(*stats).iterator(chunk_size=options["chunk_size"])
+        for row in queryset:
+            for name, value in zip(stats, row, strict=True):
+                if not value:
+                    continue
+                normalized = normalize_html(value, **normalize_options[name])
+                field_stats = stats[name]
+                field_stats["rows"] += 1
+                field_stats["changed"] += normalized != value
+                field_stats["before"] += len(value.encode())
+                field_stats["after"] += len(normalized.encode())
+
+        for name, field_stats in stats.items():
+            saved = field_stats["before"] - field_stats["after"]
+            percent = 100 * saved / field_stats["before"] if field_stats["before"] else 0
+            self.stdout.write(
+                f"{name}: {field_stats['changed']}/{field_stats['rows']} rows changed, "
+                f"{field_stats['before']} -> {field_stats['after']} bytes ({saved} bytes saved, {percent:.1f}%)"
+            )
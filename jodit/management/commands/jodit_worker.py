@@ -0,0 +1,51 @@
+"""Run background jobs queued by django-jodit."""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jodit.jobs import claim_jobs, run_job
+
+
+def _run_in_thread(job):
+    close_old_connections()
+    try:
+        return run_job(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Run queued django-jodit jobs, such as generating image variants of uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Jobs run at the same time.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls of an empty queue.")
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        succeeded = failed = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="jodit-worker") as executor:
+            try:
+                while True:
+                    free = concurrency - len(running)
+                    if free:
+                        running.update(executor.submit(_run_in_thread, job) for job in claim_jobs(free))
+                    if not running:
+                        if options["burst"]:
+                            break
+                        time.sleep(options["interval"])
+                        continue
+                    done, running = wait(running, timeout=options["interval"], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future.result():
+                            succeeded += 1
+                        else:
+                            failed += 1
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping, waiting for running jobs to finish.")
+        self.stdout.write(f"{succeeded} jobs succeeded, {failed} failed.")
@@ -0,0 +1,27 @@
+"""Helpers shared by the management commands of django-jodit."""
+
+from django.apps import apps
+from django.core.management.base import CommandError
+
+from jodit.fields import RichTextField
+
+
+def get_model(label):
+    """Return the model named by label, as app_label.ModelName."""
+    try:
+        return apps.get_model(label)
+    except (LookupError, ValueError) as e:
+        raise CommandError(str(e)) from e
+
+
+def get_rich_text_fields(model, names=None):
+    """Return the RichTextFields of model, only those in names if given."""
+    fields = [f for f in model._meta.get_fields() if isinstance(f, RichTextField)]
+    if names:
+        fields = [f for f in fields if f.name in names]
+        missing = set(names) - {f.name for f in fields}
+        if missing:
+            raise CommandError(f"Not rich text fields of {model._meta.label}: {', '.join(sorted(missing))}")
+    if not fields:
+        raise CommandError(f"{model._meta.label} has no rich text fields.")
+    return fields
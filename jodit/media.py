@@ -0,0 +1,139 @@
+"""Serving of editor uploads that are not public."""
+
+import mimetypes
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.utils.module_loading import import_string
+
+from .settings import get_upload_path
+
+BLOCK_SIZE = 64 * 1024
+
+SENDFILE_HEADERS = {"x-accel-redirect": "X-Accel-Redirect", "x-sendfile": "X-Sendfile"}
+
+
+class RangeNotSatisfiable(Exception):
+    """A Range header asked for bytes outside of the file."""
+
+
+def is_upload(name):
+    """Return whether name is the storage name of a file uploaded through the editor."""
+    return name.startswith(get_upload_path()) and ".." not in name.split("/")
+
+
+def has_media_permission(request, name):
+    """
+    Return whether the user of request may download the upload name.
+
+    Authenticated users are allowed by default, settings.JODIT_MEDIA_PERMISSION
+    can name a callable taking the request and name instead.
+    """
+    permission = getattr(settings, "JODIT_MEDIA_PERMISSION", None)
+    if permission is not None:
+        return import_string(permission)(request, name)
+    return request.user.is_authenticated
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive (start, end) byte positions requested by a Range header.
+
+    Returns None if the header is missing, malformed or asks for several
+    ranges, in which case the whole file is served. Raises
+    RangeNotSatisfiable if the range lies outside of the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[len("bytes=") :].strip().partition("-")
+    if not sep or not (start or end) or not all(part.isdigit() for part in (start, end) if part):
+        return None
+    if not start:
+        # Suffix range, the last <end> bytes
+        if int(end) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(end), 0), size - 1
+    start, end = int(start), int(end) if end else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
+
+
+def _read_blocks(f, length):
+    try:
+        while length > 0:
+            block = f.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+def offload_response(storage, name, content_type):
+    """
+    Return a response handing the transfer of name to the front-end server, or None.
+
+    Uses the header configured in settings.JODIT_MEDIA_SENDFILE:
+    "x-accel-redirect" (nginx) redirects to JODIT_MEDIA_ACCEL_PREFIX followed by
+    the storage name, "x-sendfile" (Apache, lighttpd) sends the file's path.
+    """
+    mode = getattr(settings, "JODIT_MEDIA_SENDFILE", None)
+    if mode is None:
+        return None
+    if mode not in SENDFILE_HEADERS:
+        raise ImproperlyConfigured(f"JODIT_MEDIA_SENDFILE must be one of {', '.join(SENDFILE_HEADERS)} or None.")
+    response = HttpResponse(content_type=content_type)
+    if mode == "x-accel-redirect":
+        response["X-Accel-Redirect"] = getattr(settings, "JODIT_MEDIA_ACCEL_PREFIX", "/protected/") + quote(name)
+    else:
+        response["X-Sendfile"] = storage.path(name)
+    return response
+
+
+def file_response(request, storage, name, size, validators, content_type):
+    """
+    Return a response streaming name from storage, or the byte range requested by the client.
+
+    validators are the ETag and Last-Modified values; an If-Range header matching
+    neither makes the whole file be sent.
+    """
+    requested = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range not in validators:
+        requested = None
+    try:
+        byte_range = parse_range(requested, size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+    else:
+        f = storage.open(name, "rb")
+        f.seek(start)
+        response = StreamingHttpResponse(_read_blocks(f, length), content_type=content_type)
+    response["Content-Length"] = str(length)
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def media_response(request, storage, name, size, validators):
+    """Return the response transferring name of size bytes, offloaded or streamed."""
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    response = offload_response(storage, name, content_type)
+    if response is None:
+        response = file_response(request, storage, name, size, validators, content_type)
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Disposition"] = content_disposition_header(False, name.rsplit("/", 1)[-1])
+    return response
@@ -0,0 +1,78 @@
+"""Aggregation of editor performance timings reported by browsers."""
+
+import math
+
+from django.conf import settings
+
+from .settings import get_cache
+
+# Timings reported by jodit-init.js, in milliseconds unless noted
+METRICS = {
+    "script_ready": "Time from navigation start until Jodit and jodit-init.js are ready",
+    "make": "Duration of Jodit.make per editor",
+    "editor_ready": "Time from navigation start until an editor is usable",
+    "editors": "Number of editors on a page (count)",
+    "config_size": "Size of an editor's serialized config (bytes)",
+    "first_input_delay": "Delay before the first input into an editor is handled",
+}
+
+# Largest recorded value of metrics that are not durations, larger values are clamped
+MAX_VALUES = {"editors": 1000, "config_size": 10 * 1024 * 1024}
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_max_samples():
+    """Return how many recent samples are kept per metric."""
+    return getattr(settings, "JODIT_METRICS_SAMPLES", 1000)
+
+
+def get_max_value(name):
+    """Return the largest value recorded for a metric, durations defaulting to one minute."""
+    return MAX_VALUES.get(name, getattr(settings, "JODIT_METRICS_MAX_DURATION", 60 * 1000))
+
+
+def record(samples):
+    """
+    Add reported samples to the per-metric reservoirs in the cache.
+
+    Samples are {"name", "value"} dictionaries; unknown names and values that
+    are not finite, non-negative numbers are ignored, and values above
+    get_max_value() are clamped. Returns the number of samples recorded.
+    """
+    values = {}
+    for sample in samples:
+        if not isinstance(sample, dict) or sample.get("name") not in METRICS:
+            continue
+        value = sample.get("value")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+            continue
+        values.setdefault(sample["name"], []).append(min(value, get_max_value(sample["name"])))
+
+    cache = get_cache()
+    max_samples = get_max_samples()
+    for name, new_values in values.items():
+        key = f"jodit:metrics:{name}"
+        # Concurrent reports may overwrite each other, which is fine for sampling.
+        reservoir = cache.get(key, []) + new_values
+        cache.set(key, reservoir[-max_samples:], None)
+    return sum(len(v) for v in values.values())
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest-rank percentile of sorted values."""
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank - 1, 0)]
+
+
+def summary():
+    """Return the sample count and percentiles of each metric."""
+    cache = get_cache()
+    result = {}
+    for name, description in METRICS.items():
+        values = sorted(cache.get(f"jodit:metrics:{name}", []))
+        stats = {"description": description, "count": len(values)}
+        for percent in PERCENTILES:
+            stats[f"p{percent}"] = percentile(values, percent) if values else None
+        result[name] = stats
+    return result
@@ -0,0 +1,110 @@
+"""Middleware for django-jodit."""
+
+import mimetypes
+import os
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+from .precompressed import ENCODINGS, get_manifest
+from .widgets import editors_rendered, get_asset_urls
+
+
+def parse_accept_encoding(header):
+    """Return the set of content codings accepted by an Accept-Encoding header."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Serve the precompressed Jodit assets written by jodit_compress_static.
+
+    For deployments without a CDN or a front-end server configured for
+    precompressed files. Picks the Brotli or gzip variant according to the
+    Accept-Encoding header, with far-future immutable cache headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def serve(self, request):
+        static_url = settings.STATIC_URL or ""
+        if request.method not in ("GET", "HEAD") or not static_url.startswith("/"):
+            return None
+        if not request.path.startswith(static_url):
+            return None
+        name = request.path[len(static_url) :]
+        if name not in get_manifest().values():
+            return None
+
+        path = os.path.join(settings.STATIC_ROOT, name)
+        accepted = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+        encoding = None
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.exists(path + suffix):
+                encoding = coding
+                path += suffix
+                break
+
+        try:
+            # FileResponse closes the file once it has been sent.
+            f = open(path, "rb")  # noqa: SIM115
+        except FileNotFoundError:
+            # Left out of a redeploy the manifest was loaded before, static serving may still have it
+            return None
+        response = FileResponse(f, content_type=mimetypes.guess_type(name)[0])
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+
+class JoditPreloadMiddleware:
+    """
+    Add Link preload headers for the Jodit assets to pages rendering an editor.
+
+    The browser otherwise only discovers the assets when it reaches the form
+    media, often late in the page. Servers and CDNs that support 103 Early
+    Hints can promote these headers to early hints.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = editors_rendered.set([])
+        try:
+            response = self.get_response(request)
+            if editors_rendered.get():
+                self.add_preload_headers(response)
+        finally:
+            editors_rendered.reset(token)
+        return response
+
+    def add_preload_headers(self, response):
+        assets = get_asset_urls()
+        links = [f"<{url}>; rel=preload; as=style" for url in assets["css"]]
+        links += [f"<{url}>; rel=preload; as=script" for url in assets["js"]]
+        if response.has_header("Link"):
+            links.insert(0, response["Link"])
+        response["Link"] = ", ".join(links)
@@ -0,0 +1,39 @@
+"""Models for django-jodit."""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+def get_max_attempts():
+    """Return how often a job is tried before it is marked as failed."""
+    return getattr(settings, "JODIT_JOB_MAX_ATTEMPTS", 5)
+
+
+class Job(models.Model):
+    """
+    A queued call of task with payload as keyword arguments, run by the jodit_worker command.
+
+    Successful jobs are deleted, failed ones are kept with their last error.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"), (FAILED, "Failed")]
+
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=get_max_attempts)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_at"])]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
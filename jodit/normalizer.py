@@ -0,0 +1,224 @@
+"""Normalization of stored rich text, mostly markup left over by Word pastes."""
+
+from html import escape
+from html.parser import HTMLParser
+
+# Elements without content or end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+}  # fmt: skip
+
+# Elements whose content is dropped along with them
+DROPPED_ELEMENTS = {"xml"}
+
+# Elements whose whitespace is significant
+PREFORMATTED_ELEMENTS = {"pre", "textarea"}
+
+# Elements whose content is not HTML and must not be escaped
+RAW_TEXT_ELEMENTS = {"script", "style"}
+
+# Elements whose subtrees are copied unchanged, since html.parser lowercases
+# their camelCase tag and attribute names (viewBox, linearGradient, ...)
+FOREIGN_ELEMENTS = {"svg", "math"}
+
+NBSP = "\xa0"
+
+
+def collapse_nbsp(text):
+    """
+    Shorten runs of non-breaking spaces without changing how they render.
+
+    A run of n non-breaking spaces is replaced by non-breaking spaces
+    alternating with plain spaces, starting and ending with a non-breaking one,
+    so no space collapses.
+    """
+    if NBSP * 2 not in text:
+        return text
+    parts = []
+    run = 0
+    for char in text + "\0":
+        if char == NBSP:
+            run += 1
+            continue
+        if run:
+            parts.append("".join(NBSP if i % 2 == 0 or i == run - 1 else " " for i in range(run)))
+            run = 0
+        parts.append(char)
+    return "".join(parts[:-1])
+
+
+def clean_style(style):
+    """Drop mso-* and repeated declarations from a style attribute value."""
+    properties = {}
+    for declaration in style.split(";"):
+        name, sep, value = declaration.partition(":")
+        name = name.strip().lower()
+        if not sep or not name or name.startswith(("mso-", "tab-stops")):
+            continue
+        # Later declarations win, like in CSS
+        properties.pop(name, None)
+        properties[name] = value.strip()
+    return "; ".join(f"{name}: {value}" for name, value in properties.items())
+
+
+class HTMLNormalizer(HTMLParser):
+    """
+    Streaming HTML normalizer.
+
+    Feed it HTML in one or more chunks, then call close() and read the result.
+    Removes comments and Office markup (conditional comments, namespaced tags
+    like <o:p>, Mso* classes, mso-* styles), repeated style declarations, empty
+    and attribute-less spans, and shortens runs of &nbsp;. SVG and MathML
+    subtrees are kept as they are.
+    """
+
+    def __init__(self, strip_styles=False, collapse_nbsp=True, remove_empty_spans=True):
+        super().__init__(convert_charrefs=True)
+        self.strip_styles = strip_styles
+        self.collapse_nbsp = collapse_nbsp
+        self.remove_empty_spans = remove_empty_spans
+        self.output = []
+        # Number of tags and non-blank texts written, to detect empty spans
+        self.written = 0
+        # Open spans as (output index of the start tag, written count, whether it was emitted)
+        self.spans = []
+        self.dropped_depth = 0
+        self.preformatted_depth = 0
+        self.foreign_depth = 0
+        self.raw_text = False
+
+    def get_result(self):
+        return "".join(self.output)
+
+    def write(self, markup):
+        self.output.append(markup)
+        self.written += 1
+
+    def clean_attrs(self, attrs):
+        cleaned = []
+        for name, value in attrs:
+            if ":" in name and not name.startswith(("xml:", "xlink:")):
+                continue
+            if name == "class" and value:
+                value = " ".join(c for c in value.split() if not c.startswith("Mso"))
+                if not value:
+                    continue
+            if name == "style":
+                value = "" if self.strip_styles else clean_style(value or "")
+                if not value:
+                    continue
+            cleaned.append(f" {name}" if value is None else f' {name}="{escape(value)}"')
+        return "".join(cleaned)
+
+    def handle_starttag(self, tag, attrs):
+        if self.dropped_depth or tag in DROPPED_ELEMENTS:
+            self.dropped_depth += tag not in VOID_ELEMENTS
+            return
+        if self.foreign_depth or tag in FOREIGN_ELEMENTS:
+            self.foreign_depth += 1
+            self.write(self.get_starttag_text())
+            return
+        if ":" in tag:
+            return
+        attrs = self.clean_attrs(attrs)
+        if tag == "span" and self.remove_empty_spans:
+            # Spans without attributes are unwrapped, others may still turn out empty
+            self.spans.append((len(self.output), self.written, bool(attrs)))
+            if not attrs:
+                return
+        self.write(f"<{tag}{attrs}>")
+        self.preformatted_depth += tag in PREFORMATTED_ELEMENTS
+        self.raw_text = tag in RAW_TEXT_ELEMENTS
+
+    def handle_startendtag(self, tag, attrs):
+        if self.foreign_depth or tag in FOREIGN_ELEMENTS:
+            # Self-closing tags are valid in foreign content
+            if not self.dropped_depth:
+                self.write(self.get_starttag_text())
+            return
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropped_depth:
+            self.dropped_depth -= tag not in VOID_ELEMENTS
+            return
+        if self.foreign_depth:
+            # End tags match case-insensitively, so lowercase names close camelCase elements
+            self.foreign_depth -= 1
+            self.write(f"</{tag}>")
+            return
+        if ":" in tag or tag in VOID_ELEMENTS:
+            return
+        self.raw_text = False
+        self.preformatted_depth -= tag in PREFORMATTED_ELEMENTS and self.preformatted_depth > 0
+        if tag == "span" and self.spans:
+            start, written, emitted = self.spans.pop()
+            if not emitted:
+                return
+            if written + 1 == self.written:
+                # Keep the whitespace of empty spans, drop the span itself
+                whitespace = "".join(self.output[start + 1 :])
+                del self.output[start:]
+                self.output.append(whitespace)
+                self.written = written
+                return
+        self.write(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self.dropped_depth:
+            return
+        if self.raw_text:
+            self.write(data)
+            return
+        if self.foreign_depth:
+            self.write(escape(data, quote=False))
+            return
+        if self.collapse_nbsp and not self.preformatted_depth:
+            data = collapse_nbsp(data)
+        text = escape(data, quote=False).replace(NBSP, "&nbsp;")
+        if data.strip(" \t\n\r" + NBSP):
+            self.write(text)
+        else:
+            self.output.append(text)
+
+    def handle_decl(self, decl):
+        self.write(f"<!{decl}>")
+
+    def handle_comment(self, data):
+        pass
+
+    def handle_pi(self, data):
+        pass
+
+    def unknown_decl(self, data):
+        pass
+
+
+def normalize_html(html, **options):
+    """
+    Return html normalized in a single streaming pass.
+
+    Options are passed to HTMLNormalizer: strip_styles, collapse_nbsp and
+    remove_empty_spans.
+    """
+    if not html:
+        return html
+    normalizer = HTMLNormalizer(**options)
+    normalizer.feed(html)
+    normalizer.close()
+    return normalizer.get_result()
+
+
+def get_normalize_options(config):
+    """
+    Return the normalizer options of a Jodit config, or None if disabled.
+
+    Normalization is enabled with the "normalizeHTML" key, either True or a
+    dictionary of normalize_html() options.
+    """
+    options = config.get("normalizeHTML")
+    if not options:
+        return None
+    return options if isinstance(options, dict) else {}
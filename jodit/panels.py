@@ -0,0 +1,49 @@
+"""
+django-debug-toolbar panel showing the time spent in django-jodit.
+
+Example usage in settings:
+    DEBUG_TOOLBAR_PANELS = [
+        ...
+        "jodit.panels.JoditPanel",
+    ]
+"""
+
+from debug_toolbar.panels import Panel
+
+from jodit.instrumentation import record_timings
+
+
+class JoditPanel(Panel):
+    """Show how often and how long django-jodit operations ran per editor config."""
+
+    title = "Jodit"
+    template = "jodit/debug_toolbar_panel.html"
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        if not stats:
+            return ""
+        return f"{stats['editors']} editors in {stats['render_time']:.1f} ms"
+
+    def process_request(self, request):
+        with record_timings() as timings:
+            response = super().process_request(request)
+        self.timings = timings
+        return response
+
+    def generate_stats(self, request, response):
+        rows = {}
+        for name, duration, tags in getattr(self, "timings", []):
+            config = tags.get("config", "")
+            row = rows.setdefault((name, config), {"name": name, "config": config, "count": 0, "time": 0.0})
+            row["count"] += 1
+            row["time"] += duration * 1000
+        renders = [row for row in rows.values() if row["name"] == "widget.render"]
+        self.record_stats(
+            {
+                "timings": sorted(rows.values(), key=lambda row: row["time"], reverse=True),
+                "editors": sum(row["count"] for row in renders),
+                "render_time": sum(row["time"] for row in renders),
+            }
+        )
@@ -0,0 +1,57 @@
+"""Precompressed, content-hashed copies of the bundled Jodit assets."""
+
+import functools
+import json
+import os
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.templatetags.static import PrefixNode, static
+
+# Bundled assets that get precompressed and hashed copies
+ASSETS = ["jodit/jodit.min.js", "jodit/jodit.min.css", "jodit/jodit-init.js"]
+
+# Maps bundled asset names to their hashed names, written next to the copies
+MANIFEST_NAME = "jodit/precompressed.json"
+
+# Content-Encoding and file suffix of each variant, in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+@functools.lru_cache
+def load_manifest(static_root):
+    """Return the asset name mapping written by jodit_compress_static, or {}."""
+    try:
+        with open(os.path.join(static_root, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@receiver(setting_changed)
+def clear_manifest_cache(*, setting, **kwargs):
+    """Forget loaded manifests when the settings locating them change."""
+    if setting in ("STATIC_ROOT", "JODIT_PRECOMPRESSED_STATIC"):
+        load_manifest.cache_clear()
+
+
+def get_manifest():
+    """Return the manifest for STATIC_ROOT if precompressed assets are enabled."""
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if not static_root or not getattr(settings, "JODIT_PRECOMPRESSED_STATIC", False):
+        return {}
+    return load_manifest(str(static_root))
+
+
+def asset_url(name):
+    """
+    Return the URL of a bundled asset.
+
+    Uses the content-hashed copy when settings.JODIT_PRECOMPRESSED_STATIC is
+    enabled and jodit_compress_static has been run, static() otherwise.
+    """
+    hashed_name = get_manifest().get(name)
+    if hashed_name is None:
+        return static(name)
+    return PrefixNode.handle_simple("STATIC_URL") + hashed_name
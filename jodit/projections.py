@@ -0,0 +1,118 @@
+"""Projections of rich text content for APIs: html, text, excerpt:N and metrics."""
+
+import hashlib
+
+from django.conf import settings
+
+from .settings import get_cache
+from .text import excerpt, extract, get_metrics
+
+PROJECTIONS = ("html", "text", "excerpt", "metrics")
+
+DEFAULT_EXCERPT_LENGTH = 200
+
+
+class ProjectionError(ValueError):
+    """A requested projection is unknown, not allowed or malformed."""
+
+
+def get_max_excerpt_length():
+    """Return the longest excerpt clients may request."""
+    return getattr(settings, "JODIT_PROJECTION_MAX_EXCERPT", 5000)
+
+
+def parse_projections(spec, allowed=PROJECTIONS):
+    """
+    Parse a comma-separated projection list like "text,excerpt:100".
+
+    Returns a tuple of projection keys, "excerpt" always getting a length.
+    Raises ProjectionError for projections not in allowed.
+    """
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    projections = []
+    for item in spec:
+        name, sep, arg = item.strip().partition(":")
+        if not name:
+            continue
+        if name not in allowed:
+            raise ProjectionError(f"Unknown projection '{name}', choose from: {', '.join(allowed)}.")
+        if name == "excerpt":
+            length = arg or str(DEFAULT_EXCERPT_LENGTH)
+            if not length.isdigit() or not 0 < int(length) <= get_max_excerpt_length():
+                raise ProjectionError(f"Excerpt length must be between 1 and {get_max_excerpt_length()}.")
+            name = f"excerpt:{int(length)}"
+        elif sep:
+            raise ProjectionError(f"Projection '{name}' takes no argument.")
+        if name not in projections:
+            projections.append(name)
+    return tuple(projections)
+
+
+def compute_projections(html, projections):
+    """Return a dictionary of the given projections of html, other than "html"."""
+    values = {}
+    # Text and metrics come from parsing the whole document once
+    extractor = None
+    for projection in projections:
+        name, _, arg = projection.partition(":")
+        if name == "excerpt":
+            values[projection] = excerpt(html, int(arg))
+            continue
+        if extractor is None:
+            extractor = extract(html)
+        values[projection] = extractor.get_text() if name == "text" else get_metrics(extractor)
+    return values
+
+
+def project(html, projections):
+    """
+    Return a dictionary of the projections of html, keyed by projection name.
+
+    Only the requested projections are computed. They are cached by a digest
+    of html for settings.JODIT_PROJECTION_TIMEOUT seconds (one day by
+    default), so each version of the content is converted once.
+    """
+    if html is None:
+        return None
+    values = {"html": html}
+    computed = [projection for projection in projections if projection != "html"]
+    if computed:
+        digest = hashlib.sha256(html.encode()).hexdigest()
+        keys = {f"jodit:projection:{digest}:{projection}": projection for projection in computed}
+        cache = get_cache()
+        values.update((keys[key], value) for key, value in cache.get_many(keys).items())
+        missing = compute_projections(html, [projection for projection in keys.values() if projection not in values])
+        if missing:
+            values.update(missing)
+            cache.set_many(
+                {key: missing[projection] for key, projection in keys.items() if projection in missing},
+                getattr(settings, "JODIT_PROJECTION_TIMEOUT", 24 * 60 * 60),
+            )
+    return {projection.partition(":")[0]: values[projection] for projection in projections}
+
+
+class RichTextProjector:
+    """
+    Serializer of rich text values to their projections, without dependencies.
+
+    default is used when a client does not request projections, allowed limits
+    which ones it may request.
+
+    Example usage:
+        projector = RichTextProjector(default="excerpt:200")
+        data = {"content": projector.to_representation(post.content, request.GET.get("projections"))}
+    """
+
+    def __init__(self, default="html", allowed=PROJECTIONS):
+        self.allowed = tuple(allowed)
+        self.default = parse_projections(default, self.allowed)
+
+    def get_projections(self, spec=None):
+        """Return the parsed projections of spec, the default ones if empty."""
+        projections = parse_projections(spec, self.allowed) if spec else ()
+        return projections or self.default
+
+    def to_representation(self, value, spec=None):
+        """Return the projections of value requested by spec."""
+        return project(value, self.get_projections(spec))
@@ -0,0 +1,75 @@
+"""Rendering of JoditWidget markup without the template engine."""
+
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+# Output of jodit/widget.html rendered by Django's form renderer, split into
+# the fragments between its variables.
+WRAPPER_START = '<div class="django-jodit-widget" data-field-id="'
+WRAPPER_STYLE = '" style="display: inline-block; width: 100%;"'
+PREVIEW_START = '<div class="django-jodit-preview" data-for="'
+PREVIEW_END = '" tabindex="0" role="button" title="Click to edit"></div>\n    '
+INDENT = ">\n    "
+END = "</textarea>\n</div>"
+
+
+def render_attrs(attrs):
+    """Render attributes like django/forms/widgets/attrs.html."""
+    parts = []
+    for name, value in attrs.items():
+        if value is False:
+            continue
+        if value is True:
+            parts.append(f" {conditional_escape(name)}")
+        else:
+            parts.append(f' {conditional_escape(name)}="{conditional_escape(value)}"')
+    return "".join(parts)
+
+
+def render_widget(widget):
+    """
+    Return the markup of jodit/widget.html for the "widget" context of JoditWidget.
+
+    Variables are escaped with conditional_escape(), like the template engine
+    does with autoescaping, so both produce identical output.
+    """
+    field_id = conditional_escape(widget["attrs"].get("id", ""))
+    deferred_url = widget.get("deferred_url")
+    parts = [WRAPPER_START, field_id, WRAPPER_STYLE]
+    service_worker = widget.get("service_worker")
+    if service_worker:
+        parts.append(
+            f' data-jodit-sw="{conditional_escape(service_worker["url"])}"'
+            f' data-jodit-sw-scope="{conditional_escape(service_worker["scope"])}"'
+        )
+    if widget.get("metrics_url"):
+        parts.append(f' data-jodit-metrics="{conditional_escape(widget["metrics_url"])}"')
+    parts.append(INDENT)
+    if widget["virtualize"]:
+        parts += [PREVIEW_START, field_id, PREVIEW_END]
+    if deferred_url:
+        parts.append(
+            f'<input type="hidden" name="{conditional_escape(widget["deferred_name"])}"'
+            f' value="{conditional_escape(widget["deferred_token"])}">\n    '
+        )
+    parts += [
+        f'<textarea name="{conditional_escape(widget["name"])}"',
+        render_attrs(widget["attrs"]),
+        f' data-jodit-config="{conditional_escape(widget["config"])}" data-processed="0"',
+    ]
+    if deferred_url:
+        parts.append(f' data-jodit-deferred-url="{conditional_escape(deferred_url)}"')
+    if widget.get("autosave_url"):
+        parts.append(
+            f' data-jodit-autosave-url="{conditional_escape(widget["autosave_url"])}"'
+            f' data-jodit-autosave-version="{conditional_escape(widget["autosave_version"])}"'
+        )
+    if widget.get("chunked_upload_url"):
+        parts.append(f' data-jodit-chunked-upload-url="{conditional_escape(widget["chunked_upload_url"])}"')
+    if widget["virtualize"]:
+        parts.append(" hidden")
+    parts.append(">")
+    if widget["value"]:
+        parts.append(conditional_escape(widget["value"]))
+    parts.append(END)
+    return mark_safe("".join(parts))
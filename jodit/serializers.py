@@ -0,0 +1,43 @@
+"""Django REST framework serializer field for rich text, requires djangorestframework."""
+
+from rest_framework import serializers
+
+from .projections import PROJECTIONS, ProjectionError, RichTextProjector, project
+
+
+class RichTextSerializerField(serializers.CharField):
+    """
+    Serializer field returning the projections of a RichTextField requested by the client.
+
+    Clients list projections in the "<field name>_projections" query parameter,
+    for example ?content_projections=excerpt:160,metrics, and get an object
+    with one key per projection: html, text, excerpt and metrics. Only the
+    requested projections are computed. Writes accept HTML like a CharField.
+
+    Example usage:
+        class PostSerializer(serializers.ModelSerializer):
+            content = RichTextSerializerField(default_projections="excerpt:200")
+    """
+
+    def __init__(self, default_projections="html", allowed_projections=PROJECTIONS, query_param=None, **kwargs):
+        self.projector = RichTextProjector(default_projections, allowed_projections)
+        self.query_param = query_param
+        kwargs.setdefault("allow_blank", True)
+        kwargs.setdefault("trim_whitespace", False)
+        super().__init__(**kwargs)
+
+    def get_query_param(self):
+        return self.query_param or f"{self.field_name}_projections"
+
+    def get_projections(self):
+        """Return the projections requested through the serializer's request."""
+        request = self.context.get("request")
+        params = getattr(request, "query_params", getattr(request, "GET", {}))
+        spec = params.get(self.get_query_param())
+        try:
+            return self.projector.get_projections(spec)
+        except ProjectionError as e:
+            raise serializers.ValidationError({self.get_query_param(): str(e)}) from e
+
+    def to_representation(self, value):
+        return project(value, self.get_projections())
@@ -1,6 +1,9 @@
 """Default settings for django-jodit."""
 
 from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import storages
 
 # Default Jodit configuration
 JODIT_DEFAULT_CONFIG = {
@@ -24,3 +27,41 @@ def get_config(config_name="default"):
     """
     configs = getattr(settings, "JODIT_CONFIGS", {})
     return configs.get(config_name, JODIT_DEFAULT_CONFIG)
+
+
+def get_cache():
+    """
+    Get the cache used by django-jodit.
+
+    Uses the cache alias configured in settings.JODIT_CACHE, "default" otherwise.
+    """
+    return caches[getattr(settings, "JODIT_CACHE", "default")]
+
+
+def get_storage():
+    """
+    Get the storage used for files uploaded through the editor.
+
+    Uses the storage alias configured in settings.JODIT_STORAGE, "default" otherwise.
+    """
+    return storages[getattr(settings, "JODIT_STORAGE", "default")]
+
+
+def get_upload_path():
+    """Return the storage path prefix of files uploaded through the editor."""
+    return getattr(settings, "JODIT_UPLOAD_PATH", "jodit/")
+
+
+def get_service_worker_scope():
+    """
+    Return the pages controlled by the service worker caching the Jodit assets.
+
+    settings.JODIT_SERVICE_WORKER_SCOPE must be set, e.g. to "/admin/": a
+    site-wide default would replace a service worker the site registers itself.
+    """
+    scope = getattr(settings, "JODIT_SERVICE_WORKER_SCOPE", None)
+    if not scope:
+        raise ImproperlyConfigured(
+            "JODIT_SERVICE_WORKER_SCOPE must be set when JODIT_SERVICE_WORKER is enabled, e.g. to '/admin/'."
+        )
+    return scope
@@ -8,11 +8,68 @@
  * - Django admin dark mode (data-theme="dark")
  * - System prefers-color-scheme
  * - Custom theme settings
+ *
+ * Configs with "virtualize" enabled render a read-only preview first and
+ * only create a live Jodit instance when the preview is clicked or focused.
+ *
+ * Large values rendered with data-jodit-deferred-url are fetched from the
+ * server right before the editor is created.
+ *
+ * Configs with "autosave" enabled send debounced drafts to the draft view,
+ * falling back to localStorage when offline, and offer to restore them on
+ * load. Drafts are keyed by the version of the content they were based on.
+ *
+ * Configs with "compressSubmit" enabled gzip large values before the form is
+ * submitted, sending them in a "<name>__jodit_gzip" field instead.
+ *
+ * Configs with "imageMaxWidth"/"imageMaxHeight" downscale pasted and dropped
+ * images in a Web Worker before they are inserted as base64.
+ *
+ * Configs with "pasteCleanupWorker" clean large pasted HTML (e.g. from Word
+ * or Google Docs) in a Web Worker and insert the result asynchronously.
+ *
+ * Configs with "chunkedUpload" send large files through the uploader in
+ * checksummed chunks, several at a time, resuming interrupted uploads.
+ *
+ * When the widget is rendered with data-jodit-metrics, editor timings are
+ * recorded as performance marks and sent to the server with sendBeacon.
  */
 
 (function() {
     'use strict';
 
+    // Options handled by this script that must not be passed to Jodit.make
+    const DJANGO_OPTIONS = [
+        'virtualize', 'virtualizeMaxEditors', 'virtualizeDestroyMargin',
+        'autosave', 'autosaveDelay',
+        'compressSubmit', 'compressThreshold',
+        'imageMaxWidth', 'imageMaxHeight', 'imageFormat', 'imageQuality',
+        'pasteCleanupWorker', 'pasteCleanupThreshold', 'pasteCleanupStripStyles',
+        'chunkedUpload', 'chunkedUploadThreshold', 'chunkedUploadParallel'
+    ];
+    const DEFAULT_MAX_LIVE_EDITORS = 5;
+    const DEFAULT_AUTOSAVE_DELAY = 2000;
+    const DRAFT_STORAGE_PREFIX = 'django-jodit-draft:';
+    // sessionStorage entry listing the drafts of submitted forms
+    const SUBMITTED_DRAFTS_KEY = 'django-jodit-submitted-drafts';
+    const COMPRESSED_VALUE_SUFFIX = '__jodit_gzip';
+    const DEFAULT_COMPRESS_THRESHOLD = 64 * 1024;
+    // Formats that lose animation or vectors when drawn to a canvas
+    const UNSCALABLE_IMAGE_TYPES = ['image/gif', 'image/svg+xml'];
+    const DEFAULT_PASTE_CLEANUP_THRESHOLD = 100 * 1024;
+    const DEFERRED_VALUE_SUFFIX = '__jodit_deferred';
+    const METRICS_BATCH_SIZE = 20;
+    const DEFAULT_CHUNKED_UPLOAD_THRESHOLD = 10 * 1024 * 1024;
+    const DEFAULT_CHUNKED_UPLOAD_PARALLEL = 3;
+    const CHUNK_RETRIES = 3;
+    const UPLOAD_STORAGE_PREFIX = 'django-jodit-upload:';
+
+    // Virtualized editors that are currently live, oldest activation first
+    const liveEditors = [];
+
+    // Timings waiting to be sent to the metrics beacon
+    const pendingMetrics = [];
+
     /**
      * Detect if dark theme should be used
      * Compatible with Django admin's dark mode
@@ -41,15 +98,9 @@
     }
 
     /**
-     * Initialize a single Jodit editor instance
+     * Parse the Jodit configuration stored on a textarea
      */
-    function initJoditEditor(textarea) {
-        // Skip if already processed
-        if (textarea.getAttribute('data-processed') === '1') {
-            return;
-        }
-
-        // Get configuration from data attribute
+    function parseConfig(textarea) {
         const configData = textarea.getAttribute('data-jodit-config');
         let config = {};
 
@@ -60,6 +111,50 @@
                 console.error('Failed to parse Jodit config:', e);
             }
         }
+        return config;
+    }
+
+    /**
+     * Initialize a single Jodit editor instance
+     */
+    function initJoditEditor(textarea) {
+        // Skip if already processed or still loading its value
+        const processed = textarea.getAttribute('data-processed');
+        if (processed === '1' || processed === 'loading') {
+            return;
+        }
+
+        // Get configuration from data attribute
+        const config = parseConfig(textarea);
+        const preview = getPreview(textarea);
+
+        // Virtualized editors start as a lightweight preview
+        if (config.virtualize && preview && !textarea.joditActive) {
+            setupPreview(textarea, preview, config);
+            return;
+        }
+        if (textarea.hasAttribute('data-jodit-deferred-url')) {
+            loadDeferredValue(textarea);
+            return;
+        }
+        const options = {};
+        DJANGO_OPTIONS.forEach(function(option) {
+            options[option] = config[option];
+            delete config[option];
+        });
+
+        // Django rejects uploads without the CSRF token
+        if (config.uploader && config.uploader.url) {
+            config.uploader.headers = Object.assign(
+                {'X-CSRFToken': getCsrfToken(textarea)}, config.uploader.headers
+            );
+        }
+        if (options.chunkedUpload && textarea.hasAttribute('data-jodit-chunked-upload-url')) {
+            setupChunkedUploads(textarea, config, {
+                threshold: options.chunkedUploadThreshold || DEFAULT_CHUNKED_UPLOAD_THRESHOLD,
+                parallel: options.chunkedUploadParallel || DEFAULT_CHUNKED_UPLOAD_PARALLEL
+            });
+        }
 
         // Handle theme configuration
         // If theme is 'auto' or not specified, detect automatically
@@ -69,37 +164,997 @@
 
         // Initialize Jodit editor
         try {
+            const start = performance.now();
             const editor = Jodit.make(textarea, config);
             textarea.setAttribute('data-processed', '1');
+            measureEditor(textarea, editor, start);
 
             // Store editor instance for potential future access
             textarea.joditEditor = editor;
 
             // Watch for theme changes (Django admin theme switcher)
-            observeThemeChanges(editor, config);
+            textarea.joditStopThemeObserver = observeThemeChanges(editor, config);
+
+            if (options.compressSubmit) {
+                setupCompression(textarea, options.compressThreshold || DEFAULT_COMPRESS_THRESHOLD);
+            }
+            if (options.imageMaxWidth || options.imageMaxHeight) {
+                setupImageDownscaling(editor, {
+                    maxWidth: options.imageMaxWidth || 0,
+                    maxHeight: options.imageMaxHeight || 0,
+                    type: options.imageFormat || null,
+                    quality: options.imageQuality || 0.85
+                });
+            }
+            if (options.pasteCleanupWorker) {
+                setupPasteCleanup(editor, {
+                    threshold: options.pasteCleanupThreshold || DEFAULT_PASTE_CLEANUP_THRESHOLD,
+                    stripStyles: Boolean(options.pasteCleanupStripStyles)
+                });
+            }
+            if (options.autosave && textarea.hasAttribute('data-jodit-autosave-url')) {
+                setupAutosave(textarea, editor, options.autosaveDelay || DEFAULT_AUTOSAVE_DELAY);
+            }
         } catch (e) {
             console.error('Failed to initialize Jodit editor:', e);
         }
     }
 
+    /**
+     * Fetch a value that was too large to be inlined, then create the editor
+     *
+     * Until the value is loaded, the hidden token input lets the server keep
+     * the stored value if the form is submitted.
+     */
+    function loadDeferredValue(textarea) {
+        const url = textarea.getAttribute('data-jodit-deferred-url');
+        textarea.setAttribute('data-processed', 'loading');
+
+        fetch(url, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            })
+            .then(function(data) {
+                textarea.value = data.value;
+                textarea.removeAttribute('data-jodit-deferred-url');
+                const wrapper = textarea.closest('.django-jodit-widget');
+                const marker = wrapper && wrapper.querySelector(
+                    'input[name="' + CSS.escape(textarea.name + DEFERRED_VALUE_SUFFIX) + '"]'
+                );
+                if (marker) {
+                    marker.remove();
+                }
+                textarea.setAttribute('data-processed', '0');
+                initJoditEditor(textarea);
+            })
+            .catch(function(e) {
+                // Keep the empty textarea out of the submission so the stored value survives
+                textarea.disabled = true;
+                textarea.setAttribute('data-processed', '0');
+                console.error('Failed to load Jodit value:', e);
+            });
+    }
+
+    /**
+     * Read the CSRF token of the form containing a textarea
+     */
+    function getCsrfToken(textarea) {
+        const input = textarea.form && textarea.form.querySelector('input[name="csrfmiddlewaretoken"]');
+        if (input) {
+            return input.value;
+        }
+        const match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    /**
+     * Read a draft saved to localStorage while offline
+     */
+    function readLocalDraft(key) {
+        try {
+            return JSON.parse(window.localStorage.getItem(DRAFT_STORAGE_PREFIX + key));
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function writeLocalDraft(key, value) {
+        try {
+            window.localStorage.setItem(DRAFT_STORAGE_PREFIX + key, JSON.stringify({
+                value: value,
+                updated: Date.now()
+            }));
+        } catch (e) {
+            console.warn('Failed to store Jodit draft locally:', e);
+        }
+    }
+
+    function removeLocalDraft(key) {
+        try {
+            window.localStorage.removeItem(DRAFT_STORAGE_PREFIX + key);
+        } catch (e) {
+            // Storage unavailable, nothing to remove
+        }
+    }
+
+    /**
+     * Delete a draft from localStorage and the draft view
+     */
+    function deleteDraft(url, key, csrfToken) {
+        removeLocalDraft(key);
+        fetch(url + '?key=' + encodeURIComponent(key), {
+            method: 'DELETE',
+            credentials: 'same-origin',
+            keepalive: true,
+            headers: {'X-CSRFToken': csrfToken}
+        }).catch(function() {});
+    }
+
+    /**
+     * Offer to restore the newest of the server and local drafts into the editor
+     *
+     * A draft equal to the loaded content was saved with the form and is deleted.
+     */
+    function restoreDraft(textarea, editor, url, key) {
+        const local = readLocalDraft(key);
+        fetch(url + '?key=' + encodeURIComponent(key), {credentials: 'same-origin'})
+            .then(function(response) {
+                return response.ok ? response.json() : null;
+            })
+            .catch(function() {
+                return null;
+            })
+            .then(function(remote) {
+                let draft = remote;
+                if (local && (!draft || local.updated > draft.updated)) {
+                    draft = local;
+                }
+                if (!draft || editor.isDestructed) {
+                    return;
+                }
+                if (draft.value === editor.value) {
+                    deleteDraft(url, key, getCsrfToken(textarea));
+                    return;
+                }
+                const restore = function(yes) {
+                    if (!yes) {
+                        deleteDraft(url, key, getCsrfToken(textarea));
+                    } else if (!editor.isDestructed) {
+                        editor.value = draft.value;
+                    }
+                };
+                const message = 'An unsaved draft from ' + new Date(draft.updated).toLocaleString() +
+                    ' was found. Restore it?';
+                if (editor.confirm) {
+                    editor.confirm(message, 'Restore draft', restore);
+                } else {
+                    restore(window.confirm(message));
+                }
+            });
+    }
+
+    /**
+     * Remember the drafts of a submitted form, to delete them once it was saved
+     */
+    function markDraftSubmitted(url, key, csrfToken) {
+        try {
+            const submitted = JSON.parse(window.sessionStorage.getItem(SUBMITTED_DRAFTS_KEY)) || [];
+            submitted.push({url: url, key: key, csrfToken: csrfToken});
+            window.sessionStorage.setItem(SUBMITTED_DRAFTS_KEY, JSON.stringify(submitted));
+        } catch (e) {
+            // Storage unavailable, drafts expire on their own
+        }
+    }
+
+    /**
+     * Delete the drafts of the form submitted from the previous page if it was saved
+     *
+     * Forms redirect after a successful save, while a form with validation
+     * errors is rendered again in response to the submit, keeping its drafts.
+     */
+    function deleteSubmittedDrafts() {
+        let submitted;
+        try {
+            submitted = JSON.parse(window.sessionStorage.getItem(SUBMITTED_DRAFTS_KEY));
+            window.sessionStorage.removeItem(SUBMITTED_DRAFTS_KEY);
+        } catch (e) {
+            return;
+        }
+        const navigation = performance.getEntriesByType && performance.getEntriesByType('navigation')[0];
+        if (!submitted || !navigation || !navigation.redirectCount) {
+            return;
+        }
+        submitted.forEach(function(draft) {
+            deleteDraft(draft.url, draft.key, draft.csrfToken);
+        });
+    }
+
+    /**
+     * Send debounced drafts of an editor's changes to the draft view
+     */
+    function setupAutosave(textarea, editor, delay) {
+        const url = textarea.getAttribute('data-jodit-autosave-url');
+        // Drafts of older versions of the content are never offered
+        const key = window.location.pathname + '#' + textarea.name + '@' +
+            (textarea.getAttribute('data-jodit-autosave-version') || '');
+        let lastSaved = editor.value;
+
+        // Drafts are restored once per page, not when the editor is recreated
+        if (!textarea.joditDraftRestored) {
+            textarea.joditDraftRestored = true;
+            restoreDraft(textarea, editor, url, key);
+
+            if (textarea.form) {
+                textarea.form.addEventListener('submit', function() {
+                    clearTimeout(textarea.joditAutosaveTimer);
+                    markDraftSubmitted(url, key, getCsrfToken(textarea));
+                });
+            }
+        }
+
+        const save = function() {
+            const value = editor.isDestructed ? textarea.value : editor.value;
+            // Only send actual changes
+            if (value === lastSaved) {
+                return;
+            }
+            if (!navigator.onLine) {
+                writeLocalDraft(key, value);
+                return;
+            }
+            fetch(url, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken(textarea)},
+                body: JSON.stringify({key: key, value: value})
+            }).then(function(response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                lastSaved = value;
+                removeLocalDraft(key);
+            }).catch(function() {
+                writeLocalDraft(key, value);
+            });
+        };
+
+        editor.events.on('change', function() {
+            clearTimeout(textarea.joditAutosaveTimer);
+            textarea.joditAutosaveTimer = setTimeout(save, delay);
+        });
+        // Send drafts kept locally while offline
+        window.addEventListener('online', save);
+        editor.events.on('beforeDestruct', function() {
+            window.removeEventListener('online', save);
+        });
+    }
+
+    /**
+     * Send a request with the CSRF token and return its parsed JSON response
+     */
+    function requestJSON(url, method, csrfToken, data) {
+        const init = {
+            method: method,
+            credentials: 'same-origin',
+            headers: {'Accept': 'application/json', 'X-CSRFToken': csrfToken}
+        };
+        if (data instanceof FormData) {
+            init.body = data;
+        } else if (data) {
+            init.headers['Content-Type'] = 'application/json';
+            init.body = JSON.stringify(data);
+        }
+        return fetch(url, init).then(function(response) {
+            return response.json().catch(function() {
+                throw new Error('HTTP ' + response.status);
+            }).then(function(body) {
+                // Uploader responses describe their errors themselves
+                if (!response.ok && body.success === undefined) {
+                    throw new Error(body.error || 'HTTP ' + response.status);
+                }
+                return body;
+            });
+        });
+    }
+
+    function wait(ms) {
+        return new Promise(function(resolve) {
+            setTimeout(resolve, ms);
+        });
+    }
+
+    /**
+     * Return the hex-encoded SHA-256 of a blob, or null outside secure contexts
+     */
+    function sha256(blob) {
+        if (!window.crypto || !window.crypto.subtle) {
+            return Promise.resolve(null);
+        }
+        return blob.arrayBuffer().then(function(buffer) {
+            return window.crypto.subtle.digest('SHA-256', buffer);
+        }).then(function(digest) {
+            return Array.from(new Uint8Array(digest), function(byte) {
+                return byte.toString(16).padStart(2, '0');
+            }).join('');
+        });
+    }
+
+    /**
+     * Upload one chunk of a file, retrying with exponential backoff
+     */
+    function uploadChunk(upload, file, index, csrfToken, attempt) {
+        const chunk = file.slice(index * upload.chunkSize, (index + 1) * upload.chunkSize);
+        return sha256(chunk).then(function(checksum) {
+            const headers = {'X-CSRFToken': csrfToken};
+            if (checksum) {
+                headers['X-Chunk-Sha256'] = checksum;
+            }
+            return fetch(upload.url + index + '/', {
+                method: 'PUT', body: chunk, headers: headers, credentials: 'same-origin'
+            });
+        }).then(function(response) {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+        }).catch(function(e) {
+            if (attempt >= CHUNK_RETRIES) {
+                throw e;
+            }
+            return wait(1000 * Math.pow(2, attempt)).then(function() {
+                return uploadChunk(upload, file, index, csrfToken, attempt + 1);
+            });
+        });
+    }
+
+    /**
+     * Upload a file in chunks, resuming an earlier attempt for the same file
+     *
+     * Returns a promise of the uploader response of the assembled file.
+     */
+    function uploadInChunks(initUrl, file, csrfToken, parallel, onChunk) {
+        const resumeKey = UPLOAD_STORAGE_PREFIX + [file.name, file.size, file.lastModified].join(':');
+        let resumeUrl = null;
+        try {
+            resumeUrl = window.localStorage.getItem(resumeKey);
+        } catch (e) {
+            // Storage unavailable, start from scratch
+        }
+        const resumed = resumeUrl ? requestJSON(resumeUrl, 'GET', csrfToken).catch(function() {
+            return null;
+        }) : Promise.resolve(null);
+
+        return resumed.then(function(upload) {
+            return upload || requestJSON(initUrl, 'POST', csrfToken, {name: file.name, size: file.size});
+        }).then(function(upload) {
+            try {
+                window.localStorage.setItem(resumeKey, upload.url);
+            } catch (e) {
+                // Storage unavailable, the upload just can't be resumed
+            }
+            const pending = [];
+            for (let index = 0; index < upload.chunks; index++) {
+                if (upload.received.indexOf(index) === -1) {
+                    pending.push(index);
+                }
+            }
+            upload.received.forEach(function(index) {
+                onChunk(upload, index);
+            });
+
+            function next() {
+                if (!pending.length) {
+                    return Promise.resolve();
+                }
+                const index = pending.shift();
+                return uploadChunk(upload, file, index, csrfToken, 0).then(function() {
+                    onChunk(upload, index);
+                    return next();
+                });
+            }
+
+            const workers = [];
+            for (let i = 0; i < Math.min(parallel, pending.length); i++) {
+                workers.push(next());
+            }
+            return Promise.all(workers).then(function() {
+                return requestJSON(upload.url, 'POST', csrfToken);
+            });
+        }).then(function(response) {
+            try {
+                window.localStorage.removeItem(resumeKey);
+            } catch (e) {
+                // Storage unavailable, nothing to remove
+            }
+            return response;
+        });
+    }
+
+    /**
+     * Merge the uploader responses of several requests into one
+     */
+    function mergeUploadResponses(responses) {
+        const merged = {success: true, data: {baseurl: '', files: [], isImages: [], messages: [], code: 220}};
+        responses.forEach(function(response) {
+            const data = response.data || {};
+            merged.success = merged.success && Boolean(response.success);
+            merged.data.files = merged.data.files.concat((data.files || []).map(function(file) {
+                return (data.baseurl || '') + file;
+            }));
+            merged.data.isImages = merged.data.isImages.concat(data.isImages || []);
+            merged.data.messages = merged.data.messages.concat(data.messages || []);
+        });
+        return merged;
+    }
+
+    /**
+     * Send files above a size threshold through the chunked upload views
+     *
+     * Smaller files still go to the uploader URL in a single request.
+     */
+    function setupChunkedUploads(textarea, config, options) {
+        const initUrl = textarea.getAttribute('data-jodit-chunked-upload-url');
+        const csrfToken = getCsrfToken(textarea);
+        const uploader = config.uploader = config.uploader || {};
+
+        uploader.customUploadFunction = function(formData, progress) {
+            const small = new FormData();
+            const large = [];
+            formData.forEach(function(value, key) {
+                if (value instanceof Blob && (value.size > options.threshold || !uploader.url)) {
+                    large.push(value);
+                } else {
+                    small.append(key, value);
+                }
+            });
+
+            const total = large.reduce(function(sum, file) {
+                return sum + file.size;
+            }, 0);
+            let sent = 0;
+            const requests = large.map(function(file) {
+                return uploadInChunks(initUrl, file, csrfToken, options.parallel, function(upload, index) {
+                    sent += Math.min(upload.chunkSize, file.size - index * upload.chunkSize);
+                    progress(Math.min(99, 100 * sent / total));
+                });
+            });
+            if (Array.from(small.values()).some(function(value) {
+                return value instanceof Blob;
+            })) {
+                requests.push(requestJSON(uploader.url, 'POST', csrfToken, small));
+            }
+            return Promise.all(requests).then(mergeUploadResponses).catch(function(e) {
+                return {success: false, data: {messages: [e.message]}};
+            }).finally(function() {
+                progress(100);
+            });
+        };
+    }
+
+    /**
+     * Encode binary data as base64 without building one huge argument list
+     */
+    function toBase64(buffer) {
+        const bytes = new Uint8Array(buffer);
+        const parts = [];
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+            parts.push(String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000)));
+        }
+        return btoa(parts.join(''));
+    }
+
+    /**
+     * Gzip a textarea's value into a hidden field and keep the raw value out of the submission
+     */
+    function compressTextarea(textarea) {
+        const stream = new Blob([textarea.value]).stream().pipeThrough(new CompressionStream('gzip'));
+        return new Response(stream).arrayBuffer().then(function(buffer) {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = textarea.name + COMPRESSED_VALUE_SUFFIX;
+            input.value = toBase64(buffer);
+            textarea.after(input);
+            textarea.disabled = true;
+            return function() {
+                input.remove();
+                textarea.disabled = false;
+            };
+        });
+    }
+
+    /**
+     * Compress large values of a textarea when its form is submitted
+     */
+    function setupCompression(textarea, threshold) {
+        const form = textarea.form;
+        textarea.joditCompressThreshold = threshold;
+        if (!form || !('CompressionStream' in window) || form.joditCompressionBound) {
+            return;
+        }
+        form.joditCompressionBound = true;
+
+        form.addEventListener('submit', function(event) {
+            if (form.joditCompressing) {
+                return;
+            }
+            const targets = Array.from(form.querySelectorAll('textarea[data-jodit-config]')).filter(function(t) {
+                if (t.joditEditor) {
+                    t.value = t.joditEditor.value;
+                }
+                return t.joditCompressThreshold && !t.disabled && t.value.length > t.joditCompressThreshold;
+            });
+            if (!targets.length) {
+                return;
+            }
+
+            event.preventDefault();
+            const submitter = event.submitter;
+            Promise.all(targets.map(function(t) {
+                return compressTextarea(t).catch(function(e) {
+                    console.error('Failed to compress Jodit value, submitting it uncompressed:', e);
+                    return function() {};
+                });
+            })).then(function(restores) {
+                // The form data is collected synchronously by requestSubmit,
+                // so the fields can be restored right after.
+                form.joditCompressing = true;
+                try {
+                    form.requestSubmit(submitter || undefined);
+                } finally {
+                    form.joditCompressing = false;
+                    restores.forEach(function(restore) {
+                        restore();
+                    });
+                }
+            });
+        });
+    }
+
+    /**
+     * Start a Web Worker running main() and return a function posting messages to it
+     *
+     * The function returns a promise of the worker's result. Returns null where
+     * workers can't be created, e.g. when blocked by a Content Security Policy.
+     */
+    function createWorkerClient(main) {
+        let worker;
+        try {
+            const source = '(' + main.toString() + ')();';
+            worker = new Worker(URL.createObjectURL(new Blob([source], {type: 'text/javascript'})));
+        } catch (e) {
+            return null;
+        }
+
+        let nextId = 0;
+        const pending = {};
+        worker.onmessage = function(event) {
+            const callbacks = pending[event.data.id];
+            delete pending[event.data.id];
+            if (event.data.error) {
+                callbacks.reject(new Error(event.data.error));
+            } else {
+                callbacks.resolve(event.data.result);
+            }
+        };
+
+        return function(message) {
+            return new Promise(function(resolve, reject) {
+                message.id = ++nextId;
+                pending[message.id] = {resolve: resolve, reject: reject};
+                worker.postMessage(message);
+            });
+        };
+    }
+
+    /**
+     * Web Worker: downscale an image blob with OffscreenCanvas
+     */
+    function imageWorkerMain() {
+        self.onmessage = function(event) {
+            const data = event.data;
+            createImageBitmap(data.blob).then(function(bitmap) {
+                const scale = Math.min(
+                    1,
+                    data.maxWidth ? data.maxWidth / bitmap.width : 1,
+                    data.maxHeight ? data.maxHeight / bitmap.height : 1
+                );
+                if (scale === 1) {
+                    return data.blob;
+                }
+                const canvas = new OffscreenCanvas(Math.round(bitmap.width * scale), Math.round(bitmap.height * scale));
+                canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+                bitmap.close();
+                return canvas.convertToBlob({type: data.type || data.blob.type, quality: data.quality});
+            }).then(function(blob) {
+                self.postMessage({id: data.id, result: blob});
+            }).catch(function(e) {
+                self.postMessage({id: data.id, error: String(e)});
+            });
+        };
+    }
+
+    let imageWorker;
+
+    /**
+     * Downscale an image on the main thread where OffscreenCanvas is unavailable
+     */
+    function downscaleOnMainThread(message) {
+        return createImageBitmap(message.blob).then(function(bitmap) {
+            const scale = Math.min(
+                1,
+                message.maxWidth ? message.maxWidth / bitmap.width : 1,
+                message.maxHeight ? message.maxHeight / bitmap.height : 1
+            );
+            if (scale === 1) {
+                return message.blob;
+            }
+            const canvas = document.createElement('canvas');
+            canvas.width = Math.round(bitmap.width * scale);
+            canvas.height = Math.round(bitmap.height * scale);
+            canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+            return new Promise(function(resolve) {
+                canvas.toBlob(resolve, message.type || message.blob.type, message.quality);
+            });
+        });
+    }
+
+    /**
+     * Downscale an image blob and return it as a data URI
+     */
+    function downscaleImage(blob, options) {
+        if (imageWorker === undefined) {
+            imageWorker = typeof OffscreenCanvas !== 'undefined' ? createWorkerClient(imageWorkerMain) : null;
+        }
+        const message = {
+            blob: blob,
+            maxWidth: options.maxWidth,
+            maxHeight: options.maxHeight,
+            type: options.type,
+            quality: options.quality
+        };
+        const scaled = imageWorker ? imageWorker(message) : downscaleOnMainThread(message);
+        return scaled.then(function(result) {
+            // Re-encoding small images may make them larger
+            const smallest = result && result.size < blob.size ? result : blob;
+            return new Promise(function(resolve, reject) {
+                const reader = new FileReader();
+                reader.onload = function() {
+                    resolve(reader.result);
+                };
+                reader.onerror = reject;
+                reader.readAsDataURL(smallest);
+            });
+        });
+    }
+
+    /**
+     * Shrink pasted, dropped and inserted base64 images before they reach the editor
+     */
+    function setupImageDownscaling(editor, options) {
+        const interceptFiles = function(event) {
+            const transfer = event.clipboardData || event.dataTransfer;
+            // Office apps put a picture of the copied content next to its HTML
+            if (!transfer || Array.from(transfer.types || []).indexOf('text/html') !== -1) {
+                return;
+            }
+            const files = Array.from(transfer.files || []);
+            const scalable = files.length > 0 && files.every(function(file) {
+                return file.type.startsWith('image/') && UNSCALABLE_IMAGE_TYPES.indexOf(file.type) === -1;
+            });
+            if (!scalable) {
+                return;
+            }
+            event.preventDefault();
+            event.stopImmediatePropagation();
+            if (event.type === 'drop' && editor.s.insertCursorAtPoint) {
+                editor.s.insertCursorAtPoint(event.clientX, event.clientY);
+            }
+            files.forEach(function(file) {
+                downscaleImage(file, options).then(function(dataUri) {
+                    editor.s.insertImage(dataUri);
+                }).catch(function(e) {
+                    console.error('Failed to downscale image:', e);
+                });
+            });
+        };
+        editor.editor.addEventListener('paste', interceptFiles, true);
+        editor.editor.addEventListener('drop', interceptFiles, true);
+
+        // Images inserted by other means (e.g. the image button) are replaced once scaled
+        editor.events.on('afterInsertImage', function(image) {
+            const match = /^data:(image\/[a-z0-9.+-]+);base64,/i.exec(image.getAttribute('src') || '');
+            if (!match || UNSCALABLE_IMAGE_TYPES.indexOf(match[1]) !== -1 || image.joditDownscaled) {
+                return;
+            }
+            image.joditDownscaled = true;
+            fetch(image.src).then(function(response) {
+                return response.blob();
+            }).then(function(blob) {
+                return downscaleImage(blob, options);
+            }).then(function(dataUri) {
+                if (dataUri !== image.src) {
+                    image.src = dataUri;
+                    editor.synchronizeValues();
+                }
+            }).catch(function(e) {
+                console.error('Failed to downscale image:', e);
+            });
+        });
+    }
+
+    /**
+     * Web Worker: clean up HTML pasted from Word, Google Docs and similar
+     *
+     * Workers have no DOM, so this works on the markup with regular expressions.
+     */
+    function pasteWorkerMain() {
+        function cleanStyle(declarations, stripStyles) {
+            if (stripStyles) {
+                return '';
+            }
+            const properties = {};
+            declarations.split(';').forEach(function(declaration) {
+                const index = declaration.indexOf(':');
+                const name = declaration.slice(0, index).trim().toLowerCase();
+                if (index === -1 || !name || /^(mso-|tab-stops)/.test(name)) {
+                    return;
+                }
+                // Later declarations win, so repeated properties are dropped
+                properties[name] = declaration.slice(index + 1).trim();
+            });
+            const result = Object.keys(properties).map(function(name) {
+                return name + ': ' + properties[name];
+            }).join('; ');
+            return result ? ' style="' + result.replace(/"/g, "'") + '"' : '';
+        }
+
+        function replaceUntilStable(html, pattern, replacement) {
+            let previous;
+            do {
+                previous = html;
+                html = html.replace(pattern, replacement);
+            } while (html !== previous);
+            return html;
+        }
+
+        function clean(html, stripStyles) {
+            const start = html.indexOf('<!--StartFragment-->');
+            const end = html.indexOf('<!--EndFragment-->');
+            if (start !== -1 && end > start) {
+                html = html.slice(start + '<!--StartFragment-->'.length, end);
+            } else {
+                const body = /<body[^>]*>([\s\S]*)<\/body>/i.exec(html);
+                if (body) {
+                    html = body[1];
+                }
+            }
+            html = html
+                .replace(/<!--\[if[\s\S]*?<!\[endif\]-->/gi, '')
+                .replace(/<!\[if[^>]*>|<!\[endif\]>/gi, '')
+                .replace(/<!--[\s\S]*?-->/g, '')
+                .replace(/<(style|script|xml|title)\b[\s\S]*?<\/\1>/gi, '')
+                .replace(/<(meta|link)\b[^>]*>/gi, '')
+                .replace(/<\/?(o|w|v|m|st1):[^>]*>/gi, '')
+                .replace(/\s(class=("|')?Mso[^"'\s>]*\2?|lang=("[^"]*"|'[^']*'|[^\s>]+))/gi, '')
+                .replace(/\sstyle=(?:"([^"]*)"|'([^']*)')/gi, function(match, double, single) {
+                    return cleanStyle(double !== undefined ? double : single, stripStyles);
+                });
+            // Drop empty spans and unwrap spans without attributes
+            html = replaceUntilStable(html, /<span\b[^>]*>((?:\s|&nbsp;)*)<\/span>/gi, '$1');
+            return replaceUntilStable(html, /<span>([^<]*)<\/span>/gi, '$1');
+        }
+
+        self.onmessage = function(event) {
+            try {
+                self.postMessage({id: event.data.id, result: clean(event.data.html, event.data.stripStyles)});
+            } catch (e) {
+                self.postMessage({id: event.data.id, error: String(e)});
+            }
+        };
+    }
+
+    let pasteWorker;
+
+    /**
+     * Clean large HTML pastes in a Web Worker instead of blocking the editor
+     */
+    function setupPasteCleanup(editor, options) {
+        if (pasteWorker === undefined) {
+            pasteWorker = createWorkerClient(pasteWorkerMain);
+        }
+        if (!pasteWorker) {
+            return;
+        }
+        editor.editor.addEventListener('paste', function(event) {
+            const html = event.clipboardData ? event.clipboardData.getData('text/html') : '';
+            if (html.length < options.threshold) {
+                return;
+            }
+            event.preventDefault();
+            event.stopImmediatePropagation();
+
+            // Remember where to insert, the user may click elsewhere meanwhile
+            editor.s.save();
+            pasteWorker({html: html, stripStyles: options.stripStyles}).then(function(cleaned) {
+                if (editor.isDestructed) {
+                    return;
+                }
+                editor.s.restore();
+                editor.s.insertHTML(cleaned);
+            }).catch(function(e) {
+                console.error('Failed to clean pasted HTML:', e);
+                editor.s.restore();
+            });
+        }, true);
+    }
+
+    /**
+     * Tear down the live editor attached to a textarea, keeping its value
+     */
+    function destroyEditor(textarea) {
+        const editor = textarea.joditEditor;
+        if (textarea.joditStopThemeObserver) {
+            textarea.joditStopThemeObserver();
+            textarea.joditStopThemeObserver = null;
+        }
+        if (editor) {
+            textarea.value = editor.value;
+            editor.destruct();
+            textarea.joditEditor = null;
+        }
+    }
+
+    /**
+     * Find the read-only preview rendered next to a virtualized textarea
+     */
+    function getPreview(textarea) {
+        const wrapper = textarea.closest('.django-jodit-widget');
+        return wrapper ? wrapper.querySelector('.django-jodit-preview') : null;
+    }
+
+    /**
+     * Render stored HTML into the preview without running any of its scripts
+     */
+    function renderPreview(preview, html) {
+        const doc = new DOMParser().parseFromString(html || '', 'text/html');
+        doc.querySelectorAll('script, style, link, meta, base, iframe, object, embed, form').forEach(function(el) {
+            el.remove();
+        });
+        doc.body.querySelectorAll('*').forEach(function(el) {
+            Array.from(el.attributes).forEach(function(attr) {
+                const name = attr.name.toLowerCase();
+                if (name.startsWith('on') || /^\s*javascript:/i.test(attr.value)) {
+                    el.removeAttribute(attr.name);
+                }
+            });
+            if (el.tagName === 'IMG') {
+                el.setAttribute('loading', 'lazy');
+            }
+        });
+        preview.replaceChildren.apply(preview, Array.from(doc.body.childNodes));
+    }
+
+    /**
+     * Show the read-only preview for a virtualized textarea
+     */
+    function setupPreview(textarea, preview, config) {
+        textarea.setAttribute('data-processed', '1');
+        textarea.hidden = true;
+        if (textarea.hasAttribute('data-jodit-deferred-url')) {
+            preview.textContent = 'Large document, click to load.';
+        } else {
+            renderPreview(preview, textarea.value);
+        }
+        preview.hidden = false;
+
+        if (preview.joditBound) {
+            return;
+        }
+        preview.joditBound = true;
+        preview.style.cssText = 'box-sizing: border-box; cursor: text; overflow: auto; padding: 8px; ' +
+            'border: 1px solid #dadada; min-height: 40px;';
+        if (config.height) {
+            preview.style.maxHeight = typeof config.height === 'number' ? config.height + 'px' : config.height;
+        }
+
+        const activate = function() {
+            activateEditor(textarea, preview, config);
+        };
+        preview.addEventListener('click', activate);
+        preview.addEventListener('focus', activate);
+    }
+
+    /**
+     * Replace a preview with a live editor, respecting the live editor cap
+     */
+    function activateEditor(textarea, preview, config) {
+        if (textarea.joditEditor) {
+            return;
+        }
+        textarea.joditActive = true;
+        preview.hidden = true;
+        textarea.setAttribute('data-processed', '0');
+        initJoditEditor(textarea);
+        // Deferred values create their editor once loaded
+        if (textarea.joditEditor) {
+            textarea.joditEditor.s.focus();
+        }
+        liveEditors.push(textarea);
+
+        const maxEditors = config.virtualizeMaxEditors || DEFAULT_MAX_LIVE_EDITORS;
+        while (liveEditors.length > maxEditors) {
+            deactivateEditor(liveEditors[0]);
+        }
+
+        if (config.virtualizeDestroyMargin && 'IntersectionObserver' in window) {
+            observeOffscreen(textarea, config.virtualizeDestroyMargin);
+        }
+    }
+
+    /**
+     * Sync a live virtualized editor back to its textarea and show the preview
+     */
+    function deactivateEditor(textarea) {
+        const index = liveEditors.indexOf(textarea);
+        if (index !== -1) {
+            liveEditors.splice(index, 1);
+        }
+        if (textarea.joditOffscreenObserver) {
+            textarea.joditOffscreenObserver.disconnect();
+            textarea.joditOffscreenObserver = null;
+        }
+        destroyEditor(textarea);
+        textarea.joditActive = false;
+        setupPreview(textarea, getPreview(textarea), parseConfig(textarea));
+    }
+
+    /**
+     * Destroy a live editor once it scrolls further than margin off-screen
+     */
+    function observeOffscreen(textarea, margin) {
+        const rootMargin = typeof margin === 'number' ? margin + 'px' : margin;
+        const observer = new IntersectionObserver(function(entries) {
+            entries.forEach(function(entry) {
+                const editor = textarea.joditEditor;
+                if (entry.isIntersecting || !editor) {
+                    return;
+                }
+                // Never pull the editor away from someone typing in it
+                if (editor.container.contains(document.activeElement)) {
+                    return;
+                }
+                deactivateEditor(textarea);
+            });
+        }, {rootMargin: rootMargin});
+        observer.observe(textarea.closest('.django-jodit-widget'));
+        textarea.joditOffscreenObserver = observer;
+    }
+
     /**
      * Observe theme changes and update editor accordingly
+     *
+     * Returns a function that stops observing.
      */
     function observeThemeChanges(editor, originalConfig) {
+        const recreate = function(newTheme) {
+            if (editor.options && editor.options.theme !== newTheme) {
+                // Update theme if it changed
+                editor.options.theme = newTheme;
+                // Recreate editor with new theme
+                const textarea = editor.element;
+                destroyEditor(textarea);
+                textarea.setAttribute('data-processed', '0');
+                initJoditEditor(textarea);
+            }
+        };
+
         // Watch for changes to data-theme attribute on html element
         const observer = new MutationObserver(function(mutations) {
             mutations.forEach(function(mutation) {
                 if (mutation.attributeName === 'data-theme') {
-                    const newTheme = isDarkTheme() ? 'dark' : 'default';
-                    if (editor.options && editor.options.theme !== newTheme) {
-                        // Update theme if it changed
-                        editor.options.theme = newTheme;
-                        // Recreate editor with new theme
-                        const textarea = editor.element;
-                        editor.destruct();
-                        textarea.setAttribute('data-processed', '0');
-                        initJoditEditor(textarea);
-                    }
+                    recreate(isDarkTheme() ? 'dark' : 'default');
                 }
             });
         });
@@ -111,23 +1166,81 @@
         });
 
         // Also listen for prefers-color-scheme changes
+        let darkModeQuery = null;
+        const onSchemeChange = function(e) {
+            if (!originalConfig.theme || originalConfig.theme === 'auto') {
+                recreate(e.matches ? 'dark' : 'default');
+            }
+        };
         if (window.matchMedia) {
-            const darkModeQuery = window.matchMedia('(prefers-color-scheme: dark)');
-            darkModeQuery.addEventListener('change', function(e) {
-                if (!originalConfig.theme || originalConfig.theme === 'auto') {
-                    const newTheme = e.matches ? 'dark' : 'default';
-                    if (editor.options && editor.options.theme !== newTheme) {
-                        editor.options.theme = newTheme;
-                        const textarea = editor.element;
-                        editor.destruct();
-                        textarea.setAttribute('data-processed', '0');
-                        initJoditEditor(textarea);
-                    }
-                }
-            });
+            darkModeQuery = window.matchMedia('(prefers-color-scheme: dark)');
+            darkModeQuery.addEventListener('change', onSchemeChange);
+        }
+
+        return function() {
+            observer.disconnect();
+            if (darkModeQuery) {
+                darkModeQuery.removeEventListener('change', onSchemeChange);
+            }
+        };
+    }
+
+    /**
+     * Return the metrics beacon URL, or null when metrics are disabled
+     */
+    function getMetricsUrl() {
+        const element = document.querySelector('[data-jodit-metrics]');
+        return element && navigator.sendBeacon ? element.getAttribute('data-jodit-metrics') : null;
+    }
+
+    /**
+     * Queue a timing for the metrics beacon, sending full batches right away
+     */
+    function recordMetric(name, value) {
+        if (!getMetricsUrl()) {
+            return;
+        }
+        pendingMetrics.push({name: name, value: Math.round(value * 10) / 10});
+        if (pendingMetrics.length >= METRICS_BATCH_SIZE) {
+            flushMetrics();
         }
     }
 
+    /**
+     * Send queued timings to the server without delaying page unload
+     */
+    function flushMetrics() {
+        const url = getMetricsUrl();
+        if (!url || !pendingMetrics.length) {
+            return;
+        }
+        const samples = pendingMetrics.splice(0, pendingMetrics.length);
+        const body = new Blob([JSON.stringify({samples: samples})], {type: 'application/json'});
+        navigator.sendBeacon(url, body);
+    }
+
+    /**
+     * Record how long an editor took to create and to handle its first input
+     */
+    function measureEditor(textarea, editor, start) {
+        if (!getMetricsUrl()) {
+            return;
+        }
+        const name = textarea.id || textarea.name;
+        performance.mark('jodit:make:' + name, {startTime: start});
+        const measure = performance.measure('jodit:make:' + name, 'jodit:make:' + name);
+        recordMetric('make', measure.duration);
+        recordMetric('editor_ready', performance.now());
+        recordMetric('config_size', (textarea.getAttribute('data-jodit-config') || '').length);
+
+        function onFirstInput(event) {
+            editor.events.off(editor.editor, 'keydown mousedown', onFirstInput);
+            // The event's timestamp is when the input happened, not when it was handled
+            recordMetric('first_input_delay', Math.max(performance.now() - event.timeStamp, 0));
+        }
+        editor.events.on(editor.editor, 'keydown mousedown', onFirstInput);
+    }
+
     /**
      * Initialize all Jodit editors on the page
      */
@@ -136,24 +1249,54 @@
         textareas.forEach(initJoditEditor);
     }
 
+    /**
+     * Register the service worker caching the editor assets, if enabled
+     */
+    function registerServiceWorker() {
+        const element = document.querySelector('[data-jodit-sw]');
+        if (!element || !('serviceWorker' in navigator)) {
+            return;
+        }
+        navigator.serviceWorker.register(element.getAttribute('data-jodit-sw'), {
+            scope: element.getAttribute('data-jodit-sw-scope')
+        }).catch(function(e) {
+            console.warn('Failed to register Jodit service worker:', e);
+        });
+    }
+
     /**
      * Wait for Jodit library to be loaded
      */
     function waitForJodit() {
         if (typeof Jodit !== 'undefined') {
+            performance.mark('jodit:script-ready');
+            recordMetric('script_ready', performance.now());
             initAllJoditEditors();
+            recordMetric('editors', document.querySelectorAll('textarea[data-jodit-config]').length);
         } else {
             setTimeout(waitForJodit, 50);
         }
     }
 
+    deleteSubmittedDrafts();
+
     // Initialize on DOM ready
     if (document.readyState === 'loading') {
         document.addEventListener('DOMContentLoaded', waitForJodit);
+        document.addEventListener('DOMContentLoaded', registerServiceWorker);
     } else {
         waitForJodit();
+        registerServiceWorker();
     }
 
+    // Send remaining timings when the page is hidden or left
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'hidden') {
+            flushMetrics();
+        }
+    });
+    window.addEventListener('pagehide', flushMetrics);
+
     // Support for Django admin inline forms (dynamically added forms)
     if (typeof django !== 'undefined' && django.jQuery) {
         django.jQuery(document).on('formset:added', function(event, row) {
@@ -0,0 +1,84 @@
+/**
+ * Service Worker for django-jodit
+ *
+ * Caches the versioned Jodit assets with a cache-first strategy, so reloading
+ * a page with an editor does not re-validate them over the network.
+ *
+ * Registered by jodit-init.js from the jodit:service_worker view, with the
+ * package version and the asset URLs passed as query parameters:
+ *   ?v=<version>&asset=<url>&asset=<url>...
+ */
+
+(function() {
+    'use strict';
+
+    const CACHE_PREFIX = 'django-jodit-';
+    const params = new URL(self.location.href).searchParams;
+    const CACHE_NAME = CACHE_PREFIX + (params.get('v') || 'unversioned');
+    const ASSETS = params.getAll('asset').map(function(url) {
+        return new URL(url, self.location.href).href;
+    });
+
+    self.addEventListener('install', function(event) {
+        event.waitUntil(
+            caches.open(CACHE_NAME).then(function(cache) {
+                // A missing asset must not prevent the worker from installing
+                return Promise.all(ASSETS.map(function(url) {
+                    return cache.add(url).catch(function(e) {
+                        console.warn('Jodit service worker could not cache', url, e);
+                    });
+                }));
+            }).then(function() {
+                return self.skipWaiting();
+            })
+        );
+    });
+
+    self.addEventListener('activate', function(event) {
+        event.waitUntil(
+            caches.keys().then(function(names) {
+                // Evict caches of other versions
+                return Promise.all(names.filter(function(name) {
+                    return name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME;
+                }).map(function(name) {
+                    return caches.delete(name);
+                }));
+            }).then(function() {
+                // Evict assets that are no longer used by this version
+                return caches.open(CACHE_NAME).then(function(cache) {
+                    return cache.keys().then(function(requests) {
+                        return Promise.all(requests.filter(function(request) {
+                            return ASSETS.indexOf(request.url) === -1;
+                        }).map(function(request) {
+                            return cache.delete(request);
+                        }));
+                    });
+                });
+            }).then(function() {
+                return self.clients.claim();
+            })
+        );
+    });
+
+    self.addEventListener('fetch', function(event) {
+        const request = event.request;
+        if (request.method !== 'GET' || ASSETS.indexOf(request.url) === -1) {
+            return;
+        }
+        event.respondWith(
+            caches.open(CACHE_NAME).then(function(cache) {
+                return cache.match(request).then(function(cached) {
+                    if (cached) {
+                        return cached;
+                    }
+                    return fetch(request).then(function(response) {
+                        if (response.ok) {
+                            cache.put(request, response.clone());
+                        }
+                        return response;
+                    });
+                });
+            })
+        );
+    });
+})();
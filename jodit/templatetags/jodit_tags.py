@@ -0,0 +1,23 @@
+"""Template tags and filters for django-jodit."""
+
+from django import template
+
+from jodit.images import responsive_images
+
+register = template.Library()
+
+
+@register.filter(is_safe=True)
+def jodit_responsive(value):
+    """
+    Make the images of rich text content responsive.
+
+    Images uploaded through the editor get srcset/sizes pointing to resized
+    variants, and width/height to prevent layout shift. All images get
+    loading="lazy" and decoding="async".
+
+    Example usage:
+        {% load jodit_tags %}
+        {{ post.content|safe|jodit_responsive }}
+    """
+    return responsive_images(value)
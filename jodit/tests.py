@@ -1,16 +1,38 @@
 """Tests for django-jodit."""
 
+import gzip
+import io
 import json
+import os
+import tempfile
+from unittest import mock
 
 from django import forms
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
 from django.db import models
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
 
 from .fields import RichTextField, RichTextFormField
+from .settings import get_storage
 from .widgets import JoditWidget
 
 
+class SizeLimitedCache(LocMemCache):
+    """Cache dropping values over 1000 characters without an error, like memcached over its item size."""
+
+    def add(self, key, value, *args, **kwargs):
+        if len(value) > 1000:
+            return False
+        return super().add(key, value, *args, **kwargs)
+
+    def set(self, key, value, *args, **kwargs):
+        if len(value) <= 1000:
+            super().set(key, value, *args, **kwargs)
+
+
 class TestModel(models.Model):
     """Test model for RichTextField."""
 
@@ -56,6 +78,32 @@ class JoditWidgetTestCase(TestCase):
         self.assertTrue(any("jodit.min.js" in f for f in js_files))
         self.assertTrue(any("jodit-init.js" in f for f in js_files))
 
+    @override_settings(JODIT_JS_URL=None)
+    def test_widget_media_memoized(self):
+        """Test that a 500-row formset resolves static URLs a constant number of times."""
+        from django.templatetags.static import static
+
+        class TestForm(forms.Form):
+            content = RichTextFormField()
+            summary = RichTextFormField(config_name="simple")
+
+        formset_class = forms.formset_factory(TestForm, extra=500)
+        with mock.patch("jodit.precompressed.static", side_effect=static) as static_mock:
+            formset = formset_class()
+            str(formset.media)
+            for form in formset:
+                str(form.media)
+                form.as_p()
+
+        self.assertEqual(static_mock.call_count, 3)
+
+    def test_widget_media_invalidated_on_setting_change(self):
+        """Test that memoized media follows setting changes."""
+        self.assertIn("/static/jodit/jodit.min.js", JoditWidget().media._js)
+        with override_settings(JODIT_JS_URL="https://cdn.example.com/jodit.js"):
+            self.assertIn("https://cdn.example.com/jodit.js", JoditWidget().media._js)
+        self.assertIn("/static/jodit/jodit.min.js", JoditWidget().media._js)
+
     def test_widget_render(self):
         """Test widget rendering."""
         widget = JoditWidget()
@@ -86,6 +134,25 @@ class JoditWidgetTestCase(TestCase):
         self.assertIn("buttons", config)
         self.assertEqual(config["height"], 600)
 
+    @override_settings(JODIT_CONFIGS={"default": {"virtualize": True, "virtualizeMaxEditors": 3}})
+    def test_widget_render_virtualized(self):
+        """Test that virtualized configs render a preview and a hidden textarea."""
+        widget = JoditWidget()
+        html = widget.render("content", "<p>Preview me</p>", attrs={"id": "id_content"})
+
+        self.assertIn('class="django-jodit-preview"', html)
+        self.assertIn('data-for="id_content"', html)
+        self.assertIn(" hidden>", html)
+        self.assertIn("Preview me", html)
+
+    def test_widget_render_not_virtualized(self):
+        """Test that editors are not virtualized by default."""
+        widget = JoditWidget()
+        html = widget.render("content", "Test content", attrs={"id": "id_content"})
+
+        self.assertNotIn("django-jodit-preview", html)
+        self.assertNotIn(" hidden>", html)
+
     @override_settings(JODIT_CONFIGS={"invalid": "not_a_dict"})
     def test_widget_invalid_config_type(self):
         """Test that invalid config type raises ImproperlyConfigured."""
@@ -104,6 +171,144 @@ class JoditWidgetTestCase(TestCase):
             JoditWidget(config_name="nonexistent")
 
 
+class FastRenderTestCase(TestCase):
+    """Test cases for rendering the widget without the template engine."""
+
+    def assertSameMarkup(self, widget, value, attrs=None):
+        template_html = widget.render("content", value, attrs)
+        with override_settings(JODIT_FAST_RENDER=True), mock.patch.object(JoditWidget, "_render") as render:
+            fast_html = widget.render("content", value, attrs)
+        render.assert_not_called()
+        self.assertEqual(fast_html, template_html)
+
+    def test_identical_output(self):
+        """Test that both render paths produce identical, escaped markup."""
+        attrs = {"id": "id_content", "required": True, "disabled": False, "maxlength": 10, "data-x": '"><script>'}
+        self.assertSameMarkup(JoditWidget(), '<p class="x">Tom & "Jerry"</p></textarea>', attrs)
+        self.assertSameMarkup(JoditWidget(config_name="simple"), None)
+        self.assertSameMarkup(JoditWidget(deferred_value_threshold=5), "<p>Long value</p>", {"id": "id_content"})
+
+    @override_settings(
+        JODIT_CONFIGS={"default": {"virtualize": True, "autosave": True, "chunkedUpload": True, "title": "</div>"}},
+        JODIT_SERVICE_WORKER=True,
+        JODIT_SERVICE_WORKER_SCOPE='/a"b/',
+        JODIT_METRICS=True,
+    )
+    def test_identical_output_with_options(self):
+        """Test that optional markup is identical on both render paths."""
+        self.assertSameMarkup(JoditWidget(), "<p>Hello</p>", {"id": "id_content"})
+
+    @override_settings(JODIT_FAST_RENDER=True)
+    def test_custom_template_uses_template_engine(self):
+        """Test that widgets with a custom template are rendered by it."""
+        widget = JoditWidget(template_name="django/forms/widgets/textarea.html")
+        self.assertNotIn("django-jodit-widget", widget.render("content", "<p>Hello</p>"))
+
+    def test_overridden_template_uses_template_engine(self):
+        """Test that a project override of jodit/widget.html is not bypassed."""
+        from django.conf import settings
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, "jodit"))
+            with open(os.path.join(tmpdir, "jodit", "widget.html"), "w") as f:
+                f.write("Custom {{ widget.name }}")
+            templates = [{**settings.TEMPLATES[0], "DIRS": [tmpdir]}]
+            with override_settings(
+                JODIT_FAST_RENDER=True, TEMPLATES=templates, FORM_RENDERER="django.forms.renderers.TemplatesSetting"
+            ):
+                self.assertEqual(JoditWidget().render("content", "<p>Hello</p>"), "Custom content")
+
+
+class DeferredValueTestCase(TestCase):
+    """Test cases for out-of-band loading of large values."""
+
+    large_value = "<p>" + "x" * 2000 + "</p>"
+
+    def test_small_value_inlined(self):
+        """Test that values below the threshold are rendered inline."""
+        widget = JoditWidget(deferred_value_threshold=5000)
+        html = widget.render("content", self.large_value, attrs={"id": "id_content"})
+
+        self.assertIn("x" * 2000, html)
+        self.assertNotIn("data-jodit-deferred-url", html)
+
+    def test_large_value_deferred(self):
+        """Test that large values are served by the deferred value view instead of inlined."""
+        widget = JoditWidget(deferred_value_threshold=1000)
+        context = widget.get_context("content", self.large_value, {"id": "id_content"})
+        html = widget.render("content", self.large_value, attrs={"id": "id_content"})
+
+        self.assertNotIn("x" * 2000, html)
+        self.assertIn('name="content__jodit_deferred"', html)
+        self.assertIn(f'data-jodit-deferred-url="{context["widget"]["deferred_url"]}"', html)
+
+        response = self.client.get(context["widget"]["deferred_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"value": self.large_value})
+        self.assertIn("immutable", response["Cache-Control"])
+
+    @override_settings(JODIT_DEFERRED_VALUE_THRESHOLD=1000)
+    def test_deferred_value_threshold_setting(self):
+        """Test that the threshold can be set site-wide."""
+        html = JoditWidget().render("content", self.large_value, attrs={"id": "id_content"})
+        self.assertIn("data-jodit-deferred-url", html)
+
+    def test_deferred_value_invalid_token(self):
+        """Test that tampered tokens are rejected."""
+        response = self.client.get(reverse("jodit:deferred_value", args=["forged:token"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_form_submission_without_loading(self):
+        """Test that a form keeps the stored value when the editor never loaded it."""
+
+        class TestForm(forms.Form):
+            content = RichTextFormField()
+
+        form = TestForm()
+        form.fields["content"].widget.deferred_value_threshold = 1000
+        token = form.fields["content"].widget.get_context("content", self.large_value, {})["widget"]["deferred_token"]
+
+        form = TestForm(data={"content__jodit_deferred": token})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["content"], self.large_value)
+
+        # Edited content always wins over the stored value
+        form = TestForm(data={"content": "<p>Edited</p>", "content__jodit_deferred": token})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["content"], "<p>Edited</p>")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "jodit.tests.SizeLimitedCache", "LOCATION": "jodit-size-limited"}}
+    )
+    def test_value_inlined_when_not_cached(self):
+        """Test that values the cache drops are inlined rather than deferred to a missing token."""
+        widget = JoditWidget(deferred_value_threshold=500)
+        html = widget.render("content", self.large_value, attrs={"id": "id_content"})
+
+        self.assertIn("x" * 2000, html)
+        self.assertNotIn("data-jodit-deferred-url", html)
+
+        value = "<p>" + "y" * 600 + "</p>"
+        self.assertIn("data-jodit-deferred-url", widget.render("content", value, attrs={"id": "id_content"}))
+
+    def test_form_submission_expired(self):
+        """Test that an untouched field whose stored value expired fails validation instead of emptying."""
+        from django.core.cache import cache
+
+        class TestForm(forms.Form):
+            content = RichTextFormField(required=False)
+            other = RichTextFormField(required=False)
+
+        widget = JoditWidget(deferred_value_threshold=1000)
+        token = widget.get_context("content", self.large_value, {})["widget"]["deferred_token"]
+        cache.clear()
+
+        form = TestForm(data={"content__jodit_deferred": token, "other__jodit_deferred": "forged:token"})
+        self.assertFalse(form.is_valid())
+        message = "The content has expired. Reload the page and submit your changes again."
+        self.assertEqual(form.errors, {"content": [message], "other": [message]})
+
+
 class RichTextFormFieldTestCase(TestCase):
     """Test cases for RichTextFormField."""
 
@@ -250,6 +455,110 @@ class ConfigTestCase(TestCase):
         # Should still have defaults not overridden
         self.assertIn("width", widget.config)
 
+    @override_settings(
+        JODIT_CONFIGS={
+            "default": {"height": 300, "buttons": ["bold", "italic"]},
+            "compact": {"extends": "default", "height": 150},
+            "tiny": {"extends": "compact", "toolbar": False},
+        }
+    )
+    def test_config_extends(self):
+        """Test that configs are merged over the configs they extend."""
+        config = JoditWidget(config_name="tiny").config
+        self.assertEqual((config["height"], config["buttons"], config["toolbar"]), (150, ["bold", "italic"], False))
+        self.assertEqual(config["language"], "auto")
+        self.assertNotIn("extends", config)
+
+    @override_settings(JODIT_CONFIGS={"a": {"extends": "b"}, "b": {"extends": "a"}, "c": {"extends": "missing"}})
+    def test_config_extends_errors(self):
+        """Test that cycles and unknown parents are reported."""
+        with self.assertRaisesMessage(ImproperlyConfigured, "cycle: a -> b -> a"):
+            JoditWidget(config_name="a")
+        with self.assertRaisesMessage(ImproperlyConfigured, "No configuration named 'missing'"):
+            JoditWidget(config_name="c")
+
+    @override_settings(
+        JODIT_CONFIGS={
+            "default": {
+                "stripDefaults": True,
+                "normalizeHTML": True,
+                "theme": "default",
+                "toolbar": True,
+                "spellcheck": True,
+                "zIndex": False,
+                "uploader": {"url": "", "insertImageAsBase64URI": True},
+                "virtualize": True,
+            }
+        }
+    )
+    def test_strip_defaults(self):
+        """Test that options equal to Jodit's defaults and server-only keys are not sent."""
+        from .configs import get_client_config
+
+        widget = JoditWidget()
+        config = get_client_config(widget.config)
+        self.assertEqual(widget.config["toolbar"], True)
+        self.assertNotIn("toolbar", config)
+        self.assertNotIn("normalizeHTML", config)
+        self.assertNotIn("stripDefaults", config)
+        self.assertEqual(config["spellcheck"], True)
+        self.assertEqual(config["theme"], "default")
+        self.assertIs(config["zIndex"], False)
+        self.assertEqual(config["uploader"], {"insertImageAsBase64URI": True})
+        self.assertTrue(config["virtualize"])
+        self.assertIn(json.dumps(config).replace('"', "&quot;"), widget.render("content", ""))
+
+    @override_settings(
+        JODIT_CONFIGS={
+            "default": {
+                "toolbarAdaptive": False,
+                "buttons": ["bold", "italic", "|", "link", "image", {"group": "list", "buttons": []}],
+                "removeButtons": ["image"],
+                "showCharsCounter": False,
+                "showWordsCounter": False,
+                "limitChars": 100,
+                "disablePlugins": "table, search",
+            },
+            "adaptive": {"buttons": ["bold"], "buttonsMD": ["bold"], "buttonsSM": ["bold"], "buttonsXS": ["video"]},
+            "unpruned": {"buttons": ["bold"], "prunePlugins": False},
+            "toolbarless": {"toolbar": False},
+        },
+        JODIT_PRUNE_PLUGINS=True,
+    )
+    def test_prune_plugins(self):
+        """Test that plugins unreachable from the toolbars and options are disabled."""
+        from .configs import get_client_config
+
+        disabled = get_client_config(JoditWidget().config)["disablePlugins"]
+        self.assertEqual(disabled[:2], ["table", "search"])
+        self.assertEqual(len(disabled), len(set(disabled)))
+        for plugin in ("image", "source", "stat", "mobile", "video"):
+            self.assertIn(plugin, disabled)
+        for plugin in ("bold", "link", "orderedList", "limit", "clipboard", "enter"):
+            self.assertNotIn(plugin, disabled)
+
+        disabled = get_client_config(JoditWidget(config_name="adaptive").config)["disablePlugins"]
+        self.assertNotIn("video", disabled)
+        self.assertNotIn("mobile", disabled)
+        self.assertIn("image", disabled)
+
+        self.assertNotIn("disablePlugins", get_client_config(JoditWidget(config_name="unpruned").config))
+        disabled = get_client_config(JoditWidget(config_name="toolbarless").config)["disablePlugins"]
+        self.assertIn("table", disabled)
+        # Plugins registering hotkeys, commands or paste handlers are kept without toolbars
+        for plugin in ("bold", "link", "justify", "orderedList", "indent", "search", "imageProperties"):
+            self.assertNotIn(plugin, disabled)
+        with override_settings(JODIT_PRUNE_PLUGINS=False):
+            self.assertNotIn("disablePlugins", get_client_config(JoditWidget(config_name="adaptive").config))
+
+    def test_prune_plugins_opt_in(self):
+        """Test that plugins are only pruned when enabled."""
+        from .configs import get_client_config
+
+        self.assertNotIn("disablePlugins", get_client_config(JoditWidget().config))
+        config = get_client_config({**JoditWidget().config, "prunePlugins": True})
+        self.assertIn("xpath", config["disablePlugins"])
+
 
 class LazyEncoderTestCase(TestCase):
     """Test cases for LazyEncoder."""
@@ -379,3 +688,1360 @@ class CustomJoditVersionTestCase(TestCase):
     def test_bundled_jodit_urls(self):
         """Test that bundled Jodit URLs are used when custom URLs are None."""
         JoditWidget()
+
+
+class PrecompressedStaticTestCase(TestCase):
+    """Test cases for precompressed, content-hashed assets."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        tmpdir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmpdir.cleanup)
+        cls.static_root = tmpdir.name
+        with override_settings(STATIC_ROOT=cls.static_root):
+            call_command("jodit_compress_static", stdout=io.StringIO(), stderr=io.StringIO())
+        with open(os.path.join(cls.static_root, "jodit", "precompressed.json")) as f:
+            cls.manifest = json.load(f)
+
+    def setUp(self):
+        from .precompressed import load_manifest
+
+        self.addCleanup(load_manifest.cache_clear)
+
+    def get_response(self, path, accept_encoding):
+        from .middleware import PrecompressedStaticMiddleware
+
+        middleware = PrecompressedStaticMiddleware(lambda request: None)
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+        return middleware(request)
+
+    def test_command_writes_variants(self):
+        """Test that the command writes hashed copies with gzip and Brotli variants."""
+        hashed_name = self.manifest["jodit/jodit.min.js"]
+        self.assertRegex(hashed_name, r"^jodit/jodit\.min\.[0-9a-f]{12}\.js$")
+        path = os.path.join(self.static_root, hashed_name)
+        with open(path + ".gz", "rb") as f, open(path, "rb") as original:
+            self.assertEqual(gzip.decompress(f.read()), original.read())
+
+    def test_command_writes_brotli_variant(self):
+        """Test that the command writes Brotli variants when brotli is installed."""
+        from .management.commands.jodit_compress_static import brotli
+
+        if brotli is None:
+            self.skipTest("brotli is not installed")
+        path = os.path.join(self.static_root, self.manifest["jodit/jodit.min.js"])
+        with open(path + ".br", "rb") as f, open(path, "rb") as original:
+            self.assertEqual(brotli.decompress(f.read()), original.read())
+
+    def test_media_uses_hashed_names(self):
+        """Test that widget media points to the hashed copies when enabled."""
+        with override_settings(STATIC_ROOT=self.static_root, JODIT_PRECOMPRESSED_STATIC=True):
+            js_files = [str(f) for f in JoditWidget().media._js]
+        self.assertIn("/static/" + self.manifest["jodit/jodit.min.js"], js_files)
+
+        with override_settings(STATIC_ROOT=self.static_root):
+            js_files = [str(f) for f in JoditWidget().media._js]
+        self.assertIn("/static/jodit/jodit.min.js", js_files)
+
+    @override_settings(JODIT_PRECOMPRESSED_STATIC=True)
+    def test_middleware_serves_variants(self):
+        """Test that the middleware picks the variant matching Accept-Encoding."""
+        path = "/static/" + self.manifest["jodit/jodit.min.css"]
+        with override_settings(STATIC_ROOT=self.static_root):
+            best_response = self.get_response(path, "gzip, deflate, br")
+            gzip_response = self.get_response(path, "gzip, br;q=0")
+            identity_response = self.get_response(path, "")
+            unknown_response = self.get_response("/static/jodit/jodit.min.css", "br")
+
+        self.assertIn(best_response["Content-Encoding"], ("br", "gzip"))
+        self.assertEqual(gzip_response["Content-Encoding"], "gzip")
+        self.assertFalse(identity_response.has_header("Content-Encoding"))
+        for response in (best_response, gzip_response, identity_response):
+            self.assertEqual(response["Content-Type"], "text/css")
+            self.assertIn("immutable", response["Cache-Control"])
+            self.assertIn("Accept-Encoding", response["Vary"])
+            response.close()
+        self.assertIsNone(unknown_response)
+
+    @override_settings(JODIT_PRECOMPRESSED_STATIC=True)
+    def test_stale_manifest(self):
+        """Test that manifests are reloaded when settings change and missing files fall through."""
+        from .precompressed import get_manifest
+
+        with tempfile.TemporaryDirectory() as static_root:
+            os.makedirs(os.path.join(static_root, "jodit"))
+            manifest_path = os.path.join(static_root, "jodit", "precompressed.json")
+            with open(manifest_path, "w") as f:
+                json.dump(self.manifest, f)
+
+            with override_settings(STATIC_ROOT=static_root):
+                self.assertEqual(get_manifest(), self.manifest)
+                # A redeploy without the hashed files the loaded manifest names
+                path = "/static/" + self.manifest["jodit/jodit.min.css"]
+                self.assertIsNone(self.get_response(path, "gzip"))
+
+                manifest = {"jodit/jodit.min.css": "jodit/jodit.min.0123456789ab.css"}
+                with open(manifest_path, "w") as f:
+                    json.dump(manifest, f)
+            with override_settings(STATIC_ROOT=static_root):
+                self.assertEqual(get_manifest(), manifest)
+
+
+class PreloadMiddlewareTestCase(TestCase):
+    """Test cases for JoditPreloadMiddleware."""
+
+    def get_response(self, render_editor):
+        from django.http import HttpResponse
+
+        from .middleware import JoditPreloadMiddleware
+
+        def view(request):
+            html = JoditWidget().render("content", "") if render_editor else "<p>No editor</p>"
+            return HttpResponse(html)
+
+        return JoditPreloadMiddleware(view)(RequestFactory().get("/"))
+
+    def test_preload_headers_added(self):
+        """Test that pages rendering an editor get preload headers for its assets."""
+        response = self.get_response(render_editor=True)
+
+        self.assertIn("</static/jodit/jodit.min.css>; rel=preload; as=style", response["Link"])
+        self.assertIn("</static/jodit/jodit.min.js>; rel=preload; as=script", response["Link"])
+        self.assertIn("</static/jodit/jodit-init.js>; rel=preload; as=script", response["Link"])
+
+    def test_preload_headers_not_added_without_editor(self):
+        """Test that pages without an editor are left alone."""
+        response = self.get_response(render_editor=False)
+        self.assertFalse(response.has_header("Link"))
+
+    @override_settings(JODIT_JS_URL="https://cdn.example.com/jodit.js")
+    def test_preload_headers_custom_urls(self):
+        """Test that custom Jodit URLs are preloaded."""
+        response = self.get_response(render_editor=True)
+        self.assertIn("<https://cdn.example.com/jodit.js>; rel=preload; as=script", response["Link"])
+
+
+class ServiceWorkerTestCase(TestCase):
+    """Test cases for the service worker caching editor assets."""
+
+    @override_settings(JODIT_SERVICE_WORKER=True, JODIT_SERVICE_WORKER_SCOPE="/admin/")
+    def test_service_worker_view(self):
+        """Test that the service worker is served with the configured scope."""
+        response = self.client.get(reverse("jodit:service_worker"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/javascript")
+        self.assertEqual(response["Service-Worker-Allowed"], "/admin/")
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn(b"caches.open", response.content)
+
+    @override_settings(JODIT_SERVICE_WORKER=True, JODIT_SERVICE_WORKER_SCOPE="/admin/")
+    def test_widget_registers_service_worker(self):
+        """Test that widgets point to the versioned service worker when enabled."""
+        import jodit
+
+        html = JoditWidget().render("content", "", attrs={"id": "id_content"})
+
+        self.assertIn(f'data-jodit-sw="/jodit/sw.js?v={jodit.__version__}&amp;asset=', html)
+        self.assertIn("asset=%2Fstatic%2Fjodit%2Fjodit.min.js", html)
+        self.assertIn('data-jodit-sw-scope="/admin/"', html)
+
+    def test_widget_service_worker_disabled(self):
+        """Test that the service worker is opt-in."""
+        html = JoditWidget().render("content", "", attrs={"id": "id_content"})
+        self.assertNotIn("data-jodit-sw", html)
+        self.assertEqual(self.client.get(reverse("jodit:service_worker")).status_code, 404)
+
+    @override_settings(JODIT_SERVICE_WORKER=True)
+    def test_service_worker_scope_required(self):
+        """Test that the scope must be chosen rather than defaulting to the whole site."""
+        with self.assertRaises(ImproperlyConfigured):
+            JoditWidget().render("content", "")
+
+
+class DraftTestCase(TestCase):
+    """Test cases for the autosave draft store."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        self.user = get_user_model().objects.create_user("editor", password="secret")
+        self.url = reverse("jodit:draft")
+
+    def save(self, key, value):
+        return self.client.post(self.url, json.dumps({"key": key, "value": value}), content_type="application/json")
+
+    def test_draft_requires_login(self):
+        """Test that anonymous users cannot store drafts."""
+        response = self.save("/post/1/#content", "<p>Draft</p>")
+        self.assertEqual(response.status_code, 403)
+
+    def test_draft_roundtrip(self):
+        """Test saving, loading and deleting a draft."""
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.save("/post/1/#content", "<p>Draft</p>").status_code, 200)
+        response = self.client.get(self.url, {"key": "/post/1/#content"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["value"], "<p>Draft</p>")
+        self.assertIn("no-store", response["Cache-Control"])
+
+        response = self.client.delete(f"{self.url}?key=/post/1/%23content")
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(self.url, {"key": "/post/1/#content"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_drafts_are_per_user(self):
+        """Test that users only see their own drafts."""
+        from django.contrib.auth import get_user_model
+
+        self.client.force_login(self.user)
+        self.save("/post/1/#content", "<p>Draft</p>")
+
+        self.client.force_login(get_user_model().objects.create_user("other"))
+        response = self.client.get(self.url, {"key": "/post/1/#content"})
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(JODIT_DRAFT_MAX_SIZE=10)
+    def test_draft_too_large(self):
+        """Test that oversized drafts are rejected."""
+        self.client.force_login(self.user)
+        response = self.save("/post/1/#content", "<p>Too large draft</p>")
+        self.assertEqual(response.status_code, 413)
+
+    def test_invalid_draft(self):
+        """Test that malformed drafts are rejected."""
+        self.client.force_login(self.user)
+        response = self.client.post(self.url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(JODIT_CONFIGS={"default": {"autosave": True}, "simple": {}})
+    def test_widget_autosave_url(self):
+        """Test that autosave configs point the editor to the draft view."""
+        html = JoditWidget().render("content", "", attrs={"id": "id_content"})
+        self.assertIn(f'data-jodit-autosave-url="{self.url}"', html)
+        self.assertNotIn("data-jodit-autosave-url", JoditWidget(config_name="simple").render("content", ""))
+
+    @override_settings(JODIT_CONFIGS={"default": {"autosave": True}}, JODIT_DEFERRED_VALUE_THRESHOLD=10)
+    def test_widget_autosave_version(self):
+        """Test that drafts are keyed by the version of the content, deferred or not."""
+        widget = JoditWidget()
+        old = widget.get_context("content", "<p>Old content</p>", {})["widget"]["autosave_version"]
+        new = widget.get_context("content", "<p>New content</p>", {})["widget"]["autosave_version"]
+
+        self.assertNotEqual(old, new)
+        self.assertIn(f'data-jodit-autosave-version="{old}"', widget.render("content", "<p>Old content</p>"))
+
+
+@override_settings(JODIT_METRICS=True)
+class MetricsTestCase(TestCase):
+    """Test cases for the client performance metrics beacon."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        from .settings import get_cache
+
+        get_cache().clear()
+        self.client.force_login(get_user_model().objects.create_user("editor"))
+
+    def report(self, samples):
+        return self.client.post(
+            reverse("jodit:metrics_beacon"), json.dumps({"samples": samples}), content_type="application/json"
+        )
+
+    def test_widget_renders_metrics_url(self):
+        """Test that the widget tells the script where to send timings."""
+        html = JoditWidget().render("content", "")
+        self.assertIn(f'data-jodit-metrics="{reverse("jodit:metrics_beacon")}"', html)
+
+        with override_settings(JODIT_METRICS=False):
+            self.assertNotIn("data-jodit-metrics", JoditWidget().render("content", ""))
+
+    def test_beacon_aggregates_percentiles(self):
+        """Test that reported timings are summarized as percentiles."""
+        from django.contrib.auth import get_user_model
+
+        response = self.report([{"name": "make", "value": value} for value in range(1, 101)])
+        self.assertEqual(response.status_code, 204)
+        self.report([{"name": "make", "value": -1}, {"name": "editors", "value": "x"}])
+
+        url = reverse("jodit:metrics_summary")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user("admin", is_staff=True))
+        data = self.client.get(url).json()
+        self.assertEqual(data["make"]["count"], 100)
+        self.assertEqual((data["make"]["p50"], data["make"]["p95"], data["make"]["p99"]), (50, 95, 99))
+        self.assertEqual(data["editors"]["count"], 0)
+        self.assertIsNone(data["editors"]["p50"])
+
+    @override_settings(JODIT_METRICS_SAMPLES=10)
+    def test_beacon_keeps_recent_samples(self):
+        """Test that reservoirs are bounded to the most recent samples."""
+        from .metrics import summary
+
+        self.report([{"name": "make", "value": value} for value in range(100)])
+        self.assertEqual(summary()["make"]["count"], 10)
+        self.assertEqual(summary()["make"]["p50"], 94)
+
+    def test_beacon_rejects_invalid_reports(self):
+        """Test that malformed reports and disabled metrics are rejected."""
+        url = reverse("jodit:metrics_beacon")
+        self.assertEqual(self.client.post(url, "nope", content_type="application/json").status_code, 400)
+        self.assertEqual(self.client.post(url, "x" * 70000, content_type="application/json").status_code, 413)
+        self.assertEqual(self.report([{"name": "unknown", "value": 1}]).status_code, 400)
+        self.assertEqual(self.report([{"name": "make", "value": 1}, "make"]).status_code, 400)
+        with override_settings(JODIT_METRICS=False):
+            self.assertEqual(self.report([]).status_code, 404)
+
+    def test_beacon_requires_login_and_clamps(self):
+        """Test that anonymous reports are refused and outliers are clamped."""
+        from .metrics import summary
+
+        self.report([{"name": "make", "value": 10**9}, {"name": "editors", "value": 10**6}])
+        self.client.logout()
+        self.assertEqual(self.report([{"name": "make", "value": 1}]).status_code, 403)
+        self.assertEqual(summary()["make"]["count"], 1)
+        self.assertEqual(summary()["make"]["p50"], 60 * 1000)
+        self.assertEqual(summary()["editors"]["p50"], 1000)
+
+
+class InstrumentationTestCase(TestCase):
+    """Test cases for the server-side timing hooks."""
+
+    def test_timings_are_recorded(self):
+        """Test that widget and field operations are timed per config."""
+        from .instrumentation import record_timings
+        from .widgets import _get_client_config_json
+
+        _get_client_config_json.cache_clear()
+        with record_timings() as timings:
+            field = RichTextFormField(config_name="simple")
+            field.widget.render("content", "<p>Hello</p>")
+            # The encoded config is reused
+            field.widget.render("content", "<p>Hello</p>")
+            field.clean("<p>Hello</p>")
+
+        names = [(name, tags.get("config")) for name, duration, tags in timings]
+        self.assertEqual(
+            names,
+            [
+                ("widget.config", "simple"),
+                ("widget.json_encode", "simple"),
+                ("widget.render", "simple"),
+                ("widget.render", "simple"),
+                ("field.clean", "simple"),
+            ],
+        )
+        self.assertTrue(all(duration >= 0 for name, duration, tags in timings))
+
+    def test_disabled_timer_is_shared(self):
+        """Test that timing is a shared no-op without collectors."""
+        from .instrumentation import timed
+
+        self.assertIs(timed("widget.render"), timed("field.clean"))
+
+    @override_settings(JODIT_COLLECTORS=["jodit.instrumentation.StatsdCollector"], JODIT_STATSD_PREFIX="app.jodit")
+    def test_statsd_collector(self):
+        """Test that the statsd collector sends timings over UDP."""
+        from .instrumentation import get_collectors
+
+        collector = get_collectors()[0]
+        with mock.patch.object(collector, "socket") as socket:
+            JoditWidget().render("content", "")
+
+        sendto = socket.sendto
+        packets = [call.args[0].decode() for call in sendto.call_args_list]
+        self.assertTrue(any(packet.startswith("app.jodit.widget.render:") for packet in packets))
+        self.assertTrue(all(packet.endswith("|ms") for packet in packets))
+        self.assertEqual(sendto.call_args.args[1], ("localhost", 8125))
+
+    def test_debug_toolbar_panel(self):
+        """Test that the panel summarizes the timings of a request."""
+        try:
+            from .panels import JoditPanel
+        except ImportError:
+            self.skipTest("django-debug-toolbar is not installed")
+        from django.http import HttpResponse
+
+        def get_response(request):
+            JoditWidget().render("content", "")
+            JoditWidget(config_name="simple").render("content", "")
+            return HttpResponse()
+
+        panel = JoditPanel(mock.Mock(), get_response)
+        panel.record_stats = mock.Mock()
+        request = RequestFactory().get("/")
+        response = panel.process_request(request)
+        panel.generate_stats(request, response)
+
+        stats = panel.record_stats.call_args.args[0]
+        self.assertEqual(stats["editors"], 2)
+        renders = {row["config"]: row["count"] for row in stats["timings"] if row["name"] == "widget.render"}
+        self.assertEqual(renders, {"default": 1, "simple": 1})
+
+
+class CompressedSubmissionTestCase(TestCase):
+    """Test cases for values compressed by the browser before submit."""
+
+    class TestForm(forms.Form):
+        content = RichTextFormField(required=False)
+
+    def compress(self, value):
+        import base64
+
+        return base64.b64encode(gzip.compress(value.encode())).decode()
+
+    def test_compressed_value_decompressed(self):
+        """Test that compressed values replace the raw field."""
+        html_content = "<p>" + "Compressed ünïcode " * 1000 + "</p>"
+        form = self.TestForm(data={"content__jodit_gzip": self.compress(html_content)})
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["content"], html_content)
+
+    @override_settings(JODIT_MAX_DECOMPRESSED_SIZE=1000)
+    def test_compressed_value_too_large(self):
+        """Test that values expanding beyond the limit are rejected."""
+        form = self.TestForm(data={"content__jodit_gzip": self.compress("<p>" + "a" * 100_000 + "</p>")})
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors["content"], ["The submitted content is too large."])
+
+    def test_compressed_value_invalid(self):
+        """Test that corrupt payloads are rejected rather than saved as empty content."""
+        for payload in ("not base64!", "bm90IGd6aXA=", self.compress("<p>Truncated</p>")[:-8]):
+            form = self.TestForm(data={"content__jodit_gzip": payload})
+            self.assertFalse(form.is_valid())
+            self.assertEqual(form.errors["content"], ["The submitted content could not be decompressed."])
+
+    def test_compressed_value_invalid_other_field(self):
+        """Test that corrupt payloads are empty values in other fields using the widget."""
+
+        class CharFieldForm(forms.Form):
+            content = forms.CharField(widget=JoditWidget())
+
+        form = CharFieldForm(data={"content__jodit_gzip": "not base64!"}, initial={"content": "<p>Old</p>"})
+        self.assertTrue(form.has_changed())
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors["content"], ["This field is required."])
+        self.assertNotIn("not base64!", str(form["content"]))
+
+    def test_invalid_value_formatting(self):
+        """Test that rejected values can be formatted like any other value."""
+        value = JoditWidget().value_from_datadict({"content__jodit_gzip": "not base64!"}, {}, "content")
+        self.assertEqual(str(value), "")
+        self.assertEqual(f"{value}{value!r}", "<InvalidValue: invalid_compressed>")
+
+    def test_compressed_value_decompressed_once(self):
+        """Test that a payload read several times by a form is decompressed once."""
+        from . import widgets
+
+        form = self.TestForm(data={"content__jodit_gzip": self.compress("<p>Once</p>")}, initial={"content": ""})
+        with mock.patch.object(widgets, "decompress_value", wraps=widgets.decompress_value) as decompress:
+            self.assertTrue(form.has_changed())
+            self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["content"], "<p>Once</p>")
+        decompress.assert_called_once()
+
+
+class NormalizerTestCase(TestCase):
+    """Test cases for server-side HTML normalization."""
+
+    def test_office_markup_removed(self):
+        """Test that Word leftovers are removed."""
+        from .normalizer import normalize_html
+
+        html = (
+            '<p class="MsoNormal" style="mso-line-height-rule:exactly;color:red;color:blue">'
+            '<span lang="EN-US">Hello<o:p></o:p></span></p>'
+            "<!--[if gte mso 9]><xml><w:WordDocument></w:WordDocument></xml><![endif]-->"
+        )
+        self.assertEqual(normalize_html(html), '<p style="color: blue"><span lang="EN-US">Hello</span></p>')
+
+    def test_empty_and_plain_spans_removed(self):
+        """Test that empty spans keep their whitespace and plain spans are unwrapped."""
+        from .normalizer import normalize_html
+
+        html = '<p>a<span style="color: red"><span style="mso-spacerun:yes"> </span></span>b '
+        html += "<span><span>c</span></span></p>"
+        self.assertEqual(normalize_html(html), "<p>a b c</p>")
+        self.assertEqual(
+            normalize_html(html, remove_empty_spans=False),
+            '<p>a<span style="color: red"><span> </span></span>b <span><span>c</span></span></p>',
+        )
+
+    def test_svg_and_math_kept(self):
+        """Test that SVG and MathML keep their camelCase names and attributes."""
+        from .normalizer import normalize_html
+
+        svg = (
+            '<svg viewBox="0 0 10 10" preserveAspectRatio="xMidYMid"><defs><linearGradient id="g"/></defs>'
+            '<path d="M0 0" style="mso-x: 1"/><text>a &amp; b</text></svg>'
+        )
+        math = '<math><mi mathvariant="bold">x</mi></math>'
+        html = f'<p class="MsoNormal">{svg}{math}<o:p></o:p></p>'
+        self.assertEqual(normalize_html(html), f"<p>{svg}{math}</p>")
+
+    def test_nbsp_runs_collapsed(self):
+        """Test that runs of non-breaking spaces are shortened outside of preformatted text."""
+        from .normalizer import normalize_html
+
+        html = "<p>a&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;b</p><pre>a&nbsp;&nbsp;b</pre>"
+        self.assertEqual(normalize_html(html), "<p>a&nbsp; &nbsp; &nbsp;b</p><pre>a&nbsp;&nbsp;b</pre>")
+
+    def test_markup_preserved(self):
+        """Test that regular markup, entities and raw text survive normalization."""
+        from .normalizer import normalize_html
+
+        html = (
+            '<h1 id="t">A &amp; B &lt;C&gt;</h1><img src="a.png" alt="&quot;x&quot;"><br><script>if (a < b) {}</script>'
+        )
+        self.assertEqual(normalize_html(html), html)
+
+    def test_strip_styles(self):
+        """Test that inline styles can be stripped entirely."""
+        from .normalizer import normalize_html
+
+        self.assertEqual(normalize_html('<p style="color: red">a</p>', strip_styles=True), "<p>a</p>")
+
+    @override_settings(JODIT_CONFIGS={"default": {"normalizeHTML": True}, "simple": {}})
+    def test_form_field_normalizes(self):
+        """Test that RichTextFormField normalizes when the config enables it."""
+        html = "<p><span>Hello</span><o:p></o:p></p>"
+
+        field = RichTextFormField()
+        self.assertEqual(field.clean(html), "<p>Hello</p>")
+        self.assertEqual(RichTextFormField(config_name="simple").clean(html), html)
+
+    def test_normalize_report_command(self):
+        """Test that the report command shows bytes saved without changing rows."""
+        html = "<p><span>Hello</span>&nbsp;&nbsp;&nbsp;</p>"
+        TestModel.objects.create(content=html, custom_content="<p>Clean</p>")
+        TestModel.objects.create(content="", custom_content="<p>Clean</p>")
+
+        out = io.StringIO()
+        call_command("jodit_normalize_report", "jodit.TestModel", stdout=out)
+
+        self.assertIn("content: 1/1 rows changed", out.getvalue())
+        self.assertIn("custom_content: 0/2 rows changed", out.getvalue())
+        self.assertTrue(TestModel.objects.filter(content=html).exists())
+
+
+class ResponsiveImagesTestCase(TestCase):
+    """Test cases for responsive images of editor uploads."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from PIL import Image
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.addCleanup(cache.clear)
+        settings_override = override_settings(MEDIA_ROOT=tmpdir.name, MEDIA_URL="/media/")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.makedirs(os.path.join(tmpdir.name, "jodit"))
+        Image.new("RGB", (1000, 500), "red").save(os.path.join(tmpdir.name, "jodit", "photo.png"))
+        self.media_root = tmpdir.name
+
+    def render(self, content):
+        from django.template import engines
+
+        template = engines["django"].from_string("{% load jodit_tags %}{{ content|safe|jodit_responsive }}")
+        return template.render({"content": content})
+
+    def test_uploaded_image_rewritten(self):
+        """Test that editor uploads get srcset, sizes and dimensions."""
+        html = self.render('<p><img src="/media/jodit/photo.png" alt="A &amp; B"></p>')
+
+        self.assertIn('alt="A &amp; B"', html)
+        self.assertIn('loading="lazy" decoding="async" width="1000" height="500"', html)
+        self.assertIn(
+            'srcset="/jodit/image/320/jodit/photo.png 320w, /jodit/image/640/jodit/photo.png 640w, '
+            '/jodit/image/960/jodit/photo.png 960w, /media/jodit/photo.png 1000w" sizes="100vw"',
+            html,
+        )
+
+    def test_other_images_lazy_loaded(self):
+        """Test that images outside of the upload storage only get lazy loading."""
+        html = self.render('<img src="https://example.com/a.jpg" loading="eager">')
+        self.assertEqual(html, '<img src="https://example.com/a.jpg" loading="eager" decoding="async">')
+
+    def test_variant_generated_on_demand(self):
+        """Test that variants are generated once and then linked directly."""
+        from django.contrib.auth import get_user_model
+        from PIL import Image
+
+        # Anonymous requests get the original until the variant exists
+        response = self.client.get(reverse("jodit:image_variant", args=[320, "jodit/photo.png"]))
+        self.assertRedirects(response, "/media/jodit/photo.png", fetch_redirect_response=False)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, "jodit", "variants")))
+
+        self.client.force_login(get_user_model().objects.create_user("editor"))
+        response = self.client.get(reverse("jodit:image_variant", args=[320, "jodit/photo.png"]))
+        self.assertRedirects(response, "/media/jodit/variants/320/photo.png", fetch_redirect_response=False)
+        with Image.open(os.path.join(self.media_root, "jodit", "variants", "320", "photo.png")) as image:
+            self.assertEqual(image.size, (320, 160))
+
+        # Generating again keeps the existing variant, which anonymous requests get too
+        self.client.logout()
+        response = self.client.get(reverse("jodit:image_variant", args=[320, "jodit/photo.png"]))
+        self.assertRedirects(response, "/media/jodit/variants/320/photo.png", fetch_redirect_response=False)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "jodit", "variants", "320")), ["photo.png"])
+
+        html = self.render('<img src="/media/jodit/photo.png">')
+        self.assertIn("/media/jodit/variants/320/photo.png 320w", html)
+
+    def test_variant_of_corrupt_image(self):
+        """Test that uploads which can't be resized redirect to the original instead of failing."""
+        from django.contrib.auth import get_user_model
+
+        with open(os.path.join(self.media_root, "jodit", "photo.png"), "rb") as f:
+            data = f.read()
+        for name, content in (("jodit/truncated.png", data[: len(data) // 2]), ("jodit/text.png", b"Not an image")):
+            with open(os.path.join(self.media_root, name), "wb") as f:
+                f.write(content)
+
+        self.client.force_login(get_user_model().objects.create_user("editor"))
+        for name in ("jodit/truncated.png", "jodit/text.png"):
+            response = self.client.get(reverse("jodit:image_variant", args=[320, name]))
+            self.assertRedirects(response, f"/media/{name}", fetch_redirect_response=False)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, "jodit", "variants")))
+
+    def test_variant_rejects_unknown_requests(self):
+        """Test that only configured widths of existing uploads are generated."""
+        for width, name in ((321, "jodit/photo.png"), (320, "other/photo.png"), (320, "jodit/missing.png")):
+            response = self.client.get(reverse("jodit:image_variant", args=[width, name]))
+            self.assertEqual(response.status_code, 404)
+
+
+class UploadTestCase(TestCase):
+    """Test cases for the sync and async upload views."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmpdir.name, MEDIA_URL="/media/")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = tmpdir.name
+        self.user = get_user_model().objects.create_user("admin", is_staff=True)
+
+    def test_upload(self):
+        """Test that uploads are saved and returned in Jodit's response format."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("jodit:upload"),
+            {
+                "files[0]": create_image_file((10, 10), "my photo.png"),
+                "files[1]": SimpleUploadedFile("doc.pdf", b"%PDF-1.4"),
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["data"]["files"], ["/media/jodit/my_photo.png", "/media/jodit/doc.pdf"])
+        self.assertEqual(data["data"]["isImages"], [True, False])
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, "jodit", "my_photo.png")))
+
+    def test_upload_requires_staff(self):
+        """Test that only staff members can upload by default."""
+        response = self.client.post(reverse("jodit:upload"), {"files[0]": create_image_file((10, 10))})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.json()["success"])
+
+    @override_settings(JODIT_UPLOAD_MAX_SIZE=10)
+    def test_upload_rejects_invalid_files(self):
+        """Test that disallowed, oversized and broken files are rejected."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        self.client.force_login(self.user)
+        url = reverse("jodit:upload")
+        response = self.client.post(url, {"files[0]": SimpleUploadedFile("x.svg", b"<svg/>")})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"]["messages"], ["x.svg: file type is not allowed."])
+        self.assertEqual(self.client.post(url, {"files[0]": create_image_file((10, 10))}).status_code, 413)
+        with override_settings(JODIT_UPLOAD_MAX_SIZE=1000):
+            response = self.client.post(url, {"files[0]": SimpleUploadedFile("x.png", b"not an image")})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, "jodit")))
+
+    async def test_async_upload(self):
+        """Test that the async view saves uploads like the sync view."""
+        from asgiref.sync import sync_to_async
+
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.post(
+            reverse("jodit:upload_async"), {"files[0]": create_image_file((10, 10))}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["files"], ["/media/jodit/photo.png"])
+
+        await sync_to_async(self.async_client.logout)()
+        response = await self.async_client.post(
+            reverse("jodit:upload_async"), {"files[0]": create_image_file((10, 10))}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_cancelled_upload_is_deleted(self):
+        """Test that files of a cancelled upload are not kept."""
+        import threading
+
+        from .uploads import save_uploads
+
+        cancelled = threading.Event()
+        cancelled.set()
+        self.assertEqual(save_uploads([create_image_file((10, 10))], cancelled), [])
+        self.assertEqual(os.listdir(self.media_root), [])
+
+
+class ChunkedUploadTestCase(TestCase):
+    """Test cases for resumable chunked uploads."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(tmpdir.name, "media"),
+            MEDIA_URL="/media/",
+            JODIT_CHUNKED_UPLOAD_DIR=os.path.join(tmpdir.name, "chunks"),
+            JODIT_CHUNKED_UPLOAD_CHUNK_SIZE=10,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.tmpdir = tmpdir.name
+        self.client.force_login(get_user_model().objects.create_user("admin", is_staff=True))
+
+    def start(self, name="report.pdf", size=25):
+        return self.client.post(
+            reverse("jodit:chunked_upload_init"), {"name": name, "size": size}, content_type="application/json"
+        )
+
+    def put_chunk(self, upload, index, data, checksum=None):
+        import hashlib
+
+        headers = {"X-Chunk-Sha256": checksum or hashlib.sha256(data).hexdigest()}
+        return self.client.put(
+            f"{upload['url']}{index}/", data, content_type="application/octet-stream", headers=headers
+        )
+
+    def test_chunked_upload(self):
+        """Test uploading chunks out of order, resuming and assembling them."""
+        response = self.start()
+        self.assertEqual(response.status_code, 201)
+        upload = response.json()
+        self.assertEqual((upload["chunkSize"], upload["chunks"], upload["received"]), (10, 3, []))
+
+        self.assertEqual(self.put_chunk(upload, 2, b"%%%%%").status_code, 204)
+        self.assertEqual(self.put_chunk(upload, 0, b"%PDF-1.4\n#").status_code, 204)
+        self.assertEqual(self.client.get(upload["url"]).json()["received"], [0, 2])
+
+        response = self.client.post(upload["url"])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"]["messages"], ["1 chunks are missing."])
+
+        self.assertEqual(self.put_chunk(upload, 1, b"##########").status_code, 204)
+        response = self.client.post(upload["url"])
+        self.assertEqual(response.json()["data"]["files"], ["/media/jodit/report.pdf"])
+        with open(os.path.join(self.tmpdir, "media", "jodit", "report.pdf"), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4\n#" + b"#" * 10 + b"%%%%%")
+        self.assertEqual(self.client.get(upload["url"]).status_code, 404)
+
+    def upload_chunks(self, name, data):
+        upload = self.start(name, len(data)).json()
+        for index in range(upload["chunks"]):
+            self.put_chunk(upload, index, data[index * 10 : index * 10 + 10])
+        return upload, self.client.post(upload["url"])
+
+    def test_chunked_images_verified(self):
+        """Test that assembled images are verified like regular uploads."""
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 4), "red").save(buffer, "PNG")
+        upload, response = self.upload_chunks("photo.png", buffer.getvalue())
+        self.assertEqual(response.json()["data"]["files"], ["/media/jodit/photo.png"])
+
+        upload, response = self.upload_chunks("fake.png", b"<?php echo 'not an image'; ?>")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["data"]["messages"], ["fake.png: file is not a valid image."])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "media", "jodit", "fake.png")))
+        self.assertEqual(self.client.get(upload["url"]).status_code, 404)
+
+    def test_concatenated_reader_seeks(self):
+        """Test that the reader of assembled chunks can seek across chunks."""
+        from .chunked import ConcatenatedReader
+
+        paths = []
+        for i, data in enumerate([b"abc", b"", b"defg"]):
+            paths.append(os.path.join(self.tmpdir, f"chunk{i}"))
+            with open(paths[-1], "wb") as f:
+                f.write(data)
+        with io.BufferedReader(ConcatenatedReader(paths), 2) as reader:
+            self.assertEqual(reader.read(), b"abcdefg")
+            reader.seek(2)
+            self.assertEqual(reader.read(3), b"cde")
+            reader.seek(-1, io.SEEK_END)
+            self.assertEqual(reader.read(), b"g")
+
+    def test_invalid_chunks_rejected(self):
+        """Test that chunks with a wrong length, checksum or index are rejected."""
+        upload = self.start().json()
+        self.assertEqual(self.put_chunk(upload, 0, b"short").status_code, 400)
+        self.assertEqual(self.put_chunk(upload, 0, b"x" * 11).status_code, 400)
+        self.assertEqual(self.put_chunk(upload, 0, b"x" * 10, checksum="0" * 64).status_code, 400)
+        self.assertEqual(self.put_chunk(upload, 3, b"x" * 10).status_code, 400)
+        self.assertEqual(self.client.get(upload["url"]).json()["received"], [])
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, "chunks", upload["id"])), ["meta.json"])
+
+    @override_settings(JODIT_CHUNKED_UPLOAD_MAX_SIZE=100)
+    def test_invalid_uploads_rejected(self):
+        """Test that disallowed and oversized files can't be started."""
+        self.assertEqual(self.start(name="x.exe").status_code, 400)
+        self.assertEqual(self.start(size=101).status_code, 413)
+        self.assertEqual(self.start(size=0).status_code, 400)
+
+    def test_uploads_are_per_user(self):
+        """Test that other users can't access an upload, and that it can be aborted."""
+        from django.contrib.auth import get_user_model
+
+        upload = self.start().json()
+        self.client.force_login(get_user_model().objects.create_user("other", is_staff=True))
+        self.assertEqual(self.client.get(upload["url"]).status_code, 404)
+        self.assertEqual(self.put_chunk(upload, 0, b"x" * 10).status_code, 404)
+
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        self.assertEqual(self.client.delete(upload["url"]).status_code, 204)
+        self.assertEqual(self.client.get(upload["url"]).status_code, 404)
+
+
+class ProtectedMediaTestCase(TestCase):
+    """Test cases for serving private editor uploads."""
+
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+        from django.core.files.base import ContentFile
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmpdir.name, MEDIA_URL="/jodit/media/")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = tmpdir.name
+        get_storage().save("jodit/report.pdf", ContentFile(b"0123456789"))
+        self.url = reverse("jodit:media", args=["jodit/report.pdf"])
+        self.client.force_login(get_user_model().objects.create_user("reader"))
+
+    def test_serves_uploads(self):
+        """Test that uploads are streamed with caching and range headers."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("ETag", response)
+
+    def test_permissions(self):
+        """Test that anonymous users and other paths are refused."""
+        self.assertEqual(self.client.get(reverse("jodit:media", args=["jodit/missing.pdf"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("jodit:media", args=["other/report.pdf"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("jodit:media", args=["jodit/../report.pdf"])).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_range_requests(self):
+        """Test that byte ranges are served partially."""
+        response = self.client.get(self.url, headers={"Range": "bytes=2-4"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+
+        response = self.client.get(self.url, headers={"Range": "bytes=-3"})
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+        response = self.client.get(self.url, headers={"Range": "bytes=8-"})
+        self.assertEqual(b"".join(response.streaming_content), b"89")
+
+        response = self.client.get(self.url, headers={"Range": "bytes=10-"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+        self.assertEqual(self.client.get(self.url, headers={"Range": "bytes=0-1,4-5"}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, headers={"Range": "lines=1-2"}).status_code, 200)
+
+    def test_conditional_requests(self):
+        """Test that unchanged uploads are not sent again."""
+        response = self.client.get(self.url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertEqual(self.client.get(self.url, headers={"If-None-Match": etag}).status_code, 304)
+        self.assertEqual(self.client.get(self.url, headers={"If-Modified-Since": last_modified}).status_code, 304)
+
+        response = self.client.get(self.url, headers={"Range": "bytes=0-1", "If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+        response = self.client.get(self.url, headers={"Range": "bytes=0-1", "If-Range": '"outdated"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_offloaded_transfers(self):
+        """Test that transfers are handed to the front-end server when configured."""
+        with override_settings(JODIT_MEDIA_SENDFILE="x-accel-redirect", JODIT_MEDIA_ACCEL_PREFIX="/private/"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], "/private/jodit/report.pdf")
+        self.assertEqual(response.content, b"")
+
+        with override_settings(JODIT_MEDIA_SENDFILE="x-sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], os.path.join(self.media_root, "jodit", "report.pdf"))
+
+
+def failing_task(**payload):
+    raise ValueError("Task failed")
+
+
+def create_image_file(size, name="photo.png"):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class JobQueueTestCase(TestCase):
+    """Test cases for the background job queue."""
+
+    def test_claim_and_run(self):
+        """Test that due jobs are claimed once and deleted when they succeed."""
+        from .jobs import claim_jobs, enqueue, run_job
+        from .models import Job
+
+        enqueue("jodit.images.generate_variants", name="jodit/missing.png")
+        jobs = claim_jobs(10)
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual((jobs[0].status, jobs[0].attempts), (Job.RUNNING, 1))
+        self.assertEqual(claim_jobs(10), [])
+
+        self.assertTrue(run_job(jobs[0]))
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JODIT_JOB_RETRY_DELAY=10, JODIT_JOB_MAX_ATTEMPTS=2)
+    def test_retries_with_backoff(self):
+        """Test that failed jobs are retried later, then marked as failed."""
+        from django.utils import timezone
+
+        from .jobs import claim_jobs, enqueue, run_job
+        from .models import Job
+
+        job = enqueue("jodit.tests.failing_task", value=1)
+        self.assertFalse(run_job(claim_jobs(1)[0]))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn("ValueError: Task failed", job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timezone.timedelta(seconds=9))
+        self.assertEqual(claim_jobs(1), [])
+
+        Job.objects.update(run_at=timezone.now())
+        self.assertFalse(run_job(claim_jobs(1)[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    @override_settings(JODIT_JOB_TIMEOUT=60)
+    def test_abandoned_jobs_are_taken_over(self):
+        """Test that jobs of a dead worker are claimed again after the timeout."""
+        from django.utils import timezone
+
+        from .jobs import claim_jobs, enqueue
+        from .models import Job
+
+        enqueue("jodit.images.generate_variants", name="jodit/photo.png")
+        claim_jobs(1)
+        self.assertEqual(claim_jobs(1), [])
+        Job.objects.update(locked_at=timezone.now() - timezone.timedelta(seconds=61))
+        self.assertEqual(claim_jobs(1)[0].attempts, 2)
+
+    @override_settings(JODIT_JOBS=True)
+    def test_upload_queues_variants(self):
+        """Test that uploads queue their processing instead of running it."""
+        from django.contrib.auth import get_user_model
+
+        from .models import Job
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.client.force_login(get_user_model().objects.create_user("admin", is_staff=True))
+
+        with override_settings(MEDIA_ROOT=tmpdir.name, MEDIA_URL="/media/"):
+            response = self.client.post(reverse("jodit:upload"), {"files[0]": create_image_file((700, 100))})
+
+        self.assertEqual(response.json()["data"]["files"], ["/media/jodit/photo.png"])
+        self.assertEqual(
+            list(Job.objects.values_list("task", "payload")),
+            [("jodit.images.generate_variants", {"name": "jodit/photo.png"})],
+        )
+
+
+class InlineExecutor:
+    """Executor running submitted calls right away, in the calling thread."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class MigrationsTestCase(TransactionTestCase):
+    """
+    Test cases for the shipped migrations.
+
+    The test database is created without them for TestModel, so they are
+    loaded here with MIGRATION_MODULES reset.
+    """
+
+    @override_settings(MIGRATION_MODULES={})
+    def test_migrations_match_models(self):
+        """Test that the migrations create the job table and leave no model changes behind."""
+        from django.apps import apps
+        from django.db import connection
+        from django.db.migrations.autodetector import MigrationAutodetector
+        from django.db.migrations.executor import MigrationExecutor
+        from django.db.migrations.state import ProjectState
+
+        from .models import Job
+
+        with connection.schema_editor() as editor:
+            editor.delete_model(Job)
+        executor = MigrationExecutor(connection)
+        self.addCleanup(executor.recorder.migration_qs.filter(app="jodit").delete)
+        executor.migrate(executor.loader.graph.leaf_nodes("jodit"))
+        self.assertIn(Job._meta.db_table, connection.introspection.table_names())
+
+        autodetector = MigrationAutodetector(executor.loader.project_state(), ProjectState.from_apps(apps))
+        changes = autodetector.changes(graph=executor.loader.graph, trim_to_apps={"jodit"})
+        operations = [
+            operation
+            for migration in changes.get("jodit", [])
+            for operation in migration.operations
+            if getattr(operation, "name", None) != TestModel.__name__
+        ]
+        self.assertEqual(operations, [])
+
+
+class JobWorkerTestCase(TransactionTestCase):
+    """
+    Test cases for the jodit_worker command.
+
+    The in-memory SQLite test database can't be written from several threads
+    at once, so jobs run in the command's thread.
+    """
+
+    @mock.patch("jodit.management.commands.jodit_worker.ThreadPoolExecutor", InlineExecutor)
+    def test_worker_runs_jobs(self):
+        """Test that the worker runs queued jobs until the queue is empty."""
+        from .jobs import enqueue
+        from .models import Job
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        with override_settings(MEDIA_ROOT=tmpdir.name, MEDIA_URL="/media/"):
+            for name in ("a.png", "b.png", "c.png"):
+                get_storage().save(f"jodit/{name}", create_image_file((700, 100)))
+                enqueue("jodit.images.generate_variants", name=f"jodit/{name}")
+            enqueue("jodit.tests.failing_task")
+
+            out = io.StringIO()
+            call_command("jodit_worker", "--burst", "--concurrency=2", stdout=out)
+
+            self.assertIn("3 jobs succeeded, 1 failed.", out.getvalue())
+            self.assertEqual(list(Job.objects.values_list("task", flat=True)), ["jodit.tests.failing_task"])
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(tmpdir.name, "jodit", "variants", "640"))),
+                [
+                    "a.png",
+                    "b.png",
+                    "c.png",
+                ],
+            )
+
+
+class ProjectionTestCase(TestCase):
+    """Test cases for text extraction and API projections of rich text."""
+
+    html = (
+        "<h1>Title</h1><p>First <b>bold</b>&nbsp;paragraph with a <a href='/x'>link</a>.</p>"
+        "<script>ignored()</script><ul><li>One</li><li>Two<br>lines</li></ul>"
+        "<table><tr><td>A</td><td>B</td></tr></table><p><img src='a.png'></p>"
+    )
+
+    def setUp(self):
+        from .settings import get_cache
+
+        get_cache().clear()
+
+    def test_text_and_metrics(self):
+        """Test that blocks become lines and skipped elements are left out."""
+        from .text import html_metrics, html_to_text
+
+        self.assertEqual(html_to_text(self.html), "Title\nFirst bold paragraph with a link.\nOne\nTwo\nlines\nA B")
+        self.assertEqual(html_metrics(self.html), {"characters": 57, "words": 12, "images": 1, "links": 1})
+
+    def test_excerpt(self):
+        """Test that excerpts are cut at word boundaries and stop parsing early."""
+        from .text import TextExtractor, excerpt
+
+        self.assertEqual(excerpt(self.html, 100), "Title First bold paragraph with a link. One Two lines A B")
+        self.assertEqual(excerpt(self.html, 20), "Title First bold…")
+        self.assertLessEqual(len(excerpt(self.html, 20)), 20)
+        with mock.patch.object(TextExtractor, "handle_data", autospec=True, side_effect=TextExtractor.handle_data) as h:
+            excerpt("<p>word word</p>" * 1000, 30)
+        self.assertLess(h.call_count, 10)
+
+    def test_parse_projections(self):
+        """Test that projection lists are validated."""
+        from .projections import ProjectionError, parse_projections
+
+        self.assertEqual(parse_projections("text, excerpt:50,excerpt,text"), ("text", "excerpt:50", "excerpt:200"))
+        for spec in ("bogus", "excerpt:0", "excerpt:x", "excerpt:999999", "text:1"):
+            with self.assertRaises(ProjectionError):
+                parse_projections(spec)
+        with self.assertRaises(ProjectionError):
+            parse_projections("html", allowed=("text",))
+
+    def test_project_computes_only_requested_and_caches(self):
+        """Test that only requested projections are computed, once per content version."""
+        from . import projections
+
+        with mock.patch.object(projections, "extract", wraps=projections.extract) as extract:
+            result = projections.project(self.html, ("excerpt:10", "metrics"))
+            self.assertEqual(result, {"excerpt": "Title…", "metrics": projections.get_metrics(extract(self.html))})
+            self.assertEqual(extract.call_count, 2)
+            extract.reset_mock()
+            self.assertEqual(projections.project(self.html, ("metrics", "excerpt:10")), result)
+            extract.assert_not_called()
+            projections.project(self.html, ("text", "metrics", "html"))
+            self.assertEqual(extract.call_count, 1)
+        self.assertIsNone(projections.project(None, ("text",)))
+
+    def test_projector(self):
+        """Test the dependency-free serializer."""
+        from .projections import RichTextProjector
+
+        projector = RichTextProjector(default="excerpt:5", allowed=("text", "excerpt"))
+        self.assertEqual(projector.to_representation("<p>Hello world</p>"), {"excerpt": "Hell…"})
+        self.assertEqual(projector.to_representation("<p>Hi</p>", "text"), {"text": "Hi"})
+
+    def test_serializer_field(self):
+        """Test the Django REST framework field reading projections from the request."""
+        from rest_framework import serializers
+        from rest_framework.request import Request
+
+        from .serializers import RichTextSerializerField
+
+        class Serializer(serializers.Serializer):
+            content = RichTextSerializerField(default_projections="text")
+
+        def serialize(query):
+            request = Request(RequestFactory().get("/", query))
+            return Serializer({"content": "<p>Hello <b>world</b></p>"}, context={"request": request}).data
+
+        self.assertEqual(serialize({})["content"], {"text": "Hello world"})
+        self.assertEqual(
+            serialize({"content_projections": "html,excerpt:6"})["content"],
+            {"html": "<p>Hello <b>world</b></p>", "excerpt": "Hello…"},
+        )
+        with self.assertRaises(serializers.ValidationError):
+            serialize({"content_projections": "bogus"})
+        serializer = Serializer(data={"content": " <p>Hi</p>"})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["content"], " <p>Hi</p>")
+
+
+class AdminPreviewTestCase(TestCase):
+    """Test cases for truncated rich text previews in admin changelists."""
+
+    def setUp(self):
+        from .settings import get_cache
+
+        get_cache().clear()
+
+    def test_truncate_html(self):
+        """Test that previews keep inline formatting only and close open tags."""
+        from .text import HTMLTruncator, truncate_html
+
+        html = '<p>Hello <b onclick="x()">bold <i>world</i></b></p><script>x()</script><p>and <img src=x> more</p>'
+        self.assertEqual(truncate_html(html, 100), "Hello<b> bold<i> world</i></b> and more")
+        self.assertEqual(truncate_html(html, 13), "Hello<b> bold…</b>")
+        self.assertEqual(truncate_html("<p>&lt;script&gt; text</p>", 8), "&lt;script&gt;…")
+        self.assertEqual(truncate_html("<em>x</b>y</em>z", 5), "<em>xy</em>z")
+        with mock.patch.object(HTMLTruncator, "handle_data", autospec=True, side_effect=HTMLTruncator.handle_data) as h:
+            truncate_html("<p>word word</p>" * 1000, 30)
+        self.assertLess(h.call_count, 10)
+
+    def test_preview_cached_per_version(self):
+        """Test that previews are computed once per version of the content."""
+        from .admin import rich_text_preview
+        from .text import truncate_html
+
+        preview = rich_text_preview("content", 5)
+        obj = TestModel(pk=1, content="<p>Hello <b>world</b></p>")
+        self.assertEqual(preview.short_description, "Content")
+        with mock.patch("jodit.admin.truncate_html", wraps=truncate_html) as truncate:
+            self.assertEqual(preview(obj), "Hello…")
+            self.assertEqual(preview(obj), "Hello…")
+            self.assertEqual(truncate.call_count, 1)
+            obj.content = "<p>Bye</p>"
+            self.assertEqual(preview(obj), "Bye")
+            self.assertEqual(truncate.call_count, 2)
+        self.assertEqual(preview(TestModel(pk=2, content="")), "")
+
+    def test_preview_version_field_cache_key(self):
+        """Test that datetime versions give cache keys memcached accepts."""
+        import datetime as dt
+
+        from django.core.cache.backends.base import memcache_key_warnings
+
+        from .admin import rich_text_preview
+
+        preview = rich_text_preview("content", 5, version_field="updated_at")
+        obj = TestModel(pk=1, content="<p>Hello world</p>")
+        obj.updated_at = dt.datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt.timezone.utc)
+        cache = mock.Mock(**{"get.return_value": None})
+        with mock.patch("jodit.admin.get_cache", return_value=cache):
+            self.assertEqual(preview(obj), "Hello…")
+            obj.updated_at += dt.timedelta(seconds=1)
+            preview(obj)
+        (first_key, *_), _ = cache.set.call_args_list[0]
+        (second_key, *_), _ = cache.set.call_args_list[1]
+        self.assertEqual(list(memcache_key_warnings(first_key)), [])
+        self.assertNotEqual(first_key, second_key)
+
+    def test_changelist_defers_previewed_fields(self):
+        """Test that changelists skip loading fields with precomputed previews."""
+        from django.contrib import admin
+        from django.contrib.auth.models import User
+
+        from .admin import RichTextPreviewMixin, rich_text_preview
+
+        TestModel.objects.create(content="<p>Long document</p>", custom_content="<b>Long</b> doc")
+
+        class TestModelAdmin(RichTextPreviewMixin, admin.ModelAdmin):
+            list_display = ["pk", rich_text_preview("content", 20, preview_field="custom_content")]
+
+        request = RequestFactory().get("/")
+        request.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        model_admin = TestModelAdmin(TestModel, admin.AdminSite())
+        changelist = model_admin.get_changelist_instance(request)
+        obj = changelist.get_queryset(request).get()
+        self.assertEqual(obj.get_deferred_fields(), {"content"})
+        self.assertEqual(model_admin.list_display[1](obj), "<b>Long</b> doc")
+
+
+class ExportTestCase(TestCase):
+    """Test cases for Markdown conversion and the jodit_export command."""
+
+    def test_html_to_markdown(self):
+        """Test that HTML is converted to Markdown."""
+        from jodit.text import html_to_markdown
+
+        html = (
+            '<h2>Title</h2><p>Some <b>bold</b>, <em>emphasis</em> and <a href="/x">a link</a>.<br>Next</p>'
+            "<ul><li>One</li><li>Two<ol><li>Nested</li></ol></li></ul><blockquote><p>A</p><p>B</p></blockquote>"
+            "<table><tr><th>H</th></tr><tr><td>1</td></tr></table><script>alert(1)</script>"
+        )
+        self.assertEqual(
+            html_to_markdown(html),
+            "## Title\n\nSome **bold**, *emphasis* and [a link](/x).  \nNext\n\n- One\n- Two\n   1. Nested\n\n"
+            "> A\n>\n> B\n\n| H |\n|---|\n| 1 |\n",
+        )
+
+    def test_html_to_markdown_escapes(self):
+        """Test that Markdown syntax in text and preformatted blocks is kept literal."""
+        from jodit.text import html_to_markdown
+
+        self.assertEqual(html_to_markdown("<p>2 * 3 &lt;b&gt;</p>"), "2 \\* 3 \\<b\\>\n")
+        self.assertEqual(html_to_markdown("<pre>a * b\n  c</pre>"), "```\na * b\n  c\n```\n")
+        self.assertEqual(html_to_markdown(""), "")
+
+    def test_html_to_markdown_edge_cases(self):
+        """Test quotes starting documents, code spans, block list items and line-start syntax."""
+        from jodit.text import html_to_markdown
+
+        self.assertEqual(html_to_markdown("<blockquote>quote</blockquote>"), "> quote\n")
+        self.assertEqual(html_to_markdown("<p>Run <code>a*b_c</code></p>"), "Run `a*b_c`\n")
+        self.assertEqual(html_to_markdown("<code>a`b</code> <code>`c</code>"), "``a`b`` `` `c ``\n")
+        self.assertEqual(html_to_markdown("<code><b>x</b></code>"), "`x`\n")
+        self.assertEqual(html_to_markdown("<ol><li><p>x</p></li></ol>"), "1. x\n")
+        self.assertEqual(html_to_markdown("<ul><li></li><li>y</li></ul>"), "- \n- y\n")
+        self.assertEqual(
+            html_to_markdown("<p>1. One</p><p># Two</p><p>- Three<br>+ Four</p><ul><li>2) Five</li></ul><p>A 1. B</p>"),
+            "1\\. One\n\n\\# Two\n\n\\- Three  \n\\+ Four\n\n- 2\\) Five\n\nA 1. B\n",
+        )
+
+    def export(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("jodit_export", "jodit.TestModel", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_export_formats(self):
+        """Test that each format exports the rows in primary key order, in and out of process."""
+        first = TestModel.objects.create(content="<p>First <b>post</b></p>", custom_content="")
+        second = TestModel.objects.create(content="<p>Second</p>", custom_content="<p>Custom</p>")
+
+        for workers in ("0", "2"):
+            with self.subTest(workers=workers):
+                out, err = self.export("--workers", workers, "--batch-size", "1")
+                self.assertEqual(
+                    out,
+                    f"<!-- jodit.testmodel {first.pk} content -->\n\nFirst **post**\n\n"
+                    f"<!-- jodit.testmodel {second.pk} content -->\n\nSecond\n\n"
+                    f"<!-- jodit.testmodel {second.pk} custom_content -->\n\nCustom\n\n",
+                )
+                self.assertIn("Exported 2 objects.", err)
+
+                out, _ = self.export("--workers", workers, "--format", "text", "--field", "content")
+                self.assertEqual(
+                    out,
+                    f"=== jodit.testmodel {first.pk} content ===\n\nFirst post\n\n"
+                    f"=== jodit.testmodel {second.pk} content ===\n\nSecond\n\n",
+                )
+
+                out, _ = self.export("--workers", workers, "--format", "ndjson", "--ndjson-content", "markdown")
+                records = [json.loads(line) for line in out.splitlines()]
+                self.assertEqual(
+                    records[0],
+                    {"model": "jodit.testmodel", "pk": first.pk, "content": "First **post**\n", "custom_content": ""},
+                )
+                self.assertEqual(len(records), 2)
+
+    def test_export_to_file(self):
+        """Test that --output writes to a file and bad arguments are rejected."""
+        TestModel.objects.create(content="<p>Café</p>")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "export.txt")
+            out, _ = self.export("--workers", "0", "--format", "text", "--output", path)
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("Café", f.read())
+        self.assertEqual(out, "")
+
+        with self.assertRaises(CommandError):
+            self.export("--field", "title")
+        with self.assertRaises(CommandError):
+            self.export("--workers", "-1")
@@ -32,7 +32,10 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
 ]
 
-ROOT_URLCONF = []
+# Create tables without migrations, so that TestModel in tests.py gets one too
+MIGRATION_MODULES = {"jodit": None}
+
+ROOT_URLCONF = "jodit.testurls"
 
 TEMPLATES = [
     {
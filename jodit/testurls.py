@@ -0,0 +1,7 @@
+"""URL configuration for testing django-jodit."""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path("jodit/", include("jodit.urls")),
+]
@@ -0,0 +1,507 @@
+"""Plain text, Markdown, excerpts, truncated previews and metrics of rich text content."""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from .normalizer import VOID_ELEMENTS
+
+# Elements starting a new line of text
+BLOCK_ELEMENTS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "figure", "footer",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "tr", "ul",
+}  # fmt: skip
+
+# Elements whose content is not text
+SKIPPED_ELEMENTS = {"head", "noscript", "script", "style", "template", "title"}
+
+# Inline formatting kept by truncate_html()
+PREVIEW_TAGS = {"b", "code", "del", "em", "i", "ins", "mark", "s", "small", "strike", "strong", "sub", "sup", "u"}
+
+ELLIPSIS = "…"
+
+# Markdown of inline formatting elements
+MARKDOWN_INLINE = {"b": "**", "strong": "**", "i": "*", "em": "*", "s": "~~", "del": "~~", "strike": "~~"}
+
+# Characters escaped in Markdown text
+MARKDOWN_ESCAPE_RE = re.compile(r"([\\`*_\[\]<>])")
+
+# Text starting a list item, heading or rule when at the start of a line
+MARKDOWN_LINE_START_RE = re.compile(r"^(?:(\d+)([.)])(?=\s|$)|([#+=-]))")
+
+
+class LimitReached(Exception):
+    """Raised by TextExtractor and HTMLTruncator to stop parsing once they have enough text."""
+
+
+class TextExtractor(HTMLParser):
+    """
+    Streaming extractor of the text of HTML, counting images and links too.
+
+    With a limit, parsing stops with LimitReached as soon as more than limit
+    characters of text were found, so long documents are not parsed to the end
+    when only their beginning is needed.
+    """
+
+    def __init__(self, limit=None):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts = []
+        self.length = 0
+        self.images = 0
+        self.links = 0
+        self.skipped_depth = 0
+
+    def get_text(self):
+        """Return the text, one line per block with whitespace collapsed."""
+        lines = (" ".join(line.split()) for line in "".join(self.parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_ELEMENTS:
+            self.skipped_depth += 1
+        elif tag in BLOCK_ELEMENTS:
+            self.parts.append("\n")
+        elif tag in ("td", "th"):
+            self.parts.append(" ")
+        elif tag == "img":
+            self.images += 1
+        elif tag == "a" and dict(attrs).get("href"):
+            self.links += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in SKIPPED_ELEMENTS:
+            self.skipped_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_ELEMENTS:
+            self.skipped_depth -= self.skipped_depth > 0
+        elif tag in BLOCK_ELEMENTS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self.skipped_depth:
+            return
+        self.parts.append(data)
+        if self.limit is not None:
+            # Length of the text once whitespace is collapsed
+            self.length += sum(len(word) + 1 for word in data.split())
+            if self.length > self.limit:
+                raise LimitReached
+
+
+def extract(html, limit=None):
+    """Return a TextExtractor fed with html, stopped early if limit was reached."""
+    extractor = TextExtractor(limit)
+    try:
+        extractor.feed(html or "")
+        extractor.close()
+    except LimitReached:
+        pass
+    return extractor
+
+
+def html_to_text(html):
+    """Return the text of html, one line per paragraph or other block."""
+    return extract(html).get_text()
+
+
+def excerpt(html, length):
+    """
+    Return the first length characters of the text of html on a single line.
+
+    Longer text is cut at a word boundary where possible and ends with an
+    ellipsis, which counts towards length.
+    """
+    text = " ".join(extract(html, limit=length).get_text().split())
+    if len(text) <= length:
+        return text
+    cut = text[: max(length - 1, 0)]
+    if text[len(cut)] != " " and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:.") + ELLIPSIS
+
+
+def get_metrics(extractor):
+    """Return the character, word, image and link counts found by a TextExtractor."""
+    text = extractor.get_text()
+    return {
+        "characters": len(text),
+        "words": len(text.split()),
+        "images": extractor.images,
+        "links": extractor.links,
+    }
+
+
+def html_metrics(html):
+    """Return the character, word, image and link counts of html."""
+    return get_metrics(extract(html))
+
+
+class HTMLTruncator(HTMLParser):
+    """
+    Streaming truncator of HTML to a number of characters of text.
+
+    Keeps the given inline tags, without attributes, and drops all others, so
+    the result is safe to show; open tags are closed at the end. Parsing stops
+    with LimitReached as soon as the text does not fit.
+    """
+
+    def __init__(self, length, tags=PREVIEW_TAGS):
+        super().__init__(convert_charrefs=True)
+        self.remaining = length
+        self.tags = tags
+        self.output = []
+        self.open_tags = []
+        self.skipped_depth = 0
+        # Whether whitespace separates the next word from the text written so far
+        self.space = False
+        self.written = False
+        self.truncated = False
+
+    def get_result(self):
+        ellipsis = ELLIPSIS if self.truncated else ""
+        return "".join(self.output) + ellipsis + "".join(f"</{tag}>" for tag in reversed(self.open_tags))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_ELEMENTS:
+            self.skipped_depth += 1
+        elif tag in BLOCK_ELEMENTS or tag in ("td", "th"):
+            self.space = True
+        elif tag in self.tags and not self.skipped_depth:
+            self.output.append(f"<{tag}>")
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in SKIPPED_ELEMENTS:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_ELEMENTS:
+            self.skipped_depth -= self.skipped_depth > 0
+        elif tag in BLOCK_ELEMENTS:
+            self.space = True
+        elif tag in self.open_tags:
+            # Close the tags left open inside this one too
+            while self.open_tags:
+                closed = self.open_tags.pop()
+                self.output.append(f"</{closed}>")
+                if closed == tag:
+                    break
+
+    def handle_data(self, data):
+        if self.skipped_depth:
+            return
+        self.space = self.space or data[:1].isspace()
+        for word in data.split():
+            if self.space and self.written:
+                word = " " + word
+            if len(word) > self.remaining:
+                if not self.written:
+                    # Cut a first word longer than the whole preview
+                    self.output.append(escape(word[: self.remaining], quote=False))
+                # Drop tags opened right before the cut
+                while self.open_tags and self.output[-1] == f"<{self.open_tags[-1]}>":
+                    self.output.pop()
+                    self.open_tags.pop()
+                self.truncated = True
+                raise LimitReached
+            self.output.append(escape(word, quote=False))
+            self.remaining -= len(word)
+            self.written = True
+            self.space = True
+        self.space = data[-1:].isspace()
+
+
+def truncate_html(html, length, tags=PREVIEW_TAGS):
+    """
+    Return html truncated to length characters of text, with balanced tags.
+
+    Only the inline formatting tags in tags are kept, blocks become spaces.
+    Truncated text ends with an ellipsis, which does not count towards length.
+    """
+    truncator = HTMLTruncator(length, tags)
+    try:
+        truncator.feed(html or "")
+        truncator.close()
+    except LimitReached:
+        pass
+    return truncator.get_result()
+
+
+class MarkdownConverter(HTMLParser):
+    """
+    Streaming converter of HTML to Markdown.
+
+    Handles headings, paragraphs, line breaks, emphasis, inline code and
+    preformatted blocks, links, images, nested lists, block quotes, rules and
+    tables; other elements are unwrapped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output = []
+        # Cells of the table row being converted, and text of the current cell
+        self.row = None
+        self.cell = None
+        self.rows_written = 0
+        # Item counts of open ordered lists, None for unordered ones
+        self.lists = []
+        self.quote_depth = 0
+        self.links = []
+        self.skipped_depth = 0
+        self.preformatted = False
+        # Text of the inline code span being converted
+        self.code = None
+        # Line breaks and the space pending before the next text
+        self.newlines = 0
+        self.break_depth = 0
+        self.space = False
+        # Whether no text was written on the current line, and whether only a list marker was
+        self.line_start = True
+        self.item_start = False
+
+    def get_result(self):
+        return "".join(self.output).strip() + "\n" if self.output else ""
+
+    def prefix(self):
+        return "> " * self.quote_depth + "   " * len(self.lists)
+
+    def write(self, text):
+        if self.cell is not None:
+            if self.space and self.cell:
+                self.cell.append(" ")
+            self.cell.append(text)
+        else:
+            if not self.output:
+                self.output.append(self.prefix())
+            elif self.newlines:
+                # Blank lines stay inside the block quotes opened before them
+                blank = "\n" + ("> " * self.break_depth).rstrip()
+                self.output.append(blank * (self.newlines - 1) + "\n" + self.prefix())
+            elif self.space and not self.output[-1].endswith((" ", "\n")):
+                self.output.append(" ")
+            self.output.append(text)
+            self.newlines = 0
+        self.space = False
+        self.line_start = False
+        self.item_start = False
+
+    def inline(self, text):
+        """Write inline markup, which code spans show literally and so drop."""
+        if self.code is None:
+            self.write(text)
+
+    def block(self, newlines=2):
+        # Content of a list item starts on the line of its marker
+        if self.item_start:
+            return
+        self.break_depth = min(self.break_depth, self.quote_depth) if self.newlines else self.quote_depth
+        self.newlines = max(self.newlines, newlines)
+        self.space = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_ELEMENTS or self.skipped_depth:
+            self.skipped_depth += tag not in VOID_ELEMENTS
+        elif tag in MARKDOWN_INLINE:
+            self.inline(MARKDOWN_INLINE[tag])
+        elif hasattr(self, f"start_{tag}"):
+            getattr(self, f"start_{tag}")(dict(attrs))
+        elif tag in BLOCK_ELEMENTS:
+            self.block()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.skipped_depth:
+            self.skipped_depth -= tag not in VOID_ELEMENTS
+        elif tag in MARKDOWN_INLINE:
+            self.inline(MARKDOWN_INLINE[tag])
+        elif hasattr(self, f"end_{tag}"):
+            getattr(self, f"end_{tag}")()
+        elif tag in BLOCK_ELEMENTS:
+            self.block()
+
+    def start_heading(self, level):
+        self.block()
+        self.write("#" * level + " ")
+
+    def start_h1(self, attrs):
+        self.start_heading(1)
+
+    def start_h2(self, attrs):
+        self.start_heading(2)
+
+    def start_h3(self, attrs):
+        self.start_heading(3)
+
+    def start_h4(self, attrs):
+        self.start_heading(4)
+
+    def start_h5(self, attrs):
+        self.start_heading(5)
+
+    def start_h6(self, attrs):
+        self.start_heading(6)
+
+    def start_br(self, attrs):
+        if self.cell is None:
+            self.write("  ")
+        self.block(1)
+
+    def start_hr(self, attrs):
+        self.block()
+        self.write("---")
+        self.block()
+
+    def start_img(self, attrs):
+        self.inline(f"![{self.escape(attrs.get('alt') or '')}]({attrs.get('src') or ''})")
+
+    def start_a(self, attrs):
+        self.links.append(attrs.get("href"))
+        if attrs.get("href"):
+            self.inline("[")
+
+    def end_a(self):
+        href = self.links.pop() if self.links else None
+        if href:
+            self.inline(f"]({href})")
+
+    def start_code(self, attrs):
+        if not self.preformatted and self.code is None:
+            self.code = []
+
+    def end_code(self):
+        if self.code is None:
+            return
+        text, self.code = " ".join("".join(self.code).split()), None
+        if text:
+            # Backslash escapes are literal in code spans, which fences longer than any backtick run delimit
+            fence = "`" * (max(map(len, re.findall("`+", text)), default=0) + 1)
+            padding = " " if text[0] == "`" or text[-1] == "`" else ""
+            self.write(f"{fence}{padding}{text}{padding}{fence}")
+
+    def start_pre(self, attrs):
+        self.block()
+        self.write("```")
+        self.block(1)
+        self.preformatted = True
+
+    def end_pre(self):
+        if self.preformatted:
+            self.preformatted = False
+            self.block(1)
+            self.write("```")
+            self.block()
+
+    def start_ul(self, attrs, number=None):
+        self.block(1 if self.lists else 2)
+        self.lists.append(number)
+
+    def start_ol(self, attrs):
+        self.start_ul(attrs, 0)
+
+    def end_ul(self):
+        if self.lists:
+            self.lists.pop()
+            self.block(1 if self.lists else 2)
+
+    end_ol = end_ul
+
+    def start_li(self, attrs):
+        if not self.lists:
+            return
+        self.block(1)
+        # The marker is indented like the parent list, its content one level deeper
+        number = self.lists.pop()
+        self.write("- " if number is None else f"{number + 1}. ")
+        self.lists.append(None if number is None else number + 1)
+        self.line_start = self.item_start = True
+
+    def end_li(self):
+        self.item_start = False
+        self.block(1)
+
+    def start_blockquote(self, attrs):
+        self.block()
+        self.quote_depth += 1
+
+    def end_blockquote(self):
+        if self.quote_depth:
+            self.quote_depth -= 1
+            self.block()
+
+    def start_tr(self, attrs):
+        self.row = []
+
+    def start_td(self, attrs):
+        if self.row is not None:
+            self.cell = []
+
+    start_th = start_td
+
+    def end_td(self):
+        if self.cell is not None:
+            self.row.append("".join(self.cell).strip().replace("|", "\\|"))
+            self.cell = None
+
+    end_th = end_td
+
+    def end_table(self):
+        self.rows_written = 0
+        self.block()
+
+    def end_tr(self):
+        if self.row is None:
+            return
+        row, self.row = self.row, None
+        if not self.rows_written:
+            self.block()
+        self.write("| " + " | ".join(row) + " |")
+        if not self.rows_written:
+            # The first row is the header of Markdown tables
+            self.block(1)
+            self.write("|" + "---|" * len(row))
+        self.rows_written += 1
+        self.block(1)
+
+    def escape(self, text):
+        return MARKDOWN_ESCAPE_RE.sub(r"\\\1", text)
+
+    def handle_data(self, data):
+        if self.skipped_depth:
+            return
+        if self.preformatted:
+            lines = data.split("\n")
+            for i, line in enumerate(lines):
+                if i:
+                    self.block(1)
+                if line:
+                    self.write(line)
+            return
+        if self.code is not None:
+            self.code.append(data)
+            return
+        if data[:1].isspace():
+            self.space = True
+        words = data.split()
+        if words:
+            text = self.escape(" ".join(words))
+            if self.cell is None and (self.line_start or self.newlines):
+                text = MARKDOWN_LINE_START_RE.sub(lambda m: f"{m[1]}\\{m[2]}" if m[1] else f"\\{m[3]}", text)
+            self.write(text)
+        self.space = data[-1:].isspace()
+
+
+def html_to_markdown(html):
+    """Return html converted to Markdown."""
+    converter = MarkdownConverter()
+    converter.feed(html or "")
+    converter.close()
+    return converter.get_result()
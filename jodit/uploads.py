@@ -0,0 +1,160 @@
+"""Handling of files uploaded through the editor."""
+
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.text import get_valid_filename
+
+from .images import Image
+from .jobs import enqueue_many
+from .settings import get_storage, get_upload_path
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+DOCUMENT_EXTENSIONS = {".pdf", ".txt", ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".zip", ".mp4", ".webm"}
+
+DEFAULT_EXTENSIONS = sorted(IMAGE_EXTENSIONS | DOCUMENT_EXTENSIONS)
+
+DEFAULT_UPLOAD_TASKS = ["jodit.images.generate_variants"]
+
+
+class UploadError(Exception):
+    """An uploaded file was rejected."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def get_max_size():
+    """Return the maximum size of an uploaded file in bytes."""
+    return getattr(settings, "JODIT_UPLOAD_MAX_SIZE", 20 * 1024 * 1024)
+
+
+def get_allowed_extensions():
+    """Return the lowercase file extensions accepted for uploads."""
+    return {extension.lower() for extension in getattr(settings, "JODIT_UPLOAD_EXTENSIONS", DEFAULT_EXTENSIONS)}
+
+
+def has_upload_permission(request):
+    """
+    Return whether the user of request may upload files.
+
+    Staff members are allowed by default, settings.JODIT_UPLOAD_PERMISSION can
+    name a callable taking the request instead.
+    """
+    permission = getattr(settings, "JODIT_UPLOAD_PERMISSION", None)
+    if permission is not None:
+        return import_string(permission)(request)
+    return request.user.is_active and request.user.is_staff
+
+
+@functools.lru_cache
+def get_executor():
+    """Return the thread pool running storage writes for the async upload view."""
+    return ThreadPoolExecutor(
+        max_workers=getattr(settings, "JODIT_UPLOAD_WORKERS", 4), thread_name_prefix="jodit-upload"
+    )
+
+
+def is_image(name):
+    """Return whether name has the extension of an image format."""
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def validate_upload(file):
+    """Raise UploadError if file has a disallowed extension, is too large or is a broken image."""
+    if os.path.splitext(file.name)[1].lower() not in get_allowed_extensions():
+        raise UploadError(f"{file.name}: file type is not allowed.")
+    if file.size > get_max_size():
+        raise UploadError(f"{file.name}: file is too large.", status=413)
+    verify_image(file)
+
+
+def verify_image(file):
+    """Raise UploadError if file has the extension of an image but is not a valid one."""
+    if Image is not None and is_image(file.name):
+        try:
+            with Image.open(file) as image:
+                image.verify()
+        except Exception as e:
+            raise UploadError(f"{file.name}: file is not a valid image.") from e
+        finally:
+            file.seek(0)
+
+
+def save_uploads(files, cancelled=None):
+    """
+    Validate and save uploaded files, returning their storage names.
+
+    When the cancelled event is set, for example because the client went away,
+    no further files are saved and the ones already saved are deleted.
+    """
+    for file in files:
+        validate_upload(file)
+
+    storage = get_storage()
+    names = []
+    for file in files:
+        if cancelled is not None and cancelled.is_set():
+            break
+        filename = get_valid_filename(os.path.basename(file.name))
+        names.append(storage.save(get_upload_path() + filename, file))
+
+    if cancelled is not None and cancelled.is_set():
+        for name in names:
+            storage.delete(name)
+        return []
+    return names
+
+
+def get_uploaded_files(request):
+    """Return all files of an upload request, Jodit sends them as files[0], files[1], ..."""
+    return [file for key in request.FILES for file in request.FILES.getlist(key)]
+
+
+def handle_upload(request, cancelled=None):
+    """Save the files of an upload request and return their storage names."""
+    files = get_uploaded_files(request)
+    if not files:
+        raise UploadError("No files were uploaded.")
+    return save_uploads(files, cancelled)
+
+
+def enqueue_upload_tasks(names):
+    """
+    Queue the JODIT_UPLOAD_TASKS for uploaded files when JODIT_JOBS is enabled.
+
+    Each task is called with the storage name of a file by the jodit_worker
+    command, after the upload response was sent.
+    """
+    if not getattr(settings, "JODIT_JOBS", False):
+        return
+    tasks = getattr(settings, "JODIT_UPLOAD_TASKS", DEFAULT_UPLOAD_TASKS)
+    enqueue_many([(task, {"name": name}) for name in names for task in tasks])
+
+
+def upload_response(names):
+    """Return a successful response in the format expected by Jodit's uploader."""
+    storage = get_storage()
+    return {
+        "success": True,
+        "data": {
+            "baseurl": "",
+            "files": [storage.url(name) for name in names],
+            "isImages": [is_image(name) for name in names],
+            "messages": [],
+            "code": 220,
+        },
+    }
+
+
+def error_response(message):
+    """Return a failed response in the format expected by Jodit's uploader."""
+    return {
+        "success": False,
+        "data": {"baseurl": "", "files": [], "isImages": [], "messages": [message], "code": 403},
+    }
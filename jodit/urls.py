@@ -0,0 +1,22 @@
+"""URL configuration for django-jodit."""
+
+from django.urls import path
+
+from . import views
+
+app_name = "jodit"
+
+urlpatterns = [
+    path("value/<str:token>/", views.deferred_value, name="deferred_value"),
+    path("sw.js", views.service_worker, name="service_worker"),
+    path("draft/", views.draft, name="draft"),
+    path("image/<int:width>/<path:name>", views.image_variant, name="image_variant"),
+    path("upload/", views.upload, name="upload"),
+    path("upload/async/", views.upload_async, name="upload_async"),
+    path("upload/chunked/", views.chunked_upload_init, name="chunked_upload_init"),
+    path("upload/chunked/<slug:upload_id>/", views.chunked_upload, name="chunked_upload"),
+    path("upload/chunked/<slug:upload_id>/<int:index>/", views.chunked_upload_chunk, name="chunked_upload_chunk"),
+    path("media/<path:name>", views.media, name="media"),
+    path("metrics/", views.metrics_beacon, name="metrics_beacon"),
+    path("metrics/summary/", views.metrics_summary, name="metrics_summary"),
+]
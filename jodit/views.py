@@ -0,0 +1,318 @@
+"""Views for django-jodit."""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseRedirect, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from .chunked import ChunkedUpload
+from .deferred import get_timeout, load_deferred_value
+from .drafts import delete_draft, get_draft, get_max_size, save_draft
+from .images import Image, generate_variant, get_widths, is_managed, variant_name
+from .media import has_media_permission, is_upload, media_response
+from .metrics import METRICS, record, summary
+from .settings import get_service_worker_scope, get_storage
+from .uploads import (
+    UploadError,
+    enqueue_upload_tasks,
+    error_response,
+    get_executor,
+    handle_upload,
+    has_upload_permission,
+    upload_response,
+)
+
+SERVICE_WORKER_PATH = os.path.join(os.path.dirname(__file__), "static", "jodit", "jodit-sw.js")
+
+
+@require_GET
+def deferred_value(request, token):
+    """Return a large widget value that was not inlined into the page."""
+    value = load_deferred_value(token)
+    if value is None:
+        raise Http404("Deferred value not found or expired.")
+    response = JsonResponse({"value": value})
+    # The token is derived from the content, so the response never changes.
+    patch_cache_control(response, private=True, max_age=get_timeout(), immutable=True)
+    return response
+
+
+@functools.lru_cache
+def _read_service_worker():
+    with open(SERVICE_WORKER_PATH, "rb") as f:
+        return f.read()
+
+
+@require_GET
+def service_worker(request):
+    """
+    Serve the service worker caching the Jodit assets.
+
+    Static files are usually served under STATIC_URL, which limits the scope of
+    a service worker to that path. Served from here with a Service-Worker-Allowed
+    header, it can control the pages rendering editors.
+    """
+    if not getattr(settings, "JODIT_SERVICE_WORKER", False):
+        raise Http404("The service worker is disabled.")
+    response = HttpResponse(_read_service_worker(), content_type="text/javascript")
+    response.headers["Service-Worker-Allowed"] = get_service_worker_scope()
+    # Browsers must always see the latest worker, the assets it caches are versioned.
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_http_methods(["GET", "POST", "DELETE"])
+def draft(request):
+    """
+    Load, save or delete the autosaved draft of the current user.
+
+    Drafts are identified by a key chosen by the editor, passed as the "key"
+    query parameter, or in the JSON body with the value when saving.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required."}, status=403)
+
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            key, value = data["key"], data["value"]
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({"error": "Invalid draft."}, status=400)
+        if not isinstance(key, str) or not isinstance(value, str):
+            return JsonResponse({"error": "Invalid draft."}, status=400)
+        if len(value) > get_max_size():
+            return JsonResponse({"error": "Draft is too large."}, status=413)
+        saved = save_draft(request.user, key, value)
+        return JsonResponse({"updated": saved["updated"]})
+
+    key = request.GET.get("key")
+    if not key:
+        return JsonResponse({"error": "Missing draft key."}, status=400)
+    if request.method == "DELETE":
+        delete_draft(request.user, key)
+        return HttpResponse(status=204)
+
+    saved = get_draft(request.user, key)
+    if saved is None:
+        return JsonResponse({"error": "No draft found."}, status=404)
+    response = JsonResponse(saved)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@require_GET
+def image_variant(request, width, name):
+    """
+    Redirect to the resized variant of an uploaded image.
+
+    Missing variants are only generated for logged-in users, so anonymous
+    requests can't make the server resize images and fill the storage; they
+    are redirected to the original image until the variant exists, either
+    from the upload's background job or from a logged-in visit. Uploads
+    that can't be resized are redirected to as well.
+    """
+    if Image is None or width not in get_widths() or not is_managed(name):
+        raise Http404("Unknown image variant.")
+    storage = get_storage()
+    if not storage.exists(name):
+        raise Http404("Image not found.")
+    target = None
+    if storage.exists(variant_name(name, width)) or request.user.is_authenticated:
+        target = generate_variant(name, width)
+    if target is not None:
+        response = HttpResponseRedirect(storage.url(target))
+        patch_cache_control(response, public=True, max_age=24 * 60 * 60)
+    else:
+        response = HttpResponseRedirect(storage.url(name))
+        # Short-lived, so the variant is used once it exists
+        patch_cache_control(response, public=True, max_age=5 * 60)
+    return response
+
+
+# sendBeacon can't send a CSRF token. Reports are limited to logged-in users,
+# whose session cookie browsers don't send with cross-site POSTs (SameSite=Lax),
+# and to known metrics with clamped values.
+@csrf_exempt
+@require_POST
+def metrics_beacon(request):
+    """Record editor performance timings sent by jodit-init.js for logged-in users."""
+    if not getattr(settings, "JODIT_METRICS", False):
+        raise Http404("Metrics are disabled.")
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required."}, status=403)
+    if len(request.body) > 64 * 1024:
+        return JsonResponse({"error": "Report is too large."}, status=413)
+    try:
+        samples = json.loads(request.body)["samples"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid report."}, status=400)
+    if not isinstance(samples, list) or not all(
+        isinstance(sample, dict) and sample.get("name") in METRICS for sample in samples
+    ):
+        return JsonResponse({"error": "Invalid report."}, status=400)
+    record(samples)
+    return HttpResponse(status=204)
+
+
+@require_GET
+def metrics_summary(request):
+    """Return percentiles of the recorded editor timings, for staff members."""
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+    response = JsonResponse(summary())
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@require_POST
+def upload(request):
+    """
+    Save files sent by Jodit's uploader and return their URLs.
+
+    Processing of the files, such as generating image variants, is queued as
+    background jobs when JODIT_JOBS is enabled.
+    """
+    if not has_upload_permission(request):
+        return JsonResponse(error_response("Permission denied."), status=403)
+    try:
+        names = handle_upload(request)
+    except UploadError as e:
+        return JsonResponse(error_response(str(e)), status=e.status)
+    enqueue_upload_tasks(names)
+    return JsonResponse(upload_response(names))
+
+
+async def upload_async(request):
+    """
+    Save files sent by Jodit's uploader without blocking the event loop.
+
+    Parsing the files and writing them to storage run in a bounded thread pool.
+    When the client disconnects, Django cancels the view and files saved for
+    the request are deleted.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    if not await sync_to_async(has_upload_permission)(request):
+        return JsonResponse(error_response("Permission denied."), status=403)
+
+    cancelled = threading.Event()
+    future = asyncio.get_running_loop().run_in_executor(get_executor(), handle_upload, request, cancelled)
+    try:
+        # Shielded so that the job can clean up after itself when cancelled
+        names = await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+    except UploadError as e:
+        return JsonResponse(error_response(str(e)), status=e.status)
+    await sync_to_async(enqueue_upload_tasks)(names)
+    return JsonResponse(upload_response(names))
+
+
+@require_POST
+def chunked_upload_init(request):
+    """
+    Start a chunked upload of a large file.
+
+    The JSON body holds the "name" and "size" of the file. The response tells
+    the client the chunk size, number of chunks and URL of the upload.
+    """
+    if not has_upload_permission(request):
+        return JsonResponse({"error": "Permission denied."}, status=403)
+    try:
+        data = json.loads(request.body)
+        name, size = data["name"], data["size"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid upload."}, status=400)
+    if not isinstance(name, str) or not isinstance(size, int):
+        return JsonResponse({"error": "Invalid upload."}, status=400)
+    try:
+        upload = ChunkedUpload.create(request.user, name, size)
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    return JsonResponse(upload.status(), status=201)
+
+
+@require_http_methods(["GET", "POST", "DELETE"])
+def chunked_upload(request, upload_id):
+    """
+    Query, finish or abort a chunked upload.
+
+    GET returns the received chunks, so that an interrupted upload can resume.
+    POST assembles the chunks and returns a response for Jodit's uploader.
+    """
+    if not has_upload_permission(request):
+        return JsonResponse({"error": "Permission denied."}, status=403)
+    upload = ChunkedUpload.load(upload_id, request.user)
+    if upload is None:
+        raise Http404("Upload not found or expired.")
+
+    if request.method == "GET":
+        response = JsonResponse(upload.status())
+        patch_cache_control(response, no_store=True)
+        return response
+    if request.method == "DELETE":
+        upload.delete()
+        return HttpResponse(status=204)
+
+    try:
+        name = upload.assemble()
+    except UploadError as e:
+        return JsonResponse(error_response(str(e)), status=e.status)
+    enqueue_upload_tasks([name])
+    return JsonResponse(upload_response([name]))
+
+
+@require_http_methods(["PUT"])
+def chunked_upload_chunk(request, upload_id, index):
+    """Store a chunk of a chunked upload, checked against its X-Chunk-Sha256 header if sent."""
+    if not has_upload_permission(request):
+        return JsonResponse({"error": "Permission denied."}, status=403)
+    upload = ChunkedUpload.load(upload_id, request.user)
+    if upload is None:
+        raise Http404("Upload not found or expired.")
+    try:
+        upload.write_chunk(index, request, request.headers.get("X-Chunk-Sha256"))
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    return HttpResponse(status=204)
+
+
+@require_http_methods(["GET", "HEAD"])
+def media(request, name):
+    """
+    Serve an editor upload to users allowed to see it.
+
+    Point the base_url of the JODIT_STORAGE storage at this view to keep
+    uploads private. Transfers are handed to the front-end server when
+    JODIT_MEDIA_SENDFILE is set, and streamed by Django otherwise.
+    """
+    if not is_upload(name):
+        raise Http404("Not an editor upload.")
+    if not has_media_permission(request, name):
+        raise PermissionDenied
+    storage = get_storage()
+    if not storage.exists(name):
+        raise Http404("Upload not found.")
+
+    size = storage.size(name)
+    last_modified = int(storage.get_modified_time(name).timestamp())
+    etag = quote_etag(f"{size:x}-{last_modified:x}")
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = media_response(request, storage, name, size, (etag, http_date(last_modified)))
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # Revalidate on every use, permissions may have changed
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
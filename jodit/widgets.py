@@ -1,15 +1,43 @@
 """Jodit widget for Django forms."""
 
+import functools
+import hashlib
+import os
+from contextvars import ContextVar
+
 from django import forms
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
 from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.forms.renderers import get_default_renderer
 from django.forms.widgets import Media
-from django.templatetags.static import static
+from django.urls import get_script_prefix, reverse
 from django.utils.encoding import force_str
 from django.utils.functional import Promise
+from django.utils.http import urlencode
+from django.utils.translation import get_language
+
+from . import __version__
+from .compression import COMPRESSED_VALUE_SUFFIX, DecompressionError, decompress_value
+from .configs import get_client_config, resolve_config
+from .deferred import DEFERRED_VALUE_SUFFIX, defer_value, load_deferred_value
+from .instrumentation import timed
+from .precompressed import asset_url
+from .rendering import render_widget
+from .settings import get_service_worker_scope
+
+DEFAULT_TEMPLATE_NAME = "jodit/widget.html"
+
+# The template reproduced by render_widget()
+BUNDLED_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "templates", DEFAULT_TEMPLATE_NAME)
 
-from .configs import DEFAULT_CONFIG
+# Messages of the errors of submitted values JoditWidget can't resolve
+VALUE_ERROR_MESSAGES = {
+    "invalid_compressed": "The submitted content could not be decompressed.",
+    "compressed_too_large": "The submitted content is too large.",
+    "deferred_expired": "The content has expired. Reload the page and submit your changes again.",
+}
 
 
 class LazyEncoder(DjangoJSONEncoder):
@@ -26,76 +54,244 @@ def json_encode(data):
     return LazyEncoder().encode(data)
 
 
+def get_asset_urls():
+    """
+    Return the URLs of the CSS and JavaScript files required by Jodit editor.
+
+    Resolved once per script prefix and cached until a relevant setting changes,
+    as widget media is accessed many times per form, field and inline row.
+
+    Supports custom Jodit paths via settings:
+    - JODIT_JS_URL: Custom JavaScript file path/URL
+    - JODIT_CSS_URL: Custom CSS file path/URL
+
+    Falls back to bundled static files if not configured, using their
+    precompressed, content-hashed copies when JODIT_PRECOMPRESSED_STATIC is set.
+    """
+    return _get_asset_urls(get_script_prefix())
+
+
+@functools.lru_cache
+def _get_asset_urls(script_prefix):
+    # Get custom paths from settings or use defaults
+    jodit_js = getattr(settings, 'JODIT_JS_URL', None)
+    jodit_css = getattr(settings, 'JODIT_CSS_URL', None)
+
+    # Use custom paths if provided, otherwise use bundled files
+    if jodit_js is None:
+        jodit_js = asset_url('jodit/jodit.min.js')
+    if jodit_css is None:
+        jodit_css = asset_url('jodit/jodit.min.css')
+
+    # Always use our initialization script
+    jodit_init = asset_url('jodit/jodit-init.js')
+
+    return {"css": [jodit_css], "js": [jodit_js, jodit_init]}
+
+
+@functools.lru_cache
+def _get_media(script_prefix):
+    assets = _get_asset_urls(script_prefix)
+    return Media(css={"all": assets["css"]}, js=assets["js"])
+
+
+@functools.lru_cache
+def _get_service_worker(script_prefix):
+    if not getattr(settings, "JODIT_SERVICE_WORKER", False):
+        return None
+    assets = _get_asset_urls(script_prefix)
+    query = urlencode([("v", __version__)] + [("asset", url) for url in assets["css"] + assets["js"]])
+    return {
+        "url": f"{reverse('jodit:service_worker')}?{query}",
+        "scope": get_service_worker_scope(),
+    }
+
+
+@functools.lru_cache
+def _get_metrics_url(script_prefix):
+    if not getattr(settings, "JODIT_METRICS", False):
+        return None
+    return reverse("jodit:metrics_beacon")
+
+
+@functools.lru_cache
+def _get_client_config_json(config_name, language):
+    # Per language, as configs may contain lazy translations
+    with timed("widget.json_encode", config=config_name):
+        return json_encode(get_client_config(resolve_config(config_name)))
+
+
+@functools.lru_cache
+def _uses_bundled_template(renderer_class):
+    """Return whether renderers of renderer_class load the bundled template, not a project override."""
+    template = renderer_class().get_template(DEFAULT_TEMPLATE_NAME)
+    origin = getattr(template, "origin", None)
+    return origin is not None and os.path.realpath(origin.name) == os.path.realpath(BUNDLED_TEMPLATE_PATH)
+
+
+@receiver(setting_changed)
+def clear_asset_cache(*, setting, **kwargs):
+    """Forget resolved asset URLs when a setting affecting them changes."""
+    if setting.startswith(("JODIT_", "STATIC")) or setting == "STORAGES":
+        _get_asset_urls.cache_clear()
+        _get_media.cache_clear()
+        _get_service_worker.cache_clear()
+        _get_metrics_url.cache_clear()
+        _get_client_config_json.cache_clear()
+    if setting in ("TEMPLATES", "FORM_RENDERER", "INSTALLED_APPS"):
+        _uses_bundled_template.cache_clear()
+
+
+# Config names of the editors rendered during the current request, only
+# collected while JoditPreloadMiddleware is handling a request.
+editors_rendered = ContextVar("jodit_editors_rendered", default=None)
+
+
+def mark_editor_rendered(config_name):
+    """Record that an editor was rendered while handling the current request."""
+    rendered = editors_rendered.get()
+    if rendered is not None:
+        rendered.append(config_name)
+
+
+class InvalidValue:
+    """
+    Submitted value JoditWidget rejected, with the code of its error message.
+
+    RichTextFormField fails validation with the message of code. Other fields
+    using the widget read it as an empty string.
+    """
+
+    def __init__(self, raw, code):
+        self.raw = raw
+        self.code = code
+
+    def __str__(self):
+        return ""
+
+    def __repr__(self):
+        return f"<InvalidValue: {self.code}>"
+
+
 class JoditWidget(forms.Textarea):
     """
     Widget providing Jodit WYSIWYG editor for rich text editing.
 
     Supports configuration through settings.JODIT_CONFIGS.
 
+    Values longer than deferred_value_threshold characters (defaults to
+    settings.JODIT_DEFERRED_VALUE_THRESHOLD) are not inlined into the page but
+    fetched by the editor from the jodit:deferred_value view, unless the cache
+    does not keep them.
+
     Example usage:
         widget = JoditWidget(config_name='default')
     """
 
-    def __init__(self, config_name="default", template_name="jodit/widget.html", *args, **kwargs):
+    def __init__(
+        self, config_name="default", template_name=DEFAULT_TEMPLATE_NAME, *args, deferred_value_threshold=None, **kwargs
+    ):
         self.template_name = template_name
         super().__init__(*args, **kwargs)
 
+        if deferred_value_threshold is None:
+            deferred_value_threshold = getattr(settings, "JODIT_DEFERRED_VALUE_THRESHOLD", None)
+        self.deferred_value_threshold = deferred_value_threshold
+        # Last decompressed payload and its value, forms read values several times
+        self.decompressed = None
+
         self.config_name = config_name
-        # Setup config from defaults.
-        self.config = DEFAULT_CONFIG.copy()
-
-        # Try to get valid config from settings.
-        configs = getattr(settings, "JODIT_CONFIGS", None)
-        if configs:
-            if isinstance(configs, dict):
-                # Make sure the config_name exists.
-                if self.config_name in configs:
-                    config = configs[self.config_name]
-                    # Make sure the configuration is a dictionary.
-                    if not isinstance(config, dict):
-                        raise ImproperlyConfigured(
-                            f'JODIT_CONFIGS["{self.config_name}"] setting must be a dictionary type.'
-                        )
-                    # Override defaults with settings config.
-                    self.config.update(config)
-                else:
-                    raise ImproperlyConfigured(
-                        f"No configuration named '{self.config_name}' found in your JODIT_CONFIGS setting."
-                    )
-            else:
-                raise ImproperlyConfigured("JODIT_CONFIGS setting must be a dictionary type.")
+        with timed("widget.config", config=config_name):
+            self.config = resolve_config(config_name)
 
     @property
     def media(self):
-        """
-        Return media files required by Jodit editor.
-
-        Supports custom Jodit paths via settings:
-        - JODIT_JS_URL: Custom JavaScript file path/URL
-        - JODIT_CSS_URL: Custom CSS file path/URL
-
-        Falls back to bundled static files if not configured.
-        """
-        # Get custom paths from settings or use defaults
-        jodit_js = getattr(settings, 'JODIT_JS_URL', None)
-        jodit_css = getattr(settings, 'JODIT_CSS_URL', None)
-
-        # Use custom paths if provided, otherwise use bundled files
-        if jodit_js is None:
-            jodit_js = static('jodit/jodit.min.js')
-        if jodit_css is None:
-            jodit_css = static('jodit/jodit.min.css')
-
-        # Always use our initialization script
-        jodit_init = static('jodit/jodit-init.js')
-
-        return Media(
-            css={"all": [jodit_css]},
-            js=[jodit_js, jodit_init],
-        )
+        """Return media files required by Jodit editor."""
+        return _get_media(get_script_prefix())
 
     def get_context(self, name, value, attrs):
         """Build widget context with Jodit configuration."""
+        mark_editor_rendered(self.config_name)
         context = super().get_context(name, value, attrs)
-        context["widget"]["config"] = json_encode(self.config)
+        context["widget"]["config"] = _get_client_config_json(self.config_name, get_language())
+        context["widget"]["virtualize"] = bool(self.config.get("virtualize"))
+        if self.config.get("autosave"):
+            context["widget"]["autosave_url"] = reverse("jodit:draft")
+            # Drafts are keyed by the content they are based on, so they never replace newer saves
+            version = hashlib.sha256((context["widget"]["value"] or "").encode()).hexdigest()[:16]
+            context["widget"]["autosave_version"] = version
+        if self.config.get("chunkedUpload"):
+            context["widget"]["chunked_upload_url"] = reverse("jodit:chunked_upload_init")
+        context["widget"]["service_worker"] = _get_service_worker(get_script_prefix())
+        context["widget"]["metrics_url"] = _get_metrics_url(get_script_prefix())
+
+        value = context["widget"]["value"]
+        if self.deferred_value_threshold is not None and value and len(value) > self.deferred_value_threshold:
+            token = defer_value(value)
+            if token is None:
+                return context
+            context["widget"]["value"] = None
+            context["widget"]["deferred_name"] = name + DEFERRED_VALUE_SUFFIX
+            context["widget"]["deferred_token"] = token
+            context["widget"]["deferred_url"] = reverse("jodit:deferred_value", args=[token])
         return context
+
+    def render(self, name, value, attrs=None, renderer=None):
+        """
+        Render the widget, building the markup directly when JODIT_FAST_RENDER is set.
+
+        The fast path only applies to the bundled template: widgets with a
+        custom template_name, or rendered where the project overrides
+        jodit/widget.html, always go through the template engine.
+        """
+        with timed("widget.render", config=self.config_name):
+            if (
+                self.template_name == DEFAULT_TEMPLATE_NAME
+                and getattr(settings, "JODIT_FAST_RENDER", False)
+                and _uses_bundled_template(type(renderer or get_default_renderer()))
+            ):
+                return render_widget(self.get_context(name, value, attrs)["widget"])
+            return super().render(name, value, attrs, renderer)
+
+    def value_from_datadict(self, data, files, name):
+        """
+        Return the submitted value, resolving compressed and deferred values.
+
+        Values compressed by the editor before submit are decompressed, and
+        returned as an InvalidValue if they are corrupt or too large. A
+        deferred value that the editor never loaded is taken from the store,
+        so submitting the form without touching the field keeps its content;
+        if it expired or the store is not shared by all processes, the
+        submission fails validation instead of saving empty content.
+        """
+        payload = data.get(name + COMPRESSED_VALUE_SUFFIX)
+        if payload:
+            return self.decompress(payload)
+
+        value = super().value_from_datadict(data, files, name)
+        token = data.get(name + DEFERRED_VALUE_SUFFIX)
+        if token and not value:
+            deferred = load_deferred_value(token)
+            # The empty textarea never had the content, it must not replace it
+            return InvalidValue(token, "deferred_expired") if deferred is None else deferred
+        return value
+
+    def decompress(self, payload):
+        if self.decompressed is None or self.decompressed[0] != payload:
+            try:
+                with timed("widget.decompress", config=self.config_name):
+                    value = decompress_value(payload)
+            except DecompressionError as e:
+                value = InvalidValue(payload, e.code)
+            self.decompressed = (payload, value)
+        return self.decompressed[1]
+
+    def format_value(self, value):
+        if isinstance(value, InvalidValue):
+            return None
+        return super().format_value(value)
+
+    def value_omitted_from_data(self, data, files, name):
+        return super().value_omitted_from_data(data, files, name) and not any(
+            name + suffix in data for suffix in (COMPRESSED_VALUE_SUFFIX, DEFERRED_VALUE_SUFFIX)
+        )